@@ -6,6 +6,7 @@ from .communication import communication_router
 from .admin import admin_router
 from .consultants import consultants_main_router
 from .public import router as public_router
+from .translations_simple import router as translations_router
 
 api_router = APIRouter(prefix="/api/v1")
 
@@ -15,4 +16,5 @@ api_router.include_router(content_router)
 api_router.include_router(communication_router, prefix="/communication")
 api_router.include_router(admin_router)
 api_router.include_router(consultants_main_router)
-api_router.include_router(public_router, prefix="/public", tags=["public"])
\ No newline at end of file
+api_router.include_router(public_router, prefix="/public", tags=["public"])
+api_router.include_router(translations_router, prefix="/translations", tags=["translations"])
@@ -6,7 +6,10 @@ from datetime import datetime, date
 import logging
 
 from ....database import get_db
-from ....services.consultation_booking_service import ConsultationBookingService
+from ....dependencies import require_editor
+from ....models.user import AdminUser
+from ....services.consultation_booking_service import ConsultationBookingService, DEFAULT_TIME_SLOTS
+from ....config import settings
 from ....models.business import ConsultationBookingStatus, PaymentStatus
 from ....middleware.language_detection import get_current_language
 
@@ -55,6 +58,10 @@ class PaymentRequest(BaseModel):
     payment_provider: str = 'stripe'
 
 
+class BookingCancelRequest(BaseModel):
+    reason: Optional[str] = None
+
+
 # Public endpoints for booking flow
 @router.get("/public/consultants/active")
 async def get_active_consultants(
@@ -94,8 +101,7 @@ async def get_consultant_availability(
     try:
         available_slots = await service.get_available_time_slots(
             consultant_id=consultant_id,
-            target_date=target_date,
-            timezone=timezone
+            target_date=target_date
         )
         
         return {
@@ -104,7 +110,7 @@ async def get_consultant_availability(
                 'consultant_id': consultant_id,
                 'date': target_date.isoformat(),
                 'available_slots': available_slots,
-                'default_slots': ["10:00", "14:00"],
+                'default_slots': DEFAULT_TIME_SLOTS,
                 'timezone': timezone
             }
         }
@@ -114,6 +120,54 @@ async def get_consultant_availability(
         raise HTTPException(status_code=500, detail="Failed to fetch availability")
 
 
+@router.get("/public/availability")
+async def get_availability_calendar(
+    date_from: date = Query(..., description="First date of the window"),
+    date_to: date = Query(..., description="Last date of the window (inclusive)"),
+    consultant_ids: Optional[List[str]] = Query(None, description="Consultants to include (default: all active)"),
+    timezone: str = Query('UTC', description="Timezone for availability"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get available time slots for many consultants over a date range"""
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to must not be before date_from")
+    
+    if (date_to - date_from).days + 1 > settings.availability_max_range_days:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date range cannot exceed {settings.availability_max_range_days} days"
+        )
+    
+    service = ConsultationBookingService(db)
+    
+    try:
+        calendar = await service.get_availability_calendar(
+            date_from=date_from,
+            date_to=date_to,
+            consultant_ids=consultant_ids
+        )
+        
+        return {
+            'success': True,
+            'data': {
+                'date_from': date_from.isoformat(),
+                'date_to': date_to.isoformat(),
+                'default_slots': DEFAULT_TIME_SLOTS,
+                'timezone': timezone,
+                'consultants': {
+                    consultant_id: {
+                        day.isoformat(): slots for day, slots in slots_by_day.items()
+                    }
+                    for consultant_id, slots_by_day in calendar.items()
+                }
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"Error fetching availability calendar: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch availability")
+
+
 @router.post("/public/bookings")
 async def create_booking(
     request: BookingCreateRequest,
@@ -331,6 +385,38 @@ async def get_admin_booking_details(
         raise HTTPException(status_code=500, detail="Failed to fetch booking details")
 
 
+@router.post("/admin/bookings/{booking_id}/cancel")
+async def cancel_admin_booking(
+    booking_id: str,
+    request: BookingCancelRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: AdminUser = Depends(require_editor())
+):
+    """Cancel a booking and release its time slot"""
+    service = ConsultationBookingService(db)
+    
+    try:
+        result = await service.cancel_booking(
+            booking_id=booking_id,
+            reason=request.reason
+        )
+        
+        if not result['success']:
+            status_code = 404 if result['error'] == 'Booking not found' else 400
+            raise HTTPException(status_code=status_code, detail=result['error'])
+        
+        return {
+            'success': True,
+            'data': result
+        }
+        
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error cancelling booking: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to cancel booking")
+
+
 @router.get("/admin/bookings/statistics")
 async def get_booking_statistics(
     db: AsyncSession = Depends(get_db)
@@ -364,7 +450,7 @@ async def get_booking_config(
             'currency': 'EUR',
             'duration_minutes': 30
         },
-        'time_slots': ['10:00', '14:00'],
+        'time_slots': DEFAULT_TIME_SLOTS,
         'booking_flow_steps': [
             'consultant_selection',
             'time_slot_selection', 
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.exc import IntegrityError
 from typing import List
 from datetime import datetime
 from app.database import get_db
@@ -207,14 +208,12 @@ async def delete_webinar(
     return {"message": "Webinar deleted successfully"}
 
 
-@router.post("/{webinar_id}/register", response_model=WebinarRegistrationResponse)
-async def register_for_webinar(
+async def _registration_rejection(
+    db: AsyncSession,
     webinar_id: int,
-    registration_data: WebinarRegistrationCreate,
-    db: AsyncSession = Depends(get_db)
-):
-    """Register for webinar (public endpoint)"""
-    # Check if webinar exists and registration is enabled
+    email: str
+) -> HTTPException:
+    """Work out why a seat could not be claimed (cold path only)"""
     result = await db.execute(
         select(Webinar).where(
             Webinar.id == webinar_id,
@@ -224,50 +223,78 @@ async def register_for_webinar(
     webinar = result.scalar_one_or_none()
     
     if not webinar:
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Webinar not found"
         )
     
     if not webinar.registration_enabled:
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Registration is not enabled for this webinar"
         )
     
-    # Check registration deadline
     if webinar.registration_deadline and datetime.utcnow() > webinar.registration_deadline:
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Registration deadline has passed"
         )
     
-    # Check if already registered
     existing_registration = await db.execute(
-        select(WebinarRegistration).where(
+        select(WebinarRegistration.id).where(
             WebinarRegistration.webinar_id == webinar_id,
-            WebinarRegistration.email == registration_data.email
+            WebinarRegistration.email == email
         )
     )
     if existing_registration.scalar_one_or_none():
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Already registered for this webinar"
         )
     
-    # Check max participants
-    if webinar.max_participants:
-        registration_count = await db.execute(
-            select(func.count(WebinarRegistration.id)).where(
-                WebinarRegistration.webinar_id == webinar_id
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Webinar is full"
+    )
+
+
+@router.post("/{webinar_id}/register", response_model=WebinarRegistrationResponse)
+async def register_for_webinar(
+    webinar_id: int,
+    registration_data: WebinarRegistrationCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Register for webinar (public endpoint)
+    
+    Claims a seat with one conditional UPDATE on registered_count and inserts
+    the registration in the same transaction. The unique (webinar_id, email)
+    index rejects duplicates, so concurrent requests can neither overbook nor
+    double-register.
+    """
+    # Claim a seat only if the webinar is open and below capacity
+    seat_claimed = await db.execute(
+        update(Webinar)
+        .where(
+            Webinar.id == webinar_id,
+            Webinar.deleted_at.is_(None),
+            Webinar.registration_enabled == True,
+            or_(
+                Webinar.registration_deadline.is_(None),
+                Webinar.registration_deadline >= datetime.utcnow()
+            ),
+            or_(
+                Webinar.max_participants.is_(None),
+                Webinar.registered_count < Webinar.max_participants
             )
         )
-        count = registration_count.scalar()
-        if count >= webinar.max_participants:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Webinar is full"
-            )
+        .values(registered_count=Webinar.registered_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    
+    if seat_claimed.rowcount == 0:
+        await db.rollback()
+        raise await _registration_rejection(db, webinar_id, registration_data.email)
     
     # Create registration
     registration = WebinarRegistration(
@@ -285,7 +312,15 @@ async def register_for_webinar(
     )
     
     db.add(registration)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Duplicate email - rolling back also releases the claimed seat
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Already registered for this webinar"
+        )
     await db.refresh(registration)
     
     return WebinarRegistrationResponse.from_orm(registration)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, or_
 from typing import List
@@ -7,6 +7,9 @@ from app.models.content import Page
 from app.models.user import AdminUser
 from app.schemas.content import PageCreate, PageUpdate, PageResponse, PageListResponse
 from app.services.content_renderer import ContentRendererService
+from app.services.content_pretranslation_service import content_pretranslation_service
+from app.services.image_processing_service import image_service
+from app.config import settings
 from app.dependencies import (
     get_current_user, require_editor, require_viewer, 
     CommonQueryParams
@@ -63,6 +66,7 @@ async def list_pages(
 @router.post("/", response_model=PageResponse)
 async def create_page(
     page_data: PageCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: AdminUser = Depends(require_editor)
 ):
@@ -118,6 +122,9 @@ async def create_page(
     await db.commit()
     await db.refresh(page)
     
+    if settings.content_pretranslation_enabled:
+        background_tasks.add_task(content_pretranslation_service.pretranslate, 'page', page.id)
+    
     return PageResponse.from_orm(page)
 
 
@@ -149,6 +156,7 @@ async def get_page(
 async def update_page(
     page_id: int,
     page_data: PageUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: AdminUser = Depends(require_editor)
 ):
@@ -201,6 +209,7 @@ async def update_page(
     
     # Update fields
     update_data = page_data.dict(exclude_unset=True)
+    before = content_pretranslation_service.snapshot('page', page)
     
     for field, value in update_data.items():
         setattr(page, field, value)
@@ -214,6 +223,9 @@ async def update_page(
     await db.commit()
     await db.refresh(page)
     
+    if settings.content_pretranslation_enabled:
+        background_tasks.add_task(content_pretranslation_service.pretranslate, 'page', page.id, before)
+    
     return PageResponse.from_orm(page)
 
 
@@ -242,6 +254,9 @@ async def delete_page(
     page.deleted_at = func.now()
     await db.commit()
     
+    # Drop the page's media references; unused files are reclaimed
+    await image_service.release_owner_media(db, 'page', page_id)
+    
     return {"message": "Page deleted successfully"}
 
 
@@ -8,12 +8,16 @@ from app.database import get_db
 from app.models.business import Webinar, WebinarRegistration
 from app.schemas.business import WebinarResponse
 from .whitepapers import router as whitepapers_router
+from .media import router as media_router
 
 router = APIRouter()
 
 # Include whitepaper routes
 router.include_router(whitepapers_router, tags=["whitepapers"])
 
+# Include on-demand media derivative routes
+router.include_router(media_router, tags=["media"])
+
 
 class CalendarIntegrationTrackingRequest(BaseModel):
     webinar_id: str
@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import FileResponse, Response
+from starlette.background import BackgroundTask
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.services.media_derivative_service import (
+    derivative_service,
+    DERIVATIVE_FORMATS,
+    supported_formats,
+    negotiate_format
+)
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Derivatives are keyed by the source content hash, so a URL never changes content
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/media/{media_id}/w/{width}.{fmt}")
+async def get_media_derivative(
+    media_id: int,
+    width: int,
+    fmt: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Serve an image resized to the nearest allowed width, generated on first request"""
+    fmt = fmt.lower()
+    if fmt not in supported_formats():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format. Use one of: {', '.join(sorted(supported_formats()))}"
+        )
+    return await serve_derivative(db, request, media_id, width, fmt)
+
+
+@router.get("/media/{media_id}/w/{width}")
+async def get_negotiated_media_derivative(
+    media_id: int,
+    width: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Serve the smallest image format the client accepts (AVIF, WebP, then JPEG)"""
+    fmt = negotiate_format(request.headers.get("accept"))
+    return await serve_derivative(db, request, media_id, width, fmt, headers={"Vary": "Accept"})
+
+
+async def serve_derivative(
+    db: AsyncSession,
+    request: Request,
+    media_id: int,
+    width: int,
+    fmt: str,
+    headers: Optional[dict] = None
+):
+    if width <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Width must be positive"
+        )
+
+    media_file = await derivative_service.get_media_file(db, media_id)
+    if not media_file or not (media_file.mime_type or "").startswith("image/"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+
+    snapped_width = derivative_service.snap_width(width)
+    etag = f'"{media_file.file_hash[:16]}-w{snapped_width}-{fmt}"'
+    headers = {
+        **(headers or {}),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "ETag": etag
+    }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        # Pinned so eviction cannot unlink the file while it is being sent
+        path = await derivative_service.get_derivative(media_file, snapped_width, fmt, pin=True)
+    except FileNotFoundError:
+        logger.error(f"Source file missing for media {media_id}: {media_file.file_path}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+
+    return FileResponse(
+        path=path,
+        media_type=DERIVATIVE_FORMATS[fmt][1],
+        headers=headers,
+        background=BackgroundTask(
+            derivative_service.cache.unpin,
+            derivative_service.cache_key(media_file, snapped_width, fmt)
+        )
+    )
@@ -3,6 +3,7 @@ import hashlib
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, desc, or_
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel, EmailStr
@@ -17,6 +18,7 @@ from app.schemas.whitepaper import (
     WhitepaperDownloadLinkResponse
 )
 from app.services.email_service import email_service
+from app.utils.file_delivery import resolve_upload_path, file_download_response, range_start
 from app.config import settings
 import logging
 
@@ -457,18 +459,32 @@ async def download_whitepaper(
             detail="Download link has expired. Please request a new download."
         )
     
+    # A Range request from a non-zero offset shortly after a counted download
+    # resumes that download, even if it used up the limit; every other
+    # request (including "bytes=0-") is a new download
+    range_header = request.headers.get("range") if request else None
+    resuming = bool(
+        range_start(range_header) > 0
+        and download_request.download_count
+        and download_request.downloaded_at
+        and datetime.utcnow() - download_request.downloaded_at
+        <= timedelta(seconds=settings.download_resume_window_seconds)
+    )
+    
     # Check download limit
-    if download_request.download_count >= download_request.download_limit:
+    if not resuming and download_request.download_count >= download_request.download_limit:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Download limit reached. Please request a new download link."
         )
     
-    # Get whitepaper
+    # Get whitepaper with its file record
     whitepaper_result = await db.execute(
-        select(Whitepaper).where(Whitepaper.id == download_request.whitepaper_id)
+        select(Whitepaper)
+        .options(selectinload(Whitepaper.file))
+        .where(Whitepaper.id == download_request.whitepaper_id)
     )
-    whitepaper = whitepaper_result.scalar_one()
+    whitepaper = whitepaper_result.scalar_one_or_none()
     
     if not whitepaper or not whitepaper.file:
         raise HTTPException(
@@ -476,49 +492,34 @@ async def download_whitepaper(
             detail="Whitepaper file not found"
         )
     
-    # Update download tracking
-    download_request.download_count += 1
-    download_request.downloaded_at = datetime.utcnow()
-    
-    # Update whitepaper download count
-    whitepaper.download_count = (whitepaper.download_count or 0) + 1
-    
-    await db.commit()
-    
-    # Return file download
-    from fastapi.responses import FileResponse
-    import os
-    
-    # Assuming files are stored in a specific directory
-    file_path = f"/Users/ashant/magnetiq2/data/media/{whitepaper.file.filename}"
+    # Resolve the stored file once, relative to the upload root
+    file_path = resolve_upload_path(whitepaper.file.file_path)
+    if file_path is None:
+        logger.error(f"Whitepaper file missing for {whitepaper.slug}: {whitepaper.file.file_path}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found on server"
+        )
     
-    if not os.path.exists(file_path):
-        # Try alternative paths
-        alternative_paths = [
-            f"/Users/ashant/magnetiq2/backend/media/{whitepaper.file.filename}",
-            f"/Users/ashant/magnetiq2/media/{whitepaper.file.filename}",
-            whitepaper.file.file_path if hasattr(whitepaper.file, 'file_path') else None
-        ]
+    if not resuming:
+        # Update download tracking
+        download_request.download_count += 1
+        download_request.downloaded_at = datetime.utcnow()
         
-        for alt_path in alternative_paths:
-            if alt_path and os.path.exists(alt_path):
-                file_path = alt_path
-                break
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="File not found on server"
-            )
+        # Update whitepaper download count
+        whitepaper.download_count = (whitepaper.download_count or 0) + 1
+        
+        await db.commit()
     
     # Generate safe filename
     safe_filename = f"{whitepaper.slug}.pdf"
     
-    return FileResponse(
-        path=file_path,
-        filename=safe_filename,
+    return file_download_response(
+        request,
+        file_path,
         media_type='application/pdf',
+        filename=safe_filename,
         headers={
-            "Content-Disposition": f"attachment; filename=\"{safe_filename}\"",
             "Cache-Control": "no-cache, no-store, must-revalidate",
             "Pragma": "no-cache",
             "Expires": "0"
@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from dataclasses import asdict
+import json
 
 from ...database import get_db
 from ...services.multilingual_content_service import MultilingualContentService
 from ...services.ai_translation_service import AITranslationService
+from ...services.content_pretranslation_service import CONTENT_FIELDS, content_pretranslation_service
+from ...services.translation_bulk_service import (
+    TranslationBulkService, IMPORT_FORMATS, EXPORT_MEDIA_TYPES, detect_format
+)
 from ...middleware.language_detection import get_current_language
+from ...dependencies import require_editor
+from ...models.user import AdminUser
 
 
 router = APIRouter()
@@ -17,6 +26,7 @@ class TranslationCreateRequest(BaseModel):
     namespace: str
     key: str
     source_text: str
+    source_language: str = 'en'
     target_language: str = 'de'
     translated_text: Optional[str] = None
     context: Optional[str] = None
@@ -40,32 +50,32 @@ class BatchTranslationRequest(BaseModel):
     source_language: str = 'en'
     target_language: str = 'de'
     context: Optional[str] = None
+    packing: Optional[bool] = None  # Pack short segments per request (default from settings)
 
 
 # Public endpoints (no auth required)
 @router.get("/public/translations/{namespace}")
 async def get_public_translations(
     namespace: str,
+    request: Request,
     language: str = Depends(get_current_language),
     db: AsyncSession = Depends(get_db)
 ):
     """Get public translations for a namespace (for frontend use)"""
     service = MultilingualContentService(db)
     
-    translations = await service.get_translations_batch(
-        namespace=namespace,
-        language=language,
-        fallback=True
-    )
-    
-    return {
-        'success': True,
-        'data': {
-            'translations': translations,
-            'language': language,
-            'namespace': namespace
-        }
+    bundle = await service.get_translation_bundle(namespace, language)
+    headers = {
+        'ETag': bundle.etag,
+        'Cache-Control': 'no-cache',  # Revalidate with If-None-Match on every load
+        'Vary': 'Accept-Language, Cookie',
+        'X-Translations-Version': str(bundle.version)
     }
+    
+    if request.headers.get('if-none-match') == bundle.etag:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=bundle.body, media_type='application/json', headers=headers)
 
 
 @router.get("/public/translation/{namespace}/{key}")
@@ -96,7 +106,7 @@ async def get_public_translation(
     }
 
 
-# Admin endpoints (simplified for now - no auth)
+# Admin endpoints
 @router.get("/admin/translations")
 async def get_translations(
     namespace: Optional[str] = Query(None),
@@ -105,6 +115,7 @@ async def get_translations(
     query: Optional[str] = Query(None),
     limit: int = Query(50, le=100),
     offset: int = Query(0),
+    current_user: AdminUser = Depends(require_editor()),
     db: AsyncSession = Depends(get_db)
 ):
     """Get translations with filtering and pagination"""
@@ -128,6 +139,7 @@ async def get_translations(
 @router.post("/admin/translations")
 async def create_translation(
     request: TranslationCreateRequest,
+    current_user: AdminUser = Depends(require_editor()),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new translation"""
@@ -138,6 +150,7 @@ async def create_translation(
             namespace=request.namespace,
             key=request.key,
             source_text=request.source_text,
+            source_language=request.source_language,
             target_language=request.target_language,
             translated_text=request.translated_text,
             context=request.context,
@@ -162,6 +175,7 @@ async def create_translation(
 async def update_translation(
     translation_id: str,
     request: TranslationUpdateRequest,
+    current_user: AdminUser = Depends(require_editor()),
     db: AsyncSession = Depends(get_db)
 ):
     """Update an existing translation"""
@@ -188,6 +202,7 @@ async def update_translation(
 @router.post("/admin/translations/ai-translate")
 async def ai_translate_text(
     request: AITranslationRequest,
+    current_user: AdminUser = Depends(require_editor()),
     db: AsyncSession = Depends(get_db)
 ):
     """Translate text using AI"""
@@ -216,6 +231,7 @@ async def ai_translate_text(
 @router.post("/admin/translations/batch-translate")
 async def batch_translate_texts(
     request: BatchTranslationRequest,
+    current_user: AdminUser = Depends(require_editor()),
     db: AsyncSession = Depends(get_db)
 ):
     """Translate multiple texts using AI"""
@@ -225,7 +241,8 @@ async def batch_translate_texts(
         texts=request.texts,
         source_language=request.source_language,
         target_language=request.target_language,
-        context=request.context
+        context=request.context,
+        packing=request.packing
     )
     
     return {
@@ -239,8 +256,115 @@ async def batch_translate_texts(
     }
 
 
+@router.post("/admin/translations/batch-translate/stream")
+async def stream_batch_translate_texts(
+    request: BatchTranslationRequest,
+    current_user: AdminUser = Depends(require_editor()),
+    db: AsyncSession = Depends(get_db)
+):
+    """Translate multiple texts using AI, streaming one NDJSON line per item as it completes"""
+    ai_service = AITranslationService(db)
+    
+    async def results():
+        async for result in ai_service.iter_batch_translate(
+            texts=request.texts,
+            source_language=request.source_language,
+            target_language=request.target_language,
+            context=request.context,
+            packing=request.packing
+        ):
+            yield json.dumps(result, default=str) + "\n"
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@router.post("/admin/translations/import")
+async def import_translations(
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None),
+    namespace: Optional[str] = Form(None),
+    source_language: str = Form('en'),
+    target_language: Optional[str] = Form(None),
+    current_user: AdminUser = Depends(require_editor()),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk import translation keys from a JSON, CSV or XLIFF file"""
+    import_format = format or detect_format(file.filename)
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported import format. Use one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    if import_format == 'json' and not (namespace and target_language):
+        raise HTTPException(
+            status_code=400,
+            detail="JSON imports need namespace and target_language"
+        )
+    
+    service = TranslationBulkService(db)
+    try:
+        result = await service.import_file(
+            file.file,
+            import_format,
+            namespace=namespace,
+            source_language=source_language,
+            target_language=target_language
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        'success': True,
+        'data': asdict(result)
+    }
+
+
+@router.get("/admin/translations/export")
+async def export_translations(
+    namespace: str,
+    language: str,
+    format: str = Query('json', pattern='^(json|csv|xliff)$'),
+    source_language: str = 'en',
+    current_user: AdminUser = Depends(require_editor()),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream all keys of a namespace and language as JSON, CSV or XLIFF"""
+    service = TranslationBulkService(db)
+    extension = 'xlf' if format == 'xliff' else format
+    
+    return StreamingResponse(
+        service.iter_export(namespace, language, format, source_language=source_language),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="{namespace}.{language}.{extension}"'}
+    )
+
+
+@router.post("/admin/translations/pretranslate/{content_type}/{content_id}")
+async def pretranslate_content(
+    content_type: str,
+    content_id: int,
+    current_user: AdminUser = Depends(require_editor())
+):
+    """Machine-translate missing and outdated segments of a page or whitepaper now"""
+    if content_type not in CONTENT_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported content type. Use one of: {', '.join(CONTENT_FIELDS)}"
+        )
+    
+    results = await content_pretranslation_service.pretranslate(content_type, content_id)
+    
+    return {
+        'success': True,
+        'data': {
+            'results': [asdict(result) for result in results]
+        }
+    }
+
+
 @router.get("/admin/translations/statistics")
 async def get_translation_statistics(
+    current_user: AdminUser = Depends(require_editor()),
     db: AsyncSession = Depends(get_db)
 ):
     """Get translation statistics for admin dashboard"""
@@ -1,11 +1,14 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field
+from pydantic import Field, field_validator
 from typing import List, Optional
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Values accepted for file_delivery_mode (see app.utils.file_delivery)
+DELIVERY_MODES = ("direct", "x-accel-redirect", "x-sendfile")
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
@@ -60,12 +63,40 @@ class Settings(BaseSettings):
     
     # File Upload
     max_file_size: int = 10485760  # 10MB
+    upload_chunk_size: int = 1048576  # Bytes read per chunk when streaming uploads to disk
     allowed_file_types: List[str] = ["jpg", "jpeg", "png", "gif", "pdf", "docx"]
     upload_dir: str = "./data/uploads"  # Updated to use data directory
+    file_delivery_mode: str = "direct"  # direct | x-accel-redirect (nginx) | x-sendfile (Apache/lighttpd)
+    file_delivery_internal_prefix: str = "/protected-uploads/"  # nginx internal location aliasing upload_dir
+    download_resume_window_seconds: int = 1800  # Range requests this soon after a counted download resume it without counting
     
     # Media Processing
     media_cache_dir: str = "./data/cache/media"
     temp_processing_dir: str = "./data/temp/processing"
+    image_processing_workers: int = 2  # Worker processes; 0 runs jobs in a thread
+    image_processing_concurrency: int = 4  # Max in-flight image jobs per app process
+    media_derivative_widths: List[int] = [150, 320, 400, 640, 800, 1024, 1200, 1600, 1920]
+    media_cache_max_bytes: int = 536870912  # 512MB of on-demand derivatives
+    
+    # Content Migration Crawler
+    crawler_max_concurrency: int = 8  # Pages in flight across all hosts
+    crawler_per_host_concurrency: int = 4  # Requests in flight per host
+    crawler_request_delay_seconds: float = 0.25  # Minimum gap per host (robots Crawl-delay wins if larger)
+    crawler_timeout_seconds: float = 30.0
+    crawler_max_pages: int = 1000
+    crawler_user_agent: str = "voltAIc Content Migrator 1.0 (Compatible)"
+    crawler_state_file: str = "./data/cache/crawler_validators.json"  # ETag/Last-Modified per URL
+    content_parser: str = "lxml"  # BeautifulSoup backend: lxml, or html.parser (pure Python)
+    content_extraction_workers: int = 2  # Worker processes for parse+analyze; 0 runs jobs in a thread
+    content_extraction_concurrency: int = 4  # Max in-flight extraction jobs per app process
+    
+    # Consultation Availability
+    availability_cache_ttl_seconds: int = 300
+    availability_max_range_days: int = 62
+    pending_booking_ttl_minutes: int = 30
+    booking_sweep_enabled: bool = True
+    booking_sweep_interval_seconds: int = 60
+    booking_sweep_batch_size: int = 200
     
     # LinkedIn OAuth
     linkedin_client_id: Optional[str] = None
@@ -74,6 +105,33 @@ class Settings(BaseSettings):
     
     # OpenAI API
     openai_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None  # Override for proxies or local test servers
+    openai_timeout_seconds: float = 60.0
+    openai_connect_timeout_seconds: float = 10.0
+    openai_max_connections: int = 20  # Pooled HTTP connections shared by all AI services of a process
+    openai_max_keepalive_connections: int = 10
+    openai_keepalive_expiry_seconds: float = 60.0
+    ai_requests_per_minute: int = 500  # Account RPM limit shared by all AI calls of a process
+    ai_tokens_per_minute: int = 40000  # Account TPM limit
+    ai_max_retries: int = 5  # Retries after 429/5xx/timeouts
+    ai_retry_base_seconds: float = 1.0  # Exponential backoff base when no Retry-After is sent
+    
+    # AI Translation
+    translation_model: str = "gpt-4"
+    translation_max_concurrency: int = 8  # In-flight completions per batch
+    translation_packing_enabled: bool = True  # Send many short segments per request
+    translation_pack_max_segments: int = 40
+    translation_pack_max_chars: int = 4000  # Source characters per packed request
+    translation_pack_segment_max_chars: int = 300  # Longer texts get their own request
+    translation_json_mode: bool = False  # response_format=json_object (gpt-4-turbo, gpt-4o and later)
+    translation_bundle_ttl_seconds: int = 300  # Rebuild cached bundles at least this often (writes in other workers)
+    translation_bundle_export_dir: str = "./data/i18n"  # Static {language}/{namespace}.json for the frontend build
+    translation_import_batch_size: int = 1000  # Rows per INSERT ... ON CONFLICT batch in bulk imports
+    
+    # Content Pre-translation
+    content_pretranslation_enabled: bool = True  # Machine-translate changed segments after admin saves
+    content_pretranslation_source_language: str = "en"
+    content_pretranslation_target_languages: List[str] = ["de"]
     
     # Consultant Settings
     kyc_upload_dir: str = "./data/kyc_documents"
@@ -88,6 +146,13 @@ class Settings(BaseSettings):
     twitter_access_token: Optional[str] = None
     twitter_access_secret: Optional[str] = None
 
+    @field_validator("file_delivery_mode")
+    @classmethod
+    def check_file_delivery_mode(cls, value: str) -> str:
+        if value not in DELIVERY_MODES:
+            raise ValueError(f"file_delivery_mode must be one of {', '.join(DELIVERY_MODES)}, got {value!r}")
+        return value
+
     def is_smtp_configured(self) -> bool:
         """Check if SMTP email is properly configured"""
         return bool(
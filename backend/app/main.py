@@ -7,9 +7,17 @@ import logging
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.database import init_db, close_db
+from app.database import init_db, close_db, AsyncSessionLocal
 from app.api.v1 import api_router
 from app.middleware.language_detection import LanguageDetectionMiddleware
+from app.services.booking_expiry_service import booking_expiry_sweeper
+from app.services.image_processing_service import image_service
+from app.services.content_extraction_service import content_extraction_service
+from app.services.media_derivative_service import derivative_service
+from app.services.translation_memory_index import translation_memory_index
+from app.services.translation_bundle_cache import translation_bundle_cache
+from app.services.content_pretranslation_service import content_pretranslation_service
+from app.services.openai_client import openai_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,10 +34,27 @@ async def lifespan(app: FastAPI):
     # Validate configuration
     settings.validate_configuration()
     
+    # Fuzzy translation memory lookups are served from memory
+    try:
+        await translation_memory_index.load_from(AsyncSessionLocal)
+    except Exception as e:
+        logger.warning(f"Translation memory index not loaded at startup: {e}")
+    
+    # One pooled OpenAI client shared by all AI services
+    openai_client.start()
+    
+    # Release slots held by unpaid bookings
+    if settings.booking_sweep_enabled:
+        booking_expiry_sweeper.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Magnetiq v2 backend...")
+    await booking_expiry_sweeper.stop()
+    image_service.shutdown()
+    content_extraction_service.shutdown()
+    await openai_client.aclose()
     await close_db()
     logger.info("Database connection closed")
 
@@ -146,6 +171,16 @@ async def detailed_health_check():
         }
         health_status["status"] = "degraded"
     
+    # Pending booking sweeper
+    health_status["services"]["booking_sweeper"] = booking_expiry_sweeper.get_metrics()
+    
+    # On-demand media derivative cache
+    health_status["services"]["media_derivatives"] = derivative_service.get_metrics()
+    health_status["services"]["translation_memory"] = translation_memory_index.get_metrics()
+    health_status["services"]["translation_bundles"] = translation_bundle_cache.get_metrics()
+    health_status["services"]["content_pretranslation"] = content_pretranslation_service.get_metrics()
+    health_status["services"]["openai"] = openai_client.get_metrics()
+    
     # File system health check
     try:
         db_path = "magnetiq.db"
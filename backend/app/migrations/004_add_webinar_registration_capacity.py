@@ -0,0 +1,55 @@
+"""
+Add denormalized registration counter and unique registration index for webinars
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add webinars.registered_count and unique (webinar_id, email) index"""
+
+    op.add_column(
+        'webinars',
+        sa.Column('registered_count', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # Drop duplicate registrations, keeping the earliest one per email
+    op.execute("""
+        DELETE FROM webinar_registrations
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM webinar_registrations GROUP BY webinar_id, email
+        )
+    """)
+
+    # Backfill counters from existing registrations
+    op.execute("""
+        UPDATE webinars SET registered_count = (
+            SELECT COUNT(*) FROM webinar_registrations
+            WHERE webinar_registrations.webinar_id = webinars.id
+        )
+    """)
+
+    op.create_index(
+        'uq_webinar_registrations_webinar_email',
+        'webinar_registrations',
+        ['webinar_id', 'email'],
+        unique=True
+    )
+
+
+def downgrade():
+    """Remove registration counter and unique index"""
+
+    op.drop_index('uq_webinar_registrations_webinar_email', 'webinar_registrations')
+    op.drop_column('webinars', 'registered_count')
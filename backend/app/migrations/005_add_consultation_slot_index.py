@@ -0,0 +1,56 @@
+"""
+Add unique active-slot index to consultation_bookings
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Cancel conflicting unpaid bookings and create the unique slot index"""
+
+    # An unpaid booking loses its slot to a confirmed or older booking.
+    # Confirmed double-bookings are left alone and will make the index
+    # creation fail so they can be resolved by hand.
+    op.execute("""
+        UPDATE consultation_bookings
+        SET booking_status = 'cancelled', cancelled_at = CURRENT_TIMESTAMP
+        WHERE booking_status = 'pending_payment'
+        AND EXISTS (
+            SELECT 1 FROM consultation_bookings AS other
+            WHERE other.id != consultation_bookings.id
+            AND other.consultant_id = consultation_bookings.consultant_id
+            AND date(other.consultation_date) = date(consultation_bookings.consultation_date)
+            AND other.time_slot = consultation_bookings.time_slot
+            AND other.booking_status IN ('pending_payment', 'confirmed')
+            AND (
+                other.booking_status = 'confirmed'
+                OR other.created_at < consultation_bookings.created_at
+                OR (other.created_at = consultation_bookings.created_at AND other.id < consultation_bookings.id)
+            )
+        )
+    """)
+
+    op.create_index(
+        'uq_consultation_bookings_active_slot',
+        'consultation_bookings',
+        ['consultant_id', sa.text('date(consultation_date)'), 'time_slot'],
+        unique=True,
+        sqlite_where=sa.text("booking_status IN ('pending_payment', 'confirmed')")
+    )
+
+
+def downgrade():
+    """Remove the unique slot index"""
+
+    op.drop_index('uq_consultation_bookings_active_slot', 'consultation_bookings')
@@ -0,0 +1,31 @@
+"""
+Add (booking_status, created_at) index for the pending booking sweeper
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18 11:00:00.000000
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create composite index used to find stale pending bookings"""
+
+    op.create_index(
+        'ix_consultation_bookings_status_created',
+        'consultation_bookings',
+        ['booking_status', 'created_at']
+    )
+
+
+def downgrade():
+    """Remove the sweeper index"""
+
+    op.drop_index('ix_consultation_bookings_status_created', 'consultation_bookings')
@@ -0,0 +1,31 @@
+"""
+Add reference counting to media files for content-addressed storage
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 13:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add media_files.reference_count; existing rows hold one reference each"""
+
+    op.add_column(
+        'media_files',
+        sa.Column('reference_count', sa.Integer(), nullable=False, server_default='1')
+    )
+
+
+def downgrade():
+    """Remove media_files.reference_count"""
+
+    op.drop_column('media_files', 'reference_count')
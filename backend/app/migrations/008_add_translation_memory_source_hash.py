@@ -0,0 +1,96 @@
+"""
+Key translation memory by a digest of the normalized source text
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 15:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import hashlib
+import re
+import unicodedata
+
+# revision identifiers
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def tm_source_hash(source_text, source_language, target_language, domain=None):
+    """
+    Digest as defined when this revision was written
+
+    A frozen copy of app.models.translation.tm_source_hash, so later changes
+    to the model cannot alter what this migration backfills.
+    """
+    text = unicodedata.normalize('NFKC', source_text or '')
+    normalized = _WHITESPACE_RE.sub(' ', text).strip().casefold()
+    key = f"{source_language}:{target_language}:{domain or ''}\n{normalized}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def upgrade():
+    """Add translation_memory.source_hash, backfill it and index (language pair, source_hash)"""
+
+    op.add_column(
+        'translation_memory',
+        sa.Column('source_hash', sa.String(64), nullable=True)
+    )
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("""
+        SELECT id, source_text, source_language, target_language, domain,
+               quality_score, usage_count, last_used
+        FROM translation_memory
+        ORDER BY quality_score DESC, last_used DESC, created_at DESC
+    """)).fetchall()
+
+    # The first row per digest is the best one; merge usage of the others into it
+    keep = {}
+    duplicates = []
+    for row in rows:
+        digest = (
+            row.source_language,
+            row.target_language,
+            tm_source_hash(row.source_text, row.source_language, row.target_language, row.domain)
+        )
+        if digest in keep:
+            keep[digest]['usage_count'] += row.usage_count or 0
+            duplicates.append(row.id)
+        else:
+            keep[digest] = {'id': row.id, 'source_hash': digest[2], 'usage_count': row.usage_count or 0}
+
+    for id_ in duplicates:
+        bind.execute(sa.text("DELETE FROM translation_memory WHERE id = :id"), {'id': id_})
+    for entry in keep.values():
+        bind.execute(
+            sa.text("UPDATE translation_memory SET source_hash = :source_hash, usage_count = :usage_count WHERE id = :id"),
+            entry
+        )
+
+    with op.batch_alter_table('translation_memory') as batch_op:
+        batch_op.alter_column('source_hash', existing_type=sa.String(64), nullable=False)
+
+    op.create_index(
+        'uq_translation_memory_source_hash',
+        'translation_memory',
+        ['source_language', 'target_language', 'source_hash'],
+        unique=True
+    )
+
+    # Full-text B-tree index is replaced by the digest index
+    op.drop_index('ix_translation_memory_source_text', 'translation_memory')
+
+
+def downgrade():
+    """Restore the source_text index and drop source_hash"""
+
+    op.create_index('ix_translation_memory_source_text', 'translation_memory', ['source_text'])
+    op.drop_index('uq_translation_memory_source_hash', 'translation_memory')
+    with op.batch_alter_table('translation_memory') as batch_op:
+        batch_op.drop_column('source_hash')
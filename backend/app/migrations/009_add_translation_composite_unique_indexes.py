@@ -0,0 +1,103 @@
+"""
+Composite unique indexes on translations and multilingual content
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18 18:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+# Best row first: furthest in the workflow, then most recently touched
+TRANSLATION_RANK = """
+    CASE status
+        WHEN 'approved' THEN 0
+        WHEN 'translated' THEN 1
+        WHEN 'reviewed' THEN 2
+        ELSE 3
+    END,
+    translated_text IS NULL,
+    updated_at DESC,
+    created_at DESC
+"""
+
+CONTENT_RANK = """
+    is_active DESC,
+    version DESC,
+    updated_at DESC,
+    created_at DESC
+"""
+
+
+def _delete_duplicates(bind, table: str, key_columns: list, rank: str) -> int:
+    """Keep the best-ranked row per key and delete the rest"""
+    columns = ', '.join(key_columns)
+    rows = bind.execute(sa.text(
+        f"SELECT id, {columns} FROM {table} ORDER BY {columns}, {rank}"
+    )).fetchall()
+
+    seen = set()
+    duplicates = []
+    for row in rows:
+        key = tuple(row[1:])
+        if key in seen:
+            duplicates.append(row.id)
+        else:
+            seen.add(key)
+
+    for id_ in duplicates:
+        bind.execute(sa.text(f"DELETE FROM {table} WHERE id = :id"), {'id': id_})
+    return len(duplicates)
+
+
+def upgrade():
+    """Dedup both tables and add the composite unique indexes"""
+
+    bind = op.get_bind()
+
+    _delete_duplicates(
+        bind, 'translations',
+        ['namespace', 'key', 'source_language', 'target_language'],
+        TRANSLATION_RANK
+    )
+    op.create_index(
+        'uq_translations_namespace_key_languages',
+        'translations',
+        ['namespace', 'key', 'source_language', 'target_language'],
+        unique=True
+    )
+    # Both are prefixes of the new index
+    op.drop_index('ix_translations_namespace_key', 'translations')
+    op.drop_index('ix_translations_namespace', 'translations')
+
+    _delete_duplicates(
+        bind, 'multilingual_content',
+        ['content_type', 'content_id', 'field_name', 'language'],
+        CONTENT_RANK
+    )
+    op.create_index(
+        'uq_multilingual_content_field_language',
+        'multilingual_content',
+        ['content_type', 'content_id', 'field_name', 'language'],
+        unique=True
+    )
+    op.drop_index('ix_multilingual_content_type_id', 'multilingual_content')
+
+
+def downgrade():
+    """Restore the single and two-column indexes"""
+
+    op.create_index('ix_multilingual_content_type_id', 'multilingual_content', ['content_type', 'content_id'])
+    op.drop_index('uq_multilingual_content_field_language', 'multilingual_content')
+
+    op.create_index('ix_translations_namespace', 'translations', ['namespace'])
+    op.create_index('ix_translations_namespace_key', 'translations', ['namespace', 'key'])
+    op.drop_index('uq_translations_namespace_key_languages', 'translations')
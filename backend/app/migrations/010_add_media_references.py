@@ -0,0 +1,46 @@
+"""
+Track which owners reference a media file
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create media_references; existing reference counts stay as unowned references"""
+
+    op.create_table(
+        'media_references',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('media_file_id', sa.Integer(), sa.ForeignKey('media_files.id'), nullable=False),
+        sa.Column('owner_type', sa.String(length=50), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index('ix_media_references_id', 'media_references', ['id'])
+    op.create_index('ix_media_references_media_file_id', 'media_references', ['media_file_id'])
+    op.create_index(
+        'uq_media_references_owner_file',
+        'media_references',
+        ['owner_type', 'owner_id', 'media_file_id'],
+        unique=True
+    )
+
+
+def downgrade():
+    """Drop media_references"""
+
+    op.drop_index('uq_media_references_owner_file', table_name='media_references')
+    op.drop_index('ix_media_references_media_file_id', table_name='media_references')
+    op.drop_index('ix_media_references_id', table_name='media_references')
+    op.drop_table('media_references')
@@ -1,5 +1,5 @@
 from .user import AdminUser, UserSession
-from .content import Page, MediaFile
+from .content import Page, MediaFile, MediaReference
 from .business import (
     Webinar, WebinarRegistration, Whitepaper, WhitepaperDownload, 
     BookAMeeting, ConsultationBooking, ConsultationBookingStatus, PaymentStatus
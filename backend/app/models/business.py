@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Boolean, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Boolean, ForeignKey, Numeric, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -20,6 +20,8 @@ class Webinar(Base):
     duration_minutes = Column(Integer, default=60)
     timezone = Column(String(50), default='UTC')
     max_participants = Column(Integer)
+    # Denormalized registration counter, incremented atomically on register
+    registered_count = Column(Integer, nullable=False, default=0, server_default='0')
     
     # URLs & Configuration
     meeting_url = Column(String(500))
@@ -81,6 +83,11 @@ class WebinarRegistration(Base):
     # Relationships
     webinar = relationship("Webinar", backref="registrations")
 
+    __table_args__ = (
+        # One registration per email and webinar
+        Index('uq_webinar_registrations_webinar_email', 'webinar_id', 'email', unique=True),
+    )
+
 
 class Whitepaper(Base):
     __tablename__ = "whitepapers"
@@ -236,6 +243,14 @@ class ConsultationBookingStatus(str, Enum):
     CANCELLED = "cancelled"
     COMPLETED = "completed"
     NO_SHOW = "no_show"
+    EXPIRED = "expired"
+
+
+# Statuses that hold a consultant's time slot
+ACTIVE_BOOKING_STATUSES = (
+    ConsultationBookingStatus.PENDING_PAYMENT,
+    ConsultationBookingStatus.CONFIRMED,
+)
 
 
 class PaymentStatus(str, Enum):
@@ -320,4 +335,20 @@ class ConsultationBooking(Base):
     
     # Relationships
     consultant = relationship("Consultant", backref="consultation_bookings")
-    assigned_admin = relationship("AdminUser", backref="managed_consultations")
\ No newline at end of file
+    assigned_admin = relationship("AdminUser", backref="managed_consultations")
+
+    __table_args__ = (
+        # A slot can only be held by one active booking per consultant and day.
+        # Partial expression index as created by migration 005 (SQLite only:
+        # date() over a timezone-aware column cannot be indexed on PostgreSQL)
+        Index(
+            'uq_consultation_bookings_active_slot',
+            consultant_id,
+            func.date(consultation_date),
+            time_slot,
+            unique=True,
+            sqlite_where=booking_status.in_([status.value for status in ACTIVE_BOOKING_STATUSES])
+        ),
+        # Expiry sweeper scans pending bookings oldest first
+        Index('ix_consultation_bookings_status_created', 'booking_status', 'created_at'),
+    )
\ No newline at end of file
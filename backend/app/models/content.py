@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -54,7 +54,8 @@ class MediaFile(Base):
     file_path = Column(String(500), nullable=False)
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String(100), nullable=False, index=True)
-    file_hash = Column(String(64), nullable=False, index=True)  # SHA-256 hash
+    file_hash = Column(String(64), nullable=False, index=True)  # SHA-256 of the source bytes
+    reference_count = Column(Integer, nullable=False, default=1, server_default='1')  # Uses sharing this file
     
     # Metadata
     title = Column(JSON)  # JSON for multilingual titles
@@ -78,4 +79,23 @@ class MediaFile(Base):
     deleted_at = Column(DateTime(timezone=True))
 
     # Relationships
-    uploader = relationship("AdminUser", backref="uploaded_files")
\ No newline at end of file
+    uploader = relationship("AdminUser", backref="uploaded_files")
+
+
+class MediaReference(Base):
+    """One owner (page, ...) using a MediaFile; each row holds one of its reference_count"""
+    __tablename__ = "media_references"
+
+    id = Column(Integer, primary_key=True, index=True)
+    media_file_id = Column(Integer, ForeignKey("media_files.id"), nullable=False, index=True)
+    owner_type = Column(String(50), nullable=False)
+    owner_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    media_file = relationship("MediaFile", backref="references")
+
+    __table_args__ = (
+        # An owner references a file at most once
+        Index('uq_media_references_owner_file', 'owner_type', 'owner_id', 'media_file_id', unique=True),
+    )
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Numeric, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.sqlite import JSON
 import uuid
+import re
+import hashlib
+import unicodedata
 from datetime import datetime
 from typing import Dict, Any, Optional
 from sqlalchemy.sql import func
@@ -15,7 +18,7 @@ class Translation(Base):
     __tablename__ = "translations"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    namespace = Column(String(100), nullable=False, index=True)
+    namespace = Column(String(100), nullable=False)
     key = Column(String(200), nullable=False, index=True)
     source_language = Column(String(2), nullable=False, default='en')
     target_language = Column(String(2), nullable=False, index=True)
@@ -37,7 +40,13 @@ class Translation(Base):
     # reviewer = relationship("AdminUser", foreign_keys=[reviewer_id])
     
     __table_args__ = (
-        # Unique constraint for namespace, key, source_language, target_language
+        # One row per key and language pair; its (namespace, key) prefix serves
+        # namespace bundles and key lookups
+        Index(
+            'uq_translations_namespace_key_languages',
+            'namespace', 'key', 'source_language', 'target_language',
+            unique=True
+        ),
         {'extend_existing': True}
     )
     
@@ -66,7 +75,13 @@ class MultilingualContent(Base):
     # creator = relationship("AdminUser")
     
     __table_args__ = (
-        # Unique constraint for content_type, content_id, field_name, language
+        # One row per field and language; its (content_type, content_id) prefix
+        # serves whole-item lookups
+        Index(
+            'uq_multilingual_content_field_language',
+            'content_type', 'content_id', 'field_name', 'language',
+            unique=True
+        ),
         {'extend_existing': True}
     )
     
@@ -74,11 +89,41 @@ class MultilingualContent(Base):
         return f"<MultilingualContent(id='{self.id}', type='{self.content_type}', lang='{self.language}')>"
 
 
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Normalize a TM source string: NFKC, case-folded, single-spaced"""
+    text = unicodedata.normalize('NFKC', text or '')
+    return _WHITESPACE_RE.sub(' ', text).strip().casefold()
+
+
+def tm_source_hash(
+    source_text: str,
+    source_language: str,
+    target_language: str,
+    domain: Optional[str] = None
+) -> str:
+    """SHA-256 over normalized source text, language pair and domain"""
+    key = f"{source_language}:{target_language}:{domain or ''}\n{normalize_text(source_text)}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _default_source_hash(context) -> str:
+    params = context.get_current_parameters()
+    return tm_source_hash(
+        params['source_text'], params['source_language'],
+        params['target_language'], params.get('domain')
+    )
+
+
 class TranslationMemory(Base):
     __tablename__ = "translation_memory"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    source_text = Column(Text, nullable=False, index=True)
+    source_text = Column(Text, nullable=False)
+    # Digest of normalized text + language pair + domain, see tm_source_hash
+    source_hash = Column(String(64), nullable=False, default=_default_source_hash)
     translated_text = Column(Text, nullable=False)
     source_language = Column(String(2), nullable=False)
     target_language = Column(String(2), nullable=False)
@@ -89,6 +134,11 @@ class TranslationMemory(Base):
     last_used = Column(DateTime)
     created_at = Column(DateTime, default=func.now())
     
+    __table_args__ = (
+        # Exact TM hits are a single point lookup on this index
+        Index('uq_translation_memory_source_hash', 'source_language', 'target_language', 'source_hash', unique=True),
+    )
+    
     def __repr__(self):
         return f"<TranslationMemory(id='{self.id}', {self.source_language}->{self.target_language}, quality={self.quality_score})>"
 
@@ -50,6 +50,7 @@ class WebinarResponse(BaseModel):
     duration_minutes: int
     timezone: str
     max_participants: Optional[int] = None
+    registered_count: int = 0
     meeting_url: Optional[str] = None
     recording_url: Optional[str] = None
     presenter_name: Optional[str] = None
@@ -1,5 +1,5 @@
 from typing import Dict, Any, List, Optional
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DEFAULT_MAX_RETRIES
 import json
 import asyncio
 import logging
@@ -9,15 +9,18 @@ from sqlalchemy import select
 
 from ..config import settings
 from ..models.consultant import Consultant
+from .openai_client import openai_client
 
 logger = logging.getLogger(__name__)
 
 
 class AIProfileGenerationService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, client: Optional[AsyncOpenAI] = None):
         self.db = db
-        self.api_key = settings.openai_api_key
-        self.client = AsyncOpenAI(api_key=self.api_key) if self.api_key else None
+        # Shares the process-wide connection pool; profile calls bypass the
+        # translation rate limiter, so they keep the SDK's own retries
+        shared = openai_client.client
+        self.client = client or (shared.with_options(max_retries=DEFAULT_MAX_RETRIES) if shared else None)
         self.model = "gpt-4-turbo-preview"
         self.temperature = 0.7  # Creative but consistent
 
@@ -168,7 +171,9 @@ LinkedIn Data Context:
 Create a compelling professional summary that positions this consultant as a premium expert on the voltAIc platform."""
 
         try:
-            response = await self.client.chat.completions.create(
+            response = await openai_client.create_chat_completion(
+                self.client,
+                'profile_summary',
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -225,7 +230,9 @@ Additional Context:
 Generate a comprehensive skills assessment focusing on AI/digital transformation readiness and consulting capabilities."""
 
         try:
-            response = await self.client.chat.completions.create(
+            response = await openai_client.create_chat_completion(
+                self.client,
+                'profile_skills',
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -283,7 +290,9 @@ Rate: {context['rate_range'] or 'Premium pricing'}
 Position this consultant as a premium expert who delivers exceptional ROI through AI-enhanced solutions."""
 
         try:
-            response = await self.client.chat.completions.create(
+            response = await openai_client.create_chat_completion(
+                self.client,
+                'profile_positioning',
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -324,7 +333,9 @@ Experience level: {context['basic_info']['years_experience']} years
 Focus on terms that potential clients would search for when looking for this type of consultant."""
 
         try:
-            response = await self.client.chat.completions.create(
+            response = await openai_client.create_chat_completion(
+                self.client,
+                'profile_keywords',
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -368,7 +379,7 @@ Focus on terms that potential clients would search for when looking for this typ
     ) -> Dict[str, Any]:
         """Generate multiple profile variations for A/B testing"""
         
-        if not self.api_key:
+        if not self.client:
             return {
                 'success': False,
                 'error': 'AI service not configured'
@@ -419,7 +430,9 @@ Experience: {context['basic_info']['years_experience']} years
 Specializations: {context['specializations']}"""
 
         try:
-            response = await self.client.chat.completions.create(
+            response = await openai_client.create_chat_completion(
+                self.client,
+                'profile_styled_summary',
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -0,0 +1,116 @@
+from typing import Dict, Any, Optional
+from dataclasses import dataclass, asdict
+import asyncio
+import time
+import logging
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at rate_per_minute
+
+    Waiters are served in arrival order: the lock is held while sleeping for
+    the refill, so a large request is not starved by a stream of small ones.
+    The level may go negative when actual usage exceeds an estimate, which
+    simply delays later acquisitions.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Take amount tokens, sleeping until available; returns seconds waited"""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return waited
+                delay = (amount - self.level) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def adjust(self, amount: float) -> None:
+        """Give back (positive) or charge extra (negative) tokens"""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+@dataclass
+class RateLimiterMetrics:
+    """Counters exposed by the AI rate limiter"""
+    requests: int = 0
+    throttled: int = 0
+    throttle_seconds: float = 0.0
+    rate_limited: int = 0
+    pauses: int = 0
+
+
+class AIRateLimiter:
+    """
+    Request and token budget shared by all AI calls of a process
+
+    Each call first waits out any pause set after a 429, then takes one
+    request from the RPM bucket and its estimated tokens from the TPM bucket.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = settings.ai_requests_per_minute,
+        tokens_per_minute: int = settings.ai_tokens_per_minute
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self.metrics = RateLimiterMetrics()
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        waited = 0.0
+        while True:
+            remaining = self._paused_until - time.monotonic()
+            if remaining <= 0:
+                break
+            waited += remaining
+            await asyncio.sleep(remaining)
+        waited += await self.requests.acquire(1)
+        waited += await self.tokens.acquire(estimated_tokens)
+
+        self.metrics.requests += 1
+        if waited > 0:
+            self.metrics.throttled += 1
+            self.metrics.throttle_seconds += waited
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Correct the token bucket once the real usage is known"""
+        if actual_tokens is not None:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller after the API answered 429"""
+        self.metrics.rate_limited += 1
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            self.metrics.pauses += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return asdict(self.metrics)
+
+
+# Global instance
+ai_rate_limiter = AIRateLimiter()
@@ -1,24 +1,55 @@
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, AsyncIterator
+from openai import AsyncOpenAI
 import openai
 import asyncio
 import json
+import logging
+import random
 import re
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-from ..models.translation import TranslationMemory
+from ..models.translation import TranslationMemory, tm_source_hash
 from ..config import settings
+from .translation_memory_index import TMCandidate, TranslationMemoryIndex, translation_memory_index
+from .ai_rate_limiter import AIRateLimiter, ai_rate_limiter
+from .openai_client import openai_client
+
+logger = logging.getLogger(__name__)
+
+# Errors worth another attempt (APITimeoutError is an APIConnectionError)
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+PACKED_OUTPUT_INSTRUCTIONS = """The user message is a JSON object {"segments": [{"id": "...", "text": "..."}]}.
+Translate every segment independently; segments are separate UI strings, do not merge, split or reorder them.
+Respond with ONLY a JSON object {"translations": [{"id": "...", "text": "..."}]} containing exactly one entry per input id, with the same ids."""
+
+_JSON_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
 
 
 class AITranslationService:
-    def __init__(self, db: Session, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        db: AsyncSession,
+        tm_index: Optional[TranslationMemoryIndex] = None,
+        client: Optional[AsyncOpenAI] = None,
+        rate_limiter: Optional[AIRateLimiter] = None
+    ):
         self.db = db
-        self.api_key = api_key or getattr(settings, 'OPENAI_API_KEY', None)
-        if self.api_key:
-            openai.api_key = self.api_key
+        self.tm_index = tm_index or translation_memory_index
+        # Process-wide pooled client; it does not retry, retries are handled
+        # here so they go through the shared rate limiter
+        self.client = client or openai_client.client
+        self.rate_limiter = rate_limiter or ai_rate_limiter
+        self.model = settings.translation_model
+        self.max_concurrency = settings.translation_max_concurrency
         self.supported_languages = ['en', 'de']
         self.max_tokens = 2000
         self.temperature = 0.1  # Low temperature for consistency
+        # One AsyncSession must not be used by concurrent translations
+        self._db_lock = asyncio.Lock()
     
     async def translate_text(
         self,
@@ -30,7 +61,7 @@ class AITranslationService:
     ) -> Dict[str, Any]:
         """Translate text using AI with context awareness and translation memory"""
         
-        if not self.api_key:
+        if not self.client:
             return {
                 'error': 'AI translation service not configured',
                 'success': False
@@ -44,53 +75,76 @@ class AITranslationService:
             }
         
         # Check translation memory first
-        memory_match = await self.find_translation_memory_match(
-            text, source_language, target_language
-        )
+        async with self._db_lock:
+            memory_match = await self.find_translation_memory_match(
+                text, source_language, target_language, domain=domain
+            )
         
         if memory_match and memory_match['similarity'] > 0.95:
+            return self._memory_result(memory_match)
+        
+        try:
+            return await self._translate_with_ai(text, source_language, target_language, context, domain)
+        
+        except Exception as e:
             return {
-                'translated_text': memory_match['translation'],
-                'confidence': memory_match['similarity'],
-                'method': 'translation_memory',
-                'cached': True,
-                'success': True
+                'error': str(e),
+                'method': 'ai_translation',
+                'success': False
             }
+    
+    async def _translate_with_ai(
+        self,
+        text: str,
+        source_language: str,
+        target_language: str,
+        context: Optional[str],
+        domain: str
+    ) -> Dict[str, Any]:
+        """Call the model for one text, validate the output and store it in translation memory"""
         
-        try:
-            # Prepare prompts
-            system_prompt = self.build_system_prompt(
-                source_language, target_language, domain, context
-            )
-            
-            user_prompt = self.build_user_prompt(text, context)
-            
-            # Make API call to OpenAI
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                presence_penalty=0.1,
-                frequency_penalty=0.1
-            )
-            
-            translated_text = response.choices[0].message.content.strip()
-            
-            # Clean up the translation (remove quotes if wrapped)
-            translated_text = self.clean_translation_output(translated_text)
-            
-            # Validate translation quality
-            quality_issues = await self.validate_translation_quality(
-                text, translated_text, source_language, target_language
-            )
-            
-            confidence = self.calculate_confidence_score(quality_issues, response)
-            
-            # Store in translation memory for future use
+        # Prepare prompts
+        system_prompt = self.build_system_prompt(
+            source_language, target_language, domain, context
+        )
+        
+        user_prompt = self.build_user_prompt(text, context)
+        
+        response = await self._create_completion(system_prompt, user_prompt, text)
+        
+        translated_text = response.choices[0].message.content.strip()
+        
+        # Clean up the translation (remove quotes if wrapped)
+        translated_text = self.clean_translation_output(translated_text)
+        
+        return await self._finish_translation(
+            text, translated_text, source_language, target_language, context, domain,
+            response, method='ai_translation', tokens_used=response.usage.total_tokens
+        )
+    
+    async def _finish_translation(
+        self,
+        text: str,
+        translated_text: str,
+        source_language: str,
+        target_language: str,
+        context: Optional[str],
+        domain: str,
+        response,
+        method: str,
+        tokens_used: int
+    ) -> Dict[str, Any]:
+        """Score a model translation and store it in translation memory"""
+        
+        # Validate translation quality
+        quality_issues = await self.validate_translation_quality(
+            text, translated_text, source_language, target_language
+        )
+        
+        confidence = self.calculate_confidence_score(quality_issues, response)
+        
+        # Store in translation memory for future use
+        async with self._db_lock:
             await self.store_translation_memory(
                 source_text=text,
                 translated_text=translated_text,
@@ -100,31 +154,174 @@ class AITranslationService:
                 quality_score=confidence,
                 domain=domain
             )
-            
-            return {
-                'translated_text': translated_text,
-                'confidence': confidence,
-                'method': 'ai_translation',
-                'model': 'gpt-4',
-                'tokens_used': response.usage.total_tokens,
-                'quality_issues': quality_issues,
-                'cached': False,
-                'success': True
-            }
         
-        except Exception as e:
-            return {
-                'error': str(e),
-                'method': 'ai_translation',
-                'success': False
-            }
+        return {
+            'translated_text': translated_text,
+            'confidence': confidence,
+            'method': method,
+            'model': self.model,
+            'tokens_used': tokens_used,
+            'quality_issues': quality_issues,
+            'cached': False,
+            'success': True
+        }
+    
+    async def _translate_packed(
+        self,
+        texts: List[str],
+        source_language: str,
+        target_language: str,
+        context: Optional[str],
+        domain: str
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Translate several short segments with one completion
+        
+        Returns results keyed by position in texts. Segments the model
+        dropped, renamed or left empty are missing from the result so the
+        caller can retry them one by one.
+        """
+        
+        system_prompt = self.build_system_prompt(
+            source_language, target_language, domain, context, packed=True
+        )
+        user_prompt = json.dumps(
+            {'segments': [{'id': str(i), 'text': text} for i, text in enumerate(texts)]},
+            ensure_ascii=False
+        )
+        joined = '\n'.join(texts)
+        
+        response = await self._create_completion(
+            system_prompt,
+            user_prompt,
+            joined,
+            # Room for the JSON envelope around every segment
+            max_tokens=min(4096, 2 * self.estimate_tokens(joined) + 16 * len(texts) + 64),
+            response_format={'type': 'json_object'} if settings.translation_json_mode else None
+        )
+        
+        translations = self.parse_packed_response(response.choices[0].message.content, len(texts))
+        tokens_used = response.usage.total_tokens // len(texts) if response.usage else 0
+        
+        results = {}
+        for position, translated_text in translations.items():
+            results[position] = await self._finish_translation(
+                texts[position], self.clean_translation_output(translated_text),
+                source_language, target_language, context, domain,
+                response, method='ai_translation_packed', tokens_used=tokens_used
+            )
+        return results
+    
+    @staticmethod
+    def parse_packed_response(content: str, count: int) -> Dict[int, str]:
+        """Map segment positions to translations, keeping only well-formed, aligned entries"""
+        try:
+            payload = json.loads(_JSON_FENCE_RE.sub('', (content or '').strip()))
+        except json.JSONDecodeError:
+            return {}
+        
+        entries = payload.get('translations') if isinstance(payload, dict) else None
+        if not isinstance(entries, list):
+            return {}
+        
+        translations = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            segment_id, text = entry.get('id'), entry.get('text')
+            try:
+                position = int(segment_id)
+            except (TypeError, ValueError):
+                continue
+            if 0 <= position < count and isinstance(text, str) and text.strip() and position not in translations:
+                translations[position] = text
+        return translations
+    
+    async def _create_completion(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        text: str,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, str]] = None
+    ):
+        """Chat completion under the shared rate limiter, retrying 429s and transient errors"""
+        
+        max_tokens = max_tokens or self.max_tokens
+        # Budget prompt plus an output about twice the source length
+        estimated_tokens = (
+            self.estimate_tokens(system_prompt + user_prompt)
+            + min(max_tokens, 2 * self.estimate_tokens(text) + 32)
+        )
+        extra = {'response_format': response_format} if response_format else {}
+        
+        for attempt in range(settings.ai_max_retries + 1):
+            await self.rate_limiter.acquire(estimated_tokens)
+            try:
+                response = await openai_client.create_chat_completion(
+                    self.client,
+                    'translation',
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    presence_penalty=0.1,
+                    frequency_penalty=0.1,
+                    **extra
+                )
+            except RETRYABLE_ERRORS as e:
+                if attempt >= settings.ai_max_retries:
+                    raise
+                delay = self.retry_delay(e, attempt)
+                if isinstance(e, openai.RateLimitError):
+                    # Every in-flight translation backs off, not just this one
+                    self.rate_limiter.pause(delay)
+                logger.warning(f"Translation request failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            usage = getattr(response, 'usage', None)
+            self.rate_limiter.record_usage(estimated_tokens, usage.total_tokens if usage else None)
+            return response
+    
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count (about four characters per token)"""
+        return len(text) // 4 + 1
+    
+    @staticmethod
+    def retry_delay(error: Exception, attempt: int) -> float:
+        """Seconds to wait: the server's Retry-After if given, else jittered exponential backoff"""
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), 60.0)
+            except ValueError:
+                pass
+        backoff = settings.ai_retry_base_seconds * (2 ** attempt)
+        return min(backoff * (1 + random.random() * 0.25), 60.0)
+    
+    @staticmethod
+    def _memory_result(memory_match: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'translated_text': memory_match['translation'],
+            'confidence': memory_match['similarity'],
+            'method': 'translation_memory',
+            'cached': True,
+            'success': True
+        }
     
     def build_system_prompt(
         self,
         source_lang: str,
         target_lang: str,
         domain: str,
-        context: Optional[str]
+        context: Optional[str],
+        packed: bool = False
     ) -> str:
         """Build context-aware system prompt for AI translation"""
         
@@ -150,13 +347,18 @@ Special considerations for German:
 
 Always preserve exactly:
 - HTML tags and attributes (e.g., <div class="...">)
-- Placeholder variables (e.g., {{name}}, {variable}, %s)
+- Placeholder variables (e.g., {{{{name}}}}, {{variable}}, %s)
 - URLs, email addresses, and links
 - Brand names: "voltAIc Systems" (keep exact capitalization)
 - Technical terms where established (API, JSON, etc.)
 - Markdown formatting (*bold*, **emphasis**, etc.)
 
-Return ONLY the translated text without explanations or quotes."""
+"""
+        
+        if packed:
+            prompt += PACKED_OUTPUT_INSTRUCTIONS
+        else:
+            prompt += "Return ONLY the translated text without explanations or quotes."
         
         if context:
             prompt += f"\n\nAdditional context for this translation: {context}"
@@ -315,31 +517,59 @@ Return ONLY the translated text without explanations or quotes."""
         text: str,
         source_language: str,
         target_language: str,
-        threshold: float = 0.85
+        threshold: float = 0.85,
+        domain: str = 'business'
     ) -> Optional[Dict[str, Any]]:
-        """Find similar translation in translation memory"""
-        
-        # Simple exact match for now - in production, use fuzzy matching
-        memory_entry = self.db.query(TranslationMemory).filter(
-            TranslationMemory.source_text == text,
-            TranslationMemory.source_language == source_language,
-            TranslationMemory.target_language == target_language
-        ).first()
-        
-        if memory_entry:
-            # Update usage statistics
-            memory_entry.usage_count += 1
-            memory_entry.last_used = datetime.now()
-            self.db.commit()
-            
-            return {
-                'translation': memory_entry.translated_text,
-                'similarity': 1.0,  # Exact match
-                'quality_score': float(memory_entry.quality_score or 0.8),
-                'usage_count': memory_entry.usage_count
-            }
-        
-        return None
+        """Find the most similar translation in translation memory"""
+        
+        # Exact hit: one point lookup on the (language pair, source_hash) index
+        result = await self.db.execute(
+            select(
+                TranslationMemory.id,
+                TranslationMemory.source_text,
+                TranslationMemory.translated_text,
+                TranslationMemory.quality_score
+            ).where(
+                TranslationMemory.source_language == source_language,
+                TranslationMemory.target_language == target_language,
+                TranslationMemory.source_hash == tm_source_hash(text, source_language, target_language, domain)
+            )
+        )
+        row = result.first()
+        
+        if row:
+            match = TMCandidate(
+                entry_id=row.id,
+                source_text=row.source_text,
+                translation=row.translated_text,
+                similarity=1.0,
+                quality_score=float(row.quality_score if row.quality_score is not None else 0.8)
+            )
+        else:
+            # Near matches come from the in-memory fuzzy index
+            await self.tm_index.ensure_loaded(self.db)
+            match = self.tm_index.best_match(text, source_language, target_language, threshold, domain)
+        
+        if not match:
+            return None
+        
+        # Update usage statistics
+        await self.db.execute(
+            update(TranslationMemory)
+            .where(TranslationMemory.id == match.entry_id)
+            .values(
+                usage_count=func.coalesce(TranslationMemory.usage_count, 0) + 1,
+                last_used=datetime.now()
+            )
+        )
+        await self.db.commit()
+        
+        return {
+            'translation': match.translation,
+            'source_text': match.source_text,
+            'similarity': match.similarity,
+            'quality_score': match.quality_score
+        }
     
     async def store_translation_memory(
         self,
@@ -353,79 +583,195 @@ Return ONLY the translated text without explanations or quotes."""
     ):
         """Store translation in translation memory"""
         
-        # Check if entry already exists
-        existing = self.db.query(TranslationMemory).filter(
-            TranslationMemory.source_text == source_text,
-            TranslationMemory.source_language == source_language,
-            TranslationMemory.target_language == target_language
-        ).first()
-        
-        if existing:
-            # Update existing entry with better quality score
-            if quality_score > (existing.quality_score or 0):
-                existing.translated_text = translated_text
-                existing.quality_score = quality_score
-                existing.context = context
-                existing.domain = domain
-        else:
-            # Create new entry
-            memory_entry = TranslationMemory(
-                source_text=source_text,
-                translated_text=translated_text,
-                source_language=source_language,
-                target_language=target_language,
-                context=context,
-                quality_score=quality_score,
-                domain=domain,
-                usage_count=0
-            )
-            self.db.add(memory_entry)
+        # Upsert on the source_hash index; an existing entry is only
+        # replaced by a translation with a better quality score
+        statement = sqlite_insert(TranslationMemory).values(
+            source_text=source_text,
+            source_hash=tm_source_hash(source_text, source_language, target_language, domain),
+            translated_text=translated_text,
+            source_language=source_language,
+            target_language=target_language,
+            context=context,
+            quality_score=quality_score,
+            domain=domain,
+            usage_count=0
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=['source_language', 'target_language', 'source_hash'],
+            set_={
+                'translated_text': statement.excluded.translated_text,
+                'quality_score': statement.excluded.quality_score,
+                'context': statement.excluded.context
+            },
+            where=statement.excluded.quality_score > func.coalesce(TranslationMemory.quality_score, 0)
+        ).returning(
+            TranslationMemory.id,
+            TranslationMemory.source_text,
+            TranslationMemory.translated_text,
+            TranslationMemory.quality_score
+        )
+        
+        result = await self.db.execute(statement)
+        row = result.first()
+        await self.db.commit()
         
-        self.db.commit()
+        # Keep the fuzzy index in step with the table (no row: existing entry kept)
+        if row:
+            self.tm_index.add(
+                row.id, row.source_text, row.translated_text, source_language, target_language,
+                float(row.quality_score) if row.quality_score is not None else None,
+                domain
+            )
+    
+    async def iter_batch_translate(
+        self,
+        texts: List[Dict[str, str]],
+        source_language: str,
+        target_language: str,
+        context: Optional[str] = None,
+        packing: Optional[bool] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Translate many texts, yielding each item's result as soon as it is ready
+        
+        Identical inputs are translated once, translation memory hits are
+        answered first, and the remaining texts run concurrently (at most
+        max_concurrency in flight) under the shared rate limiter. With
+        packing (default: translation_packing_enabled) short segments are
+        sent many per request as JSON; segments missing from a packed answer
+        are retried singly. Results carry the item 'id' and its 'index' in texts.
+        """
+        
+        if not self.client or source_language not in self.supported_languages \
+                or target_language not in self.supported_languages:
+            error = (
+                'AI translation service not configured' if not self.client
+                else f'Unsupported language pair: {source_language}->{target_language}'
+            )
+            for index, item in enumerate(texts):
+                yield {'id': item.get('id'), 'index': index, 'error': error, 'success': False}
+            return
+        
+        # Deduplicate: one translation per (text, context, domain)
+        groups: Dict[Tuple[str, Optional[str], str], List[int]] = {}
+        for index, item in enumerate(texts):
+            key = (item['text'], context or item.get('context'), item.get('domain', 'business'))
+            groups.setdefault(key, []).append(index)
+        
+        # Translation memory first; these never reach the API
+        pending = []
+        for key, indices in groups.items():
+            text, item_context, domain = key
+            async with self._db_lock:
+                memory_match = await self.find_translation_memory_match(
+                    text, source_language, target_language, domain=domain
+                )
+            if memory_match and memory_match['similarity'] > 0.95:
+                result = self._memory_result(memory_match)
+                for index in indices:
+                    yield self._batch_item(texts, index, result)
+            else:
+                pending.append(key)
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run_single(key):
+            text, item_context, domain = key
+            async with semaphore:
+                try:
+                    result = await self._translate_with_ai(
+                        text, source_language, target_language, item_context, domain
+                    )
+                except Exception as e:
+                    result = {'error': str(e), 'method': 'ai_translation', 'success': False}
+            return [(key, result)], []
+        
+        async def run_pack(keys):
+            _, item_context, domain = keys[0]
+            async with semaphore:
+                try:
+                    results = await self._translate_packed(
+                        [key[0] for key in keys], source_language, target_language, item_context, domain
+                    )
+                except Exception as e:
+                    logger.warning(f"Packed translation of {len(keys)} segments failed, retrying singly: {e}")
+                    results = {}
+            done = [(keys[position], result) for position, result in results.items()]
+            # Misaligned or missing segments fall back to one call each
+            return done, [key for position, key in enumerate(keys) if position not in results]
+        
+        use_packing = settings.translation_packing_enabled if packing is None else packing
+        packs, singles = self.plan_packs(pending) if use_packing else ([], pending)
+        tasks = {asyncio.create_task(run_pack(keys)) for keys in packs}
+        tasks.update(asyncio.create_task(run_single(key)) for key in singles)
+        try:
+            while tasks:
+                finished, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    done, retry = task.result()
+                    for key, result in done:
+                        for index in groups[key]:
+                            yield self._batch_item(texts, index, result)
+                    tasks.update(asyncio.create_task(run_single(key)) for key in retry)
+        finally:
+            # Consumer stopped early (e.g. client disconnected)
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    def plan_packs(keys: List[Tuple[str, Optional[str], str]]) -> Tuple[List[List[Tuple]], List[Tuple]]:
+        """
+        Group short segments sharing context and domain into packs
+        
+        Returns (packs, singles); long texts and packs that would hold a
+        single segment are translated with their own request.
+        """
+        packs, singles = [], []
+        open_packs: Dict[Tuple[Optional[str], str], List[Tuple]] = {}
+        open_chars: Dict[Tuple[Optional[str], str], int] = {}
+        
+        for key in keys:
+            text, item_context, domain = key
+            if len(text) > settings.translation_pack_segment_max_chars:
+                singles.append(key)
+                continue
+            group = (item_context, domain)
+            current = open_packs.setdefault(group, [])
+            if current and (
+                len(current) >= settings.translation_pack_max_segments
+                or open_chars[group] + len(text) > settings.translation_pack_max_chars
+            ):
+                packs.append(current)
+                current = open_packs[group] = []
+            if not current:
+                open_chars[group] = 0
+            current.append(key)
+            open_chars[group] += len(text)
+        
+        for current in open_packs.values():
+            if len(current) > 1:
+                packs.append(current)
+            else:
+                singles.extend(current)
+        return packs, singles
+    
+    @staticmethod
+    def _batch_item(texts: List[Dict[str, str]], index: int, result: Dict[str, Any]) -> Dict[str, Any]:
+        return {**result, 'id': texts[index].get('id'), 'index': index}
     
     async def batch_translate(
         self,
         texts: List[Dict[str, str]],
         source_language: str,
         target_language: str,
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        packing: Optional[bool] = None
     ) -> List[Dict[str, Any]]:
-        """Translate multiple texts efficiently"""
-        
-        results = []
+        """Translate multiple texts efficiently, results in input order"""
         
-        # Process texts in batches to avoid API limits
-        batch_size = 5
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_tasks = []
-            
-            for text_item in batch:
-                task = self.translate_text(
-                    text_item['text'],
-                    source_language,
-                    target_language,
-                    context=context or text_item.get('context'),
-                    domain=text_item.get('domain', 'business')
-                )
-                batch_tasks.append(task)
-            
-            # Execute batch concurrently
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-            
-            for j, result in enumerate(batch_results):
-                if isinstance(result, Exception):
-                    results.append({
-                        'id': texts[i + j].get('id'),
-                        'error': str(result),
-                        'success': False
-                    })
-                else:
-                    result['id'] = texts[i + j].get('id')
-                    results.append(result)
-            
-            # Small delay to avoid rate limiting
-            if i + batch_size < len(texts):
-                await asyncio.sleep(1)
-        
-        return results
\ No newline at end of file
+        results = [
+            result async for result in self.iter_batch_translate(
+                texts, source_language, target_language, context, packing
+            )
+        ]
+        return sorted(results, key=lambda result: result['index'])
@@ -0,0 +1,168 @@
+from typing import Optional, Dict, Any, Callable, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, and_
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+import asyncio
+import time
+import logging
+
+from ..models.business import ConsultationBooking, ConsultationBookingStatus
+from ..database import AsyncSessionLocal
+from ..config import settings
+from .consultation_booking_service import availability_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SweeperMetrics:
+    """Counters exposed by the pending booking sweeper"""
+    runs: int = 0
+    failed_runs: int = 0
+    expired_total: int = 0
+    last_expired: int = 0
+    last_batches: int = 0
+    last_duration_ms: float = 0.0
+    last_run_at: Optional[str] = None
+    last_error: Optional[str] = None
+
+
+class BookingExpirySweeper:
+    """
+    Background task expiring unpaid consultation bookings
+
+    Bookings left in PENDING_PAYMENT longer than the TTL are moved to EXPIRED
+    in small batches, which releases their slot in the unique active-slot
+    index and keeps the availability queries working on live bookings only.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        ttl_minutes: int = settings.pending_booking_ttl_minutes,
+        interval_seconds: int = settings.booking_sweep_interval_seconds,
+        batch_size: int = settings.booking_sweep_batch_size
+    ):
+        self.session_factory = session_factory
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.metrics = SweeperMetrics()
+        self._task: Optional[asyncio.Task] = None
+
+    async def expire_batch(self, db: AsyncSession, cutoff: datetime) -> Tuple[int, int]:
+        """
+        Expire up to batch_size bookings created before cutoff
+
+        Returns (candidates found, bookings expired); fewer are expired than
+        found when payments or cancellations land mid-sweep.
+        """
+        # Oldest first via the (booking_status, created_at) index
+        result = await db.execute(
+            select(ConsultationBooking.id, ConsultationBooking.consultant_id).where(
+                and_(
+                    ConsultationBooking.booking_status == ConsultationBookingStatus.PENDING_PAYMENT,
+                    ConsultationBooking.created_at < cutoff
+                )
+            ).order_by(ConsultationBooking.created_at).limit(self.batch_size)
+        )
+        stale = result.all()
+        if not stale:
+            return 0, 0
+
+        # Re-check the status so a payment landing mid-sweep wins
+        expired = await db.execute(
+            update(ConsultationBooking).where(
+                and_(
+                    ConsultationBooking.id.in_([booking_id for booking_id, _ in stale]),
+                    ConsultationBooking.booking_status == ConsultationBookingStatus.PENDING_PAYMENT
+                )
+            ).values(
+                booking_status=ConsultationBookingStatus.EXPIRED,
+                cancelled_at=datetime.utcnow()
+            ).execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+        for consultant_id in {consultant_id for _, consultant_id in stale}:
+            availability_cache.invalidate(consultant_id)
+
+        return len(stale), expired.rowcount
+
+    async def run_once(self, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
+        """Expire all stale pending bookings, one batch per transaction"""
+        started = time.perf_counter()
+        cutoff = datetime.utcnow() - self.ttl
+        expired_count = 0
+        batches = 0
+
+        try:
+            if db is None:
+                async with self.session_factory() as session:
+                    expired_count, batches = await self._sweep(session, cutoff)
+            else:
+                expired_count, batches = await self._sweep(db, cutoff)
+            self.metrics.last_error = None
+        except Exception as e:
+            self.metrics.failed_runs += 1
+            self.metrics.last_error = f"{type(e).__name__}: {str(e)}"
+            logger.error(f"Booking expiry sweep failed: {self.metrics.last_error}")
+        finally:
+            self.metrics.runs += 1
+            self.metrics.expired_total += expired_count
+            self.metrics.last_expired = expired_count
+            self.metrics.last_batches = batches
+            self.metrics.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.metrics.last_run_at = datetime.utcnow().isoformat()
+
+        if expired_count:
+            logger.info(
+                f"Expired {expired_count} pending bookings in {batches} batch(es) "
+                f"({self.metrics.last_duration_ms} ms)"
+            )
+
+        return self.get_metrics()
+
+    async def _sweep(self, db: AsyncSession, cutoff: datetime):
+        expired_count = 0
+        batches = 0
+        # Until no candidates are left; a short or empty batch may just have lost races
+        while True:
+            found, count = await self.expire_batch(db, cutoff)
+            if found == 0:
+                break
+            expired_count += count
+            batches += 1
+        return expired_count, batches
+
+    async def _run_forever(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_forever())
+            logger.info(
+                f"Booking expiry sweeper started (ttl={self.ttl}, interval={self.interval_seconds}s)"
+            )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **asdict(self.metrics),
+            'running': self._task is not None and not self._task.done()
+        }
+
+
+# Global sweeper instance, started from the application lifespan
+booking_expiry_sweeper = BookingExpirySweeper(AsyncSessionLocal)
@@ -1,17 +1,156 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select, and_, or_, func, desc, asc
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta, date
+import time
 import uuid
 import logging
 
-from ..models.business import ConsultationBooking, ConsultationBookingStatus, PaymentStatus
+from ..models.business import (
+    ConsultationBooking, ConsultationBookingStatus, PaymentStatus, ACTIVE_BOOKING_STATUSES
+)
 from ..models.consultant import Consultant, ConsultantAvailability, ConsultantStatus
 from ..models.user import AdminUser
+from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+# For 30/30 system, we use fixed time slots: 10:00 and 14:00
+DEFAULT_TIME_SLOTS = ["10:00", "14:00"]
+SLOT_DURATION_MINUTES = 30
+
+# Why process_payment refuses a booking in each non-payable status
+PAYMENT_REFUSED = {
+    ConsultationBookingStatus.EXPIRED: 'Booking has expired, please book a new time slot',
+    ConsultationBookingStatus.CONFIRMED: 'Booking has already been paid',
+    ConsultationBookingStatus.CANCELLED: 'Booking has been cancelled, please book a new time slot',
+    ConsultationBookingStatus.COMPLETED: 'Consultation has already taken place',
+    ConsultationBookingStatus.NO_SHOW: 'Consultation has already taken place',
+}
+
+
+class AvailabilityCache:
+    """
+    Per-process cache of computed availability, keyed by consultant
+    
+    Each consultant maps to {date: available slots} plus the time it was
+    computed. Entries are dropped on booking create/cancel in this process
+    and expire after the TTL everywhere else; the unique slot index keeps
+    bookings correct even when a cached grid is briefly stale.
+    """
+    
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Dict[date, List[str]]]] = {}
+    
+    def get(self, consultant_id: str, days: List[date]) -> Optional[Dict[date, List[str]]]:
+        """Return cached slots for all `days`, or None on any miss"""
+        entry = self._entries.get(consultant_id)
+        if not entry:
+            return None
+        
+        computed_at, slots_by_day = entry
+        if time.monotonic() - computed_at > self.ttl_seconds:
+            del self._entries[consultant_id]
+            return None
+        
+        if any(day not in slots_by_day for day in days):
+            return None
+        
+        return {day: slots_by_day[day] for day in days}
+    
+    def store(self, consultant_id: str, slots_by_day: Dict[date, List[str]]) -> None:
+        entry = self._entries.get(consultant_id)
+        if entry and time.monotonic() - entry[0] <= self.ttl_seconds:
+            # Widen the cached window, keeping the original expiry
+            entry[1].update(slots_by_day)
+        else:
+            self._entries[consultant_id] = (time.monotonic(), dict(slots_by_day))
+    
+    def invalidate(self, consultant_id: str) -> None:
+        self._entries.pop(consultant_id, None)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+availability_cache = AvailabilityCache(ttl_seconds=settings.availability_cache_ttl_seconds)
+
+
+def _slot_fits(slot: str, start_time: Optional[str], end_time: Optional[str]) -> bool:
+    """Check a HH:MM slot lies inside an availability window (HH:MM[:SS])"""
+    slot_start = datetime.strptime(slot, "%H:%M")
+    slot_end = (slot_start + timedelta(minutes=SLOT_DURATION_MINUTES)).strftime("%H:%M")
+    if start_time and slot < start_time[:5]:
+        return False
+    if end_time and slot_end > end_time[:5]:
+        return False
+    return True
+
+
+def build_slot_grid(
+    rules: Iterable[ConsultantAvailability]
+) -> Tuple[Optional[Dict[int, List[str]]], Dict[date, List[str]]]:
+    """
+    Precompute the bookable slot grid from availability rules
+    
+    Returns (slots per weekday, slots per overridden date). The weekday grid
+    is None when the consultant has no weekly rules, meaning every default
+    slot is offered. Holiday or unavailable overrides block the whole day.
+    """
+    weekday_open: Optional[Dict[int, set]] = None
+    override_open: Dict[date, set] = {}
+    
+    for rule in rules:
+        open_slots = {
+            slot for slot in DEFAULT_TIME_SLOTS
+            if _slot_fits(slot, rule.start_time, rule.end_time)
+        }
+        if rule.date_override:
+            day_slots = override_open.setdefault(rule.date_override.date(), set())
+            if rule.is_available and not rule.is_holiday:
+                day_slots |= open_slots
+        else:
+            if weekday_open is None:
+                weekday_open = {}
+            day_slots = weekday_open.setdefault(rule.day_of_week, set())
+            if rule.is_available:
+                day_slots |= open_slots
+    
+    def ordered(slots: set) -> List[str]:
+        return [slot for slot in DEFAULT_TIME_SLOTS if slot in slots]
+    
+    weekday_slots = None
+    if weekday_open is not None:
+        weekday_slots = {weekday: ordered(slots) for weekday, slots in weekday_open.items()}
+    override_slots = {day: ordered(slots) for day, slots in override_open.items()}
+    
+    return weekday_slots, override_slots
+
+
+def slots_for_day(
+    day: date,
+    weekday_slots: Optional[Dict[int, List[str]]],
+    override_slots: Dict[date, List[str]]
+) -> List[str]:
+    """Slots a consultant offers on `day` under a grid from build_slot_grid"""
+    if day in override_slots:
+        return override_slots[day]
+    if weekday_slots is not None:
+        return weekday_slots.get(day.weekday(), [])
+    return DEFAULT_TIME_SLOTS
+
+
+def _as_date(value: Any) -> date:
+    """Date from a func.date() result (a string on SQLite, a date on PostgreSQL)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
 
 class ConsultationBookingService:
     def __init__(self, db: AsyncSession):
@@ -55,17 +194,31 @@ class ConsultationBookingService:
         
         return consultant_data
 
+    async def _slot_grids(
+        self,
+        consultant_ids: List[str]
+    ) -> Dict[str, Tuple[Optional[Dict[int, List[str]]], Dict[date, List[str]]]]:
+        """Slot grid (see build_slot_grid) per consultant from their availability rules"""
+        result = await self.db.execute(
+            select(ConsultantAvailability).where(
+                ConsultantAvailability.consultant_id.in_(consultant_ids)
+            )
+        )
+        rules_by_consultant: Dict[str, List[ConsultantAvailability]] = {}
+        for rule in result.scalars().all():
+            rules_by_consultant.setdefault(rule.consultant_id, []).append(rule)
+        return {
+            consultant_id: build_slot_grid(rules_by_consultant.get(consultant_id, []))
+            for consultant_id in consultant_ids
+        }
+
     async def get_available_time_slots(
         self, 
         consultant_id: str, 
-        target_date: date,
-        timezone: str = 'UTC'
+        target_date: date
     ) -> List[str]:
         """Get available time slots for a consultant on a specific date"""
         
-        # For 30/30 system, we use fixed time slots: 10:00 and 14:00
-        default_slots = ["10:00", "14:00"]
-        
         # Check if consultant exists and is active
         consultant_query = select(Consultant).where(
             and_(
@@ -83,27 +236,101 @@ class ConsultationBookingService:
         target_datetime_start = datetime.combine(target_date, datetime.min.time())
         target_datetime_end = target_datetime_start + timedelta(days=1)
         
-        bookings_query = select(ConsultationBooking).where(
+        bookings_query = select(ConsultationBooking.time_slot).where(
             and_(
                 ConsultationBooking.consultant_id == consultant_id,
                 ConsultationBooking.consultation_date >= target_datetime_start,
                 ConsultationBooking.consultation_date < target_datetime_end,
-                ConsultationBooking.booking_status.in_([
-                    ConsultationBookingStatus.CONFIRMED,
-                    ConsultationBookingStatus.PENDING_PAYMENT
-                ])
+                ConsultationBooking.booking_status.in_(ACTIVE_BOOKING_STATUSES)
             )
         )
         
         result = await self.db.execute(bookings_query)
-        existing_bookings = result.scalars().all()
         
-        # Remove booked time slots
-        booked_slots = {booking.time_slot for booking in existing_bookings}
-        available_slots = [slot for slot in default_slots if slot not in booked_slots]
+        # Remove booked time slots from the ones the consultant offers that day
+        booked_slots = set(result.scalars().all())
+        grids = await self._slot_grids([consultant_id])
+        candidates = slots_for_day(target_date, *grids[consultant_id])
+        available_slots = [slot for slot in candidates if slot not in booked_slots]
         
         return available_slots
 
+    async def get_availability_calendar(
+        self,
+        date_from: date,
+        date_to: date,
+        consultant_ids: Optional[List[str]] = None
+    ) -> Dict[str, Dict[date, List[str]]]:
+        """
+        Get available time slots for many consultants over a date window
+        
+        Cache misses are resolved with three queries in total, independent of
+        the number of consultants and days: active consultants, their
+        availability rules, and one grouped query over consultation_bookings.
+        """
+        days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+        
+        # Resolve which consultants to report on
+        consultant_query = select(Consultant.id).where(
+            Consultant.status == ConsultantStatus.ACTIVE
+        )
+        if consultant_ids:
+            consultant_query = consultant_query.where(Consultant.id.in_(consultant_ids))
+        else:
+            consultant_query = consultant_query.where(Consultant.is_verified == True)
+        result = await self.db.execute(consultant_query)
+        active_ids = list(result.scalars().all())
+        
+        calendar: Dict[str, Dict[date, List[str]]] = {}
+        missing_ids = []
+        for consultant_id in active_ids:
+            cached = availability_cache.get(consultant_id, days)
+            if cached is None:
+                missing_ids.append(consultant_id)
+            else:
+                calendar[consultant_id] = cached
+        
+        if missing_ids:
+            grids = await self._slot_grids(missing_ids)
+            
+            window_start = datetime.combine(date_from, datetime.min.time())
+            window_end = datetime.combine(date_to, datetime.min.time()) + timedelta(days=1)
+            booking_day = func.date(ConsultationBooking.consultation_date)
+            bookings_result = await self.db.execute(
+                select(
+                    ConsultationBooking.consultant_id,
+                    booking_day,
+                    ConsultationBooking.time_slot
+                ).where(
+                    and_(
+                        ConsultationBooking.consultant_id.in_(missing_ids),
+                        ConsultationBooking.consultation_date >= window_start,
+                        ConsultationBooking.consultation_date < window_end,
+                        ConsultationBooking.booking_status.in_(ACTIVE_BOOKING_STATUSES)
+                    )
+                ).group_by(
+                    ConsultationBooking.consultant_id,
+                    booking_day,
+                    ConsultationBooking.time_slot
+                )
+            )
+            booked: Dict[str, set] = {}
+            for consultant_id, day, time_slot in bookings_result.all():
+                booked.setdefault(consultant_id, set()).add((_as_date(day), time_slot))
+            
+            for consultant_id in missing_ids:
+                consultant_booked = booked.get(consultant_id, set())
+                slots_by_day = {}
+                for day in days:
+                    slots_by_day[day] = [
+                        slot for slot in slots_for_day(day, *grids[consultant_id])
+                        if (day, slot) not in consultant_booked
+                    ]
+                availability_cache.store(consultant_id, slots_by_day)
+                calendar[consultant_id] = slots_by_day
+        
+        return calendar
+
     async def create_booking(
         self,
         consultant_id: str,
@@ -115,7 +342,20 @@ class ConsultationBookingService:
         ip_address: Optional[str] = None,
         utm_data: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
-        """Create a new consultation booking"""
+        """
+        Create a new consultation booking
+        
+        The slot is claimed by the insert itself: the unique active-slot index
+        on consultation_bookings rejects a second booking for the same
+        consultant, day and time slot, so concurrent requests cannot
+        double-book without a prior availability read.
+        """
+        
+        if time_slot not in DEFAULT_TIME_SLOTS:
+            return {
+                'success': False,
+                'error': 'Time slot not available'
+            }
         
         try:
             # Validate consultant exists and is active
@@ -134,11 +374,9 @@ class ConsultationBookingService:
                     'error': 'Consultant not found or not available'
                 }
             
-            # Validate time slot availability
-            consultation_date_obj = consultation_date.date()
-            available_slots = await self.get_available_time_slots(consultant_id, consultation_date_obj)
-            
-            if time_slot not in available_slots:
+            # The slot must be one the consultant offers on that day
+            grids = await self._slot_grids([consultant_id])
+            if time_slot not in slots_for_day(consultation_date.date(), *grids[consultant_id]):
                 return {
                     'success': False,
                     'error': 'Time slot not available'
@@ -168,6 +406,7 @@ class ConsultationBookingService:
             
             self.db.add(booking)
             await self.db.commit()
+            availability_cache.invalidate(consultant_id)
             await self.db.refresh(booking)
             
             return {
@@ -177,6 +416,13 @@ class ConsultationBookingService:
                 'booking': await self._format_booking_data(booking)
             }
             
+        except IntegrityError:
+            # Another active booking already holds this slot
+            await self.db.rollback()
+            return {
+                'success': False,
+                'error': 'Time slot not available'
+            }
         except Exception as e:
             await self.db.rollback()
             logger.error(f"Error creating booking: {str(e)}")
@@ -253,6 +499,14 @@ class ConsultationBookingService:
                     'error': 'Booking not found'
                 }
             
+            # Only bookings still waiting for payment can be paid
+            booking_status = ConsultationBookingStatus(booking.booking_status)
+            if booking_status != ConsultationBookingStatus.PENDING_PAYMENT:
+                return {
+                    'success': False,
+                    'error': PAYMENT_REFUSED.get(booking_status, f'Booking is {booking_status.value} and cannot be paid')
+                }
+            
             # Update payment status (placeholder - real payment processing would happen here)
             booking.payment_status = PaymentStatus.PROCESSING
             booking.payment_method = payment_data.get('payment_method', 'stripe')
@@ -281,6 +535,55 @@ class ConsultationBookingService:
                 'error': f'Failed to process payment: {str(e)}'
             }
 
+    async def cancel_booking(
+        self,
+        booking_id: str,
+        reason: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Cancel a booking and release its time slot"""
+        
+        try:
+            booking_query = select(ConsultationBooking).where(
+                ConsultationBooking.id == booking_id
+            )
+            result = await self.db.execute(booking_query)
+            booking = result.scalar_one_or_none()
+            
+            if not booking:
+                return {
+                    'success': False,
+                    'error': 'Booking not found'
+                }
+            
+            if booking.booking_status not in ACTIVE_BOOKING_STATUSES:
+                return {
+                    'success': False,
+                    'error': f'Booking cannot be cancelled in status {booking.booking_status}'
+                }
+            
+            booking.booking_status = ConsultationBookingStatus.CANCELLED
+            booking.cancelled_at = datetime.utcnow()
+            if reason:
+                booking.admin_notes = f"{booking.admin_notes}\n{reason}" if booking.admin_notes else reason
+            
+            await self.db.commit()
+            availability_cache.invalidate(booking.consultant_id)
+            await self.db.refresh(booking)
+            
+            return {
+                'success': True,
+                'message': 'Booking cancelled successfully',
+                'booking': await self._format_booking_data(booking)
+            }
+            
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Error cancelling booking: {str(e)}")
+            return {
+                'success': False,
+                'error': f'Failed to cancel booking: {str(e)}'
+            }
+
     async def get_booking_by_id(self, booking_id: str) -> Optional[Dict[str, Any]]:
         """Get booking by ID with consultant data"""
         
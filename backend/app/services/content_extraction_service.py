@@ -6,14 +6,30 @@ semantic analysis, and content structure preservation.
 """
 
 import re
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, List, Optional, Tuple, Any
-from urllib.parse import urljoin, urlparse
-from dataclasses import dataclass
+from urllib.parse import urljoin, urlparse, urldefrag
+from dataclasses import dataclass, field
 
 import httpx
 from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.builder import builder_registry
 
-from app.services.image_processing_service import image_service
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_parser(name: str) -> str:
+    """BeautifulSoup tree builder to use; falls back to html.parser if lxml is missing"""
+    if builder_registry.lookup(name) is None:
+        logger.warning(f"HTML parser '{name}' is not installed, using html.parser")
+        return 'html.parser'
+    return name
 
 
 @dataclass
@@ -40,6 +56,7 @@ class ExtractedContent:
     meta_description: str
     suggested_blocks: List[Dict[str, Any]]
     structure_analysis: Dict[str, Any]
+    links: List[str] = field(default_factory=list)  # Absolute link targets, for crawling
 
 
 class ContentExtractionService:
@@ -57,69 +74,151 @@ class ContentExtractionService:
         r'spacer', r'pixel', r'tracking', r'analytics'
     ]
     
-    def __init__(self):
+    # Heading tag -> level, for the structure analysis
+    HEADING_LEVELS = {f'h{level}': level for level in range(1, 7)}
+    
+    # Class names marking logical sections
+    SECTION_CLASS_PATTERN = re.compile(r'section|block|content-block')
+    
+    # Text/class fragments marking call-to-action links and buttons
+    CTA_INDICATORS = ['button', 'btn', 'cta', 'call-to-action', 'contact', 'signup']
+    
+    def __init__(self, parser: Optional[str] = None):
         self.session = None
+        self.parser = resolve_parser(parser or settings.content_parser)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(settings.content_extraction_concurrency)
     
-    async def extract_content(self, url: str) -> Optional[ExtractedContent]:
-        """Extract and analyze content from a URL"""
+    async def extract_content(
+        self,
+        url: str,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> Optional[ExtractedContent]:
+        """Extract and analyze content from a URL (reusing `client` if given)"""
         try:
             # Fetch the page
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        'User-Agent': 'voltAIc Content Migrator 1.0 (Compatible)',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
-                    },
-                    timeout=30.0
-                )
-                
-                if response.status_code != 200:
-                    return None
-                
-                html_content = response.text
-                base_url = str(response.url)
-            
-            # Parse HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Extract basic metadata
-            title = self._extract_title(soup)
-            meta_description = self._extract_meta_description(soup)
+            if client is None:
+                async with httpx.AsyncClient() as own_client:
+                    response = await self._fetch_page(own_client, url)
+            else:
+                response = await self._fetch_page(client, url)
             
-            # Remove unwanted elements
-            self._clean_soup(soup)
+            if response.status_code != 200:
+                return None
             
-            # Extract main content
-            content_element = self._find_main_content(soup)
-            
-            # Extract images with context
-            images = self._extract_images(soup, base_url, content_element)
-            
-            # Process content
-            content_html = str(content_element) if content_element else ""
-            content_text = content_element.get_text(strip=True) if content_element else ""
-            excerpt = self._generate_excerpt(content_text)
-            
-            # Analyze structure and suggest blocks
-            structure_analysis = self._analyze_structure(content_element)
-            suggested_blocks = self._suggest_content_blocks(content_element, images, structure_analysis)
-            
-            return ExtractedContent(
-                title=title,
-                content_html=content_html,
-                content_text=content_text,
-                excerpt=excerpt,
-                images=images,
-                meta_description=meta_description,
-                suggested_blocks=suggested_blocks,
-                structure_analysis=structure_analysis
-            )
+            return await self.extract_from_html_async(response.text, str(response.url))
             
         except Exception as e:
             print(f"Failed to extract content from {url}: {e}")
             return None
     
+    async def _fetch_page(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
+        return await client.get(
+            url,
+            headers={
+                'User-Agent': 'voltAIc Content Migrator 1.0 (Compatible)',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
+            },
+            timeout=30.0
+        )
+    
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Lazily start the worker pool (None means run in a thread)"""
+        if self._executor is None and settings.content_extraction_workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.content_extraction_workers,
+                # Workers must not inherit the event loop or DB threads
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+    
+    async def extract_from_html_async(self, html_content: str, base_url: str) -> ExtractedContent:
+        """
+        Parse and analyze HTML off the event loop
+        
+        Parsing, cleaning, main-content detection, image extraction and
+        block suggestions all run as one call in the worker pool and come
+        back as a plain ExtractedContent; at most
+        content_extraction_concurrency jobs are in flight per process.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(
+                    executor,
+                    extract_html,
+                    html_content,
+                    base_url,
+                    self.parser
+                )
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); start fresh next time
+                self._executor = None
+                raise
+    
+    def shutdown(self) -> None:
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def extract_from_html(self, html_content: str, base_url: str) -> ExtractedContent:
+        """Parse and analyze already fetched HTML (CPU-bound, blocks the caller)"""
+        # Parse HTML
+        soup = BeautifulSoup(html_content, self.parser)
+        
+        # Extract basic metadata
+        title = self._extract_title(soup)
+        meta_description = self._extract_meta_description(soup)
+        
+        # Collect links before navigation elements are removed
+        links = self._extract_links(soup, base_url)
+        
+        # Remove unwanted elements
+        self._clean_soup(soup)
+        
+        # Extract main content
+        content_element = self._find_main_content(soup)
+        
+        # Extract images with context
+        images = self._extract_images(soup, base_url, content_element)
+        
+        # Process content
+        content_html = str(content_element) if content_element else ""
+        content_text = content_element.get_text(strip=True) if content_element else ""
+        excerpt = self._generate_excerpt(content_text)
+        
+        # Analyze structure and suggest blocks
+        structure_analysis = self._analyze_structure(content_element)
+        suggested_blocks = self._suggest_content_blocks(content_element, images, structure_analysis)
+        
+        return ExtractedContent(
+            title=title,
+            content_html=content_html,
+            content_text=content_text,
+            excerpt=excerpt,
+            images=images,
+            meta_description=meta_description,
+            suggested_blocks=suggested_blocks,
+            structure_analysis=structure_analysis,
+            links=links
+        )
+    
+    def _extract_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
+        """Absolute http(s) link targets without fragments, in document order"""
+        links = []
+        seen = set()
+        for anchor in soup.find_all('a', href=True):
+            href = anchor['href'].strip()
+            if not href or href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+                continue
+            url = urldefrag(urljoin(base_url, href))[0]
+            if urlparse(url).scheme in ('http', 'https') and url not in seen:
+                seen.add(url)
+                links.append(url)
+        return links
+    
     def _extract_title(self, soup: BeautifulSoup) -> str:
         """Extract page title with fallbacks"""
         # Try different title sources in order of preference
@@ -162,14 +261,15 @@ class ContentExtractionService:
         for tag in soup(['script', 'style', 'noscript']):
             tag.decompose()
         
-        # Remove elements by CSS selectors
-        for selector in self.DECORATIVE_SELECTORS:
-            for element in soup.select(selector):
-                element.decompose()
+        # Remove elements by CSS selectors (one selector list, one pass over the tree)
+        for element in soup.select(', '.join(self.DECORATIVE_SELECTORS)):
+            element.decompose()
         
         # Remove comments
         from bs4 import Comment
-        for comment in soup.find_all(string=Comment):
+        # Match Comment instances only: passed as string=Comment, bs4 calls the
+        # class as a filter, which matched and removed every text node too
+        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
             comment.extract()
     
     def _find_main_content(self, soup: BeautifulSoup) -> Optional[Tag]:
@@ -395,29 +495,59 @@ class ContentExtractionService:
         return 'inline'
     
     def _analyze_structure(self, content_element: Optional[Tag]) -> Dict[str, Any]:
-        """Analyze content structure for block suggestions"""
+        """Analyze content structure for block suggestions in a single walk"""
         if not content_element:
             return {}
         
+        headings_by_level: Dict[int, List[Dict[str, Any]]] = {level: [] for level in range(1, 7)}
+        counts = {'p': 0, 'list': 0, 'img': 0, 'a': 0}
+        sections = 0
+        has_cta_elements = False
+        
+        for element in content_element.descendants:
+            if not isinstance(element, Tag):
+                continue
+            name = element.name
+            
+            if name == 'p':
+                counts['p'] += 1
+            elif name in ('ul', 'ol'):
+                counts['list'] += 1
+            elif name == 'img':
+                counts['img'] += 1
+            elif name in self.HEADING_LEVELS:
+                headings_by_level[self.HEADING_LEVELS[name]].append(
+                    {'level': self.HEADING_LEVELS[name], 'text': element.get_text(strip=True)[:100]}
+                )
+            elif name in ('section', 'div'):
+                # Count logical sections
+                if self.SECTION_CLASS_PATTERN.search(' '.join(element.get('class', []))):
+                    sections += 1
+            
+            if name in ('a', 'button'):
+                if name == 'a':
+                    counts['a'] += 1
+                # Check for CTA elements
+                if not has_cta_elements:
+                    element_text = element.get_text(strip=True).lower()
+                    element_classes = ' '.join(element.get('class', [])).lower()
+                    has_cta_elements = any(
+                        indicator in element_text or indicator in element_classes
+                        for indicator in self.CTA_INDICATORS
+                    )
+        
         analysis = {
-            'headings': [],
-            'paragraphs': len(content_element.find_all('p')),
-            'lists': len(content_element.find_all(['ul', 'ol'])),
-            'images': len(content_element.find_all('img')),
-            'links': len(content_element.find_all('a')),
+            # Headings grouped by level, in document order within each level
+            'headings': [heading for level in range(1, 7) for heading in headings_by_level[level]],
+            'paragraphs': counts['p'],
+            'lists': counts['list'],
+            'images': counts['img'],
+            'links': counts['a'],
             'has_hero_potential': False,
-            'has_cta_elements': False,
-            'sections': 0
+            'has_cta_elements': has_cta_elements,
+            'sections': sections
         }
         
-        # Analyze headings
-        for level in range(1, 7):
-            headings = content_element.find_all(f'h{level}')
-            analysis['headings'].extend([
-                {'level': level, 'text': h.get_text(strip=True)[:100]}
-                for h in headings
-            ])
-        
         # Check for hero potential (large image at top)
         first_elements = list(content_element.children)[:2]
         for elem in first_elements:
@@ -425,21 +555,6 @@ class ContentExtractionService:
                 analysis['has_hero_potential'] = True
                 break
         
-        # Check for CTA elements
-        cta_indicators = ['button', 'btn', 'cta', 'call-to-action', 'contact', 'signup']
-        for element in content_element.find_all(['a', 'button']):
-            element_text = element.get_text(strip=True).lower()
-            element_classes = ' '.join(element.get('class', [])).lower()
-            
-            if any(indicator in element_text or indicator in element_classes 
-                   for indicator in cta_indicators):
-                analysis['has_cta_elements'] = True
-                break
-        
-        # Count logical sections
-        analysis['sections'] = len(content_element.find_all(['section', 'div'], 
-                                                           attrs={'class': re.compile(r'section|block|content-block')}))
-        
         return analysis
     
     def _suggest_content_blocks(self, content_element: Optional[Tag], images: List[ExtractedImage], analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -532,5 +647,17 @@ class ContentExtractionService:
         return truncated + '...'
 
 
+# Services used inside pool workers, one per parser backend
+_worker_services: Dict[str, ContentExtractionService] = {}
+
+
+def extract_html(html_content: str, base_url: str, parser: str) -> ExtractedContent:
+    """Worker entry point for ContentExtractionService.extract_from_html_async"""
+    service = _worker_services.get(parser)
+    if service is None:
+        service = _worker_services[parser] = ContentExtractionService(parser=parser)
+    return service.extract_from_html(html_content, base_url)
+
+
 # Global instance
 content_extraction_service = ContentExtractionService()
\ No newline at end of file
@@ -0,0 +1,445 @@
+from typing import Optional, Dict, Any, Callable, List, Tuple, Iterator
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from dataclasses import dataclass, asdict
+from contextlib import asynccontextmanager
+import asyncio
+import copy
+import hashlib
+import logging
+import time
+
+from ..models.content import Page
+from ..models.business import Whitepaper
+from ..models.translation import MultilingualContent
+from ..database import AsyncSessionLocal
+from ..config import settings
+from .ai_translation_service import AITranslationService
+
+logger = logging.getLogger(__name__)
+
+# Multilingual JSON fields per content type; content_blocks is split per block
+CONTENT_FIELDS = {
+    'page': (Page, ('title', 'excerpt', 'meta_description', 'seo_title', 'content', 'content_blocks')),
+    'whitepaper': (Whitepaper, ('title', 'description', 'preview_content', 'meta_title', 'meta_description')),
+}
+
+BLOCK_FIELD = 'content_blocks'
+
+# Block properties holding identifiers, links or presentation, never prose
+NON_TRANSLATABLE_KEYS = frozenset({
+    'block_type', '_type', 'block_key', '_key', 'id', 'span_type', 'style', 'marks', 'markDefs',
+    'href', 'url', 'src', 'image', 'icon', 'avatar', 'logo', 'email', 'phone',
+    'variant', 'background_variant', 'background_image', 'size', 'alignment', 'layout',
+})
+
+# Bookkeeping row in multilingual_content; inactive so it is never served as content
+STATE_FIELD = '_machine_translation'
+
+Path = Tuple[str, ...]
+
+
+def _digest(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _is_prose(text: Any) -> bool:
+    return isinstance(text, str) and any(char.isalpha() for char in text)
+
+
+def _block_id(block: Dict[str, Any], index: int) -> str:
+    return str(block.get('block_key') or block.get('_key') or index)
+
+
+def _leaves(value: Any, path: Path = ()) -> Iterator[Tuple[Path, str]]:
+    """Translatable string leaves of a block, with their paths"""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if key not in NON_TRANSLATABLE_KEYS:
+                yield from _leaves(child, path + (key,))
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            yield from _leaves(child, path + (str(index),))
+    elif _is_prose(value):
+        yield path, value
+
+
+def _get_path(value: Any, path: Path) -> Any:
+    for part in path:
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+    return value
+
+
+def _child(value: Any, part: str) -> Any:
+    if isinstance(value, list):
+        index = int(part)
+        return value[index] if index < len(value) else None
+    return value.get(part)
+
+
+def _put(value: Any, part: str, child: Any) -> None:
+    if isinstance(value, list):
+        index = int(part)
+        value.extend([None] * (index + 1 - len(value)))
+        value[index] = child
+    else:
+        value[part] = child
+
+
+def _set_path(value: Any, path: Path, text: str, template: Any) -> None:
+    """Set a leaf, creating missing containers from the source-language template"""
+    for part in path[:-1]:
+        template = _get_path(template, (part,))
+        child = _child(value, part)
+        if not isinstance(child, (dict, list)):
+            child = copy.deepcopy(template)
+            _put(value, part, child)
+        value = child
+    _put(value, path[-1], text)
+
+
+def align_blocks(source_blocks: List[Dict[str, Any]], target_blocks: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """Target counterpart of every source block: same block_key, else same position and type"""
+    by_key = {
+        block.get('block_key') or block.get('_key'): block
+        for block in target_blocks
+        if isinstance(block, dict) and (block.get('block_key') or block.get('_key'))
+    }
+    aligned = []
+    for index, block in enumerate(source_blocks):
+        key = block.get('block_key') or block.get('_key')
+        if key:
+            aligned.append(by_key.get(key))
+            continue
+        candidate = target_blocks[index] if index < len(target_blocks) else None
+        same_type = (
+            isinstance(candidate, dict)
+            and candidate.get('block_type', candidate.get('_type')) == block.get('block_type', block.get('_type'))
+        )
+        aligned.append(candidate if same_type else None)
+    return aligned
+
+
+def extract_segments(values: Dict[str, Any], fields: Tuple[str, ...], language: str, source_language: str) -> Dict[str, str]:
+    """
+    Text per segment path for one language
+
+    Plain fields are one segment each. content_blocks yields one segment per
+    text leaf, under the id of the source-language block it belongs to, so
+    target-language blocks are read through their source counterpart.
+    """
+    segments = {}
+    for name in fields:
+        value = values.get(name)
+        if not isinstance(value, dict):
+            continue
+        if name != BLOCK_FIELD:
+            if _is_prose(value.get(language)):
+                segments[name] = value[language]
+            continue
+
+        source_blocks = [b for b in value.get(source_language) or [] if isinstance(b, dict)]
+        blocks = source_blocks
+        if language != source_language:
+            blocks = align_blocks(source_blocks, [b for b in value.get(language) or [] if isinstance(b, dict)])
+        for index, (source_block, block) in enumerate(zip(source_blocks, blocks)):
+            if block is None:
+                continue
+            prefix = (name, _block_id(source_block, index))
+            for path, _ in _leaves(source_block):
+                text = _get_path(block, path)
+                if _is_prose(text):
+                    segments['/'.join(prefix + path)] = text
+    return segments
+
+
+@dataclass
+class PretranslationResult:
+    """Outcome of one pre-translation run"""
+    content_type: str
+    content_id: int
+    language: str
+    planned: int = 0
+    written: int = 0
+    from_memory: int = 0
+    failed: int = 0
+    conflicts: int = 0
+    elapsed_seconds: float = 0.0
+
+
+@dataclass
+class PretranslationMetrics:
+    """Counters exposed by the pre-translation pipeline"""
+    runs: int = 0
+    failed_runs: int = 0
+    segments_planned: int = 0
+    segments_written: int = 0
+    segments_from_memory: int = 0
+    conflicts: int = 0
+    last_run_at: Optional[str] = None
+    last_error: Optional[str] = None
+
+
+class ContentPretranslationService:
+    """
+    Incremental machine pre-translation of multilingual content
+
+    After an admin save, the source-language text of every segment (plain
+    field, or text leaf of a content block) is compared with the target
+    language and with the bookkeeping state of earlier runs. Only segments
+    that are missing, still identical to the source, machine drafts of an
+    older source, or human translations whose source changed in this save
+    are sent through translation memory and batched AI translation; human
+    edits are otherwise left alone. Results are written back as drafts only
+    if neither text changed while translating.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        translator_factory: Optional[Callable[[AsyncSession], AITranslationService]] = None,
+        source_language: str = settings.content_pretranslation_source_language,
+        target_languages: Optional[List[str]] = None
+    ):
+        self.session_factory = session_factory
+        self.translator_factory = translator_factory or AITranslationService
+        self.source_language = source_language
+        self.target_languages = target_languages or list(settings.content_pretranslation_target_languages)
+        self.metrics = PretranslationMetrics()
+        self._locks: Dict[Tuple[str, int], list] = {}
+
+    @asynccontextmanager
+    async def _item_lock(self, content_type: str, content_id: int):
+        """Hold a per-item lock, dropped again once nobody holds or waits for it"""
+        key = (content_type, content_id)
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._locks.pop(key, None)
+
+    @staticmethod
+    def snapshot(content_type: str, item: Any) -> Dict[str, Any]:
+        """Copy of the multilingual fields, taken before an update is applied"""
+        _, fields = CONTENT_FIELDS[content_type]
+        return {name: copy.deepcopy(getattr(item, name)) for name in fields}
+
+    def plan(
+        self,
+        content_type: str,
+        values: Dict[str, Any],
+        language: str,
+        state: Dict[str, Dict[str, str]],
+        before: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Tuple[str, Optional[str]]]:
+        """Segments to translate: {path: (source text, current target text)}"""
+        _, fields = CONTENT_FIELDS[content_type]
+        sources = extract_segments(values, fields, self.source_language, self.source_language)
+        targets = extract_segments(values, fields, language, self.source_language)
+        before_sources = extract_segments(before, fields, self.source_language, self.source_language) if before else {}
+        before_targets = extract_segments(before, fields, language, self.source_language) if before else {}
+
+        todo = {}
+        for path, text in sources.items():
+            current = targets.get(path)
+            record = state.get(path)
+            is_draft = record is not None and current is not None and _digest(current) == record.get('target')
+
+            if is_draft and record.get('source') == _digest(text):
+                continue  # Machine draft of the current source
+            if current is None or current == text or is_draft:
+                todo[path] = (text, current)
+            elif before is not None and before_sources.get(path) != text and before_targets.get(path) == current:
+                # Human translation whose source changed in this save
+                todo[path] = (text, current)
+        return todo
+
+    def apply(
+        self,
+        content_type: str,
+        item: Any,
+        language: str,
+        planned: Dict[str, Tuple[str, Optional[str]]],
+        translations: Dict[str, str]
+    ) -> Tuple[List[str], int]:
+        """Write translations whose source and target are unchanged; returns (written paths, conflicts)"""
+        _, fields = CONTENT_FIELDS[content_type]
+        values = {name: getattr(item, name) for name in fields}
+        sources = extract_segments(values, fields, self.source_language, self.source_language)
+        targets = extract_segments(values, fields, language, self.source_language)
+
+        written = []
+        conflicts = 0
+        updated: Dict[str, Dict[str, Any]] = {}
+        for path, translated in translations.items():
+            source_text, expected = planned[path]
+            if sources.get(path) != source_text or targets.get(path) != expected:
+                conflicts += 1
+                continue
+            name = path.split('/', 1)[0]
+            if name not in updated:
+                updated[name] = copy.deepcopy(values[name]) or {}
+            if name == BLOCK_FIELD:
+                self._write_block_leaf(updated[name], language, path, translated)
+            else:
+                updated[name][language] = translated
+            written.append(path)
+
+        # Reassign so the JSON columns are flagged as modified
+        for name, value in updated.items():
+            setattr(item, name, value)
+        return written, conflicts
+
+    def _write_block_leaf(self, field_value: Dict[str, Any], language: str, path: str, text: str) -> None:
+        source_blocks = [b for b in field_value.get(self.source_language) or [] if isinstance(b, dict)]
+        target_blocks = [b for b in field_value.get(language) or [] if isinstance(b, dict)]
+        # Rebuild the target list in source order; blocks without a counterpart
+        # start as a copy of the source block and are translated leaf by leaf
+        aligned = align_blocks(source_blocks, target_blocks)
+        rebuilt = [
+            block if block is not None else copy.deepcopy(source)
+            for source, block in zip(source_blocks, aligned)
+        ]
+        field_value[language] = rebuilt
+
+        _, block_id, *leaf = path.split('/')
+        for index, source in enumerate(source_blocks):
+            if _block_id(source, index) == block_id:
+                _set_path(rebuilt[index], tuple(leaf), text, source)
+                return
+
+    async def _load_state(self, db: AsyncSession, content_type: str, content_id: int, language: str) -> Optional[MultilingualContent]:
+        result = await db.execute(
+            select(MultilingualContent).where(
+                and_(
+                    MultilingualContent.content_type == content_type,
+                    MultilingualContent.content_id == str(content_id),
+                    MultilingualContent.field_name == STATE_FIELD,
+                    MultilingualContent.language == language
+                )
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def pretranslate(
+        self,
+        content_type: str,
+        content_id: int,
+        before: Optional[Dict[str, Any]] = None
+    ) -> List[PretranslationResult]:
+        """Translate changed segments of one item into every target language"""
+        model, fields = CONTENT_FIELDS[content_type]
+        results = []
+
+        # One run per item at a time, so consecutive saves apply in order
+        async with self._item_lock(content_type, content_id):
+            try:
+                async with self.session_factory() as db:
+                    for language in self.target_languages:
+                        result = await self._pretranslate_language(db, model, content_type, content_id, language, before)
+                        if result is not None:
+                            results.append(result)
+                self.metrics.runs += 1
+                self.metrics.last_error = None
+            except Exception as e:
+                self.metrics.failed_runs += 1
+                self.metrics.last_error = str(e)
+                logger.error(f"Pre-translation of {content_type} {content_id} failed: {e}")
+            finally:
+                self.metrics.last_run_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+        return results
+
+    async def _pretranslate_language(
+        self,
+        db: AsyncSession,
+        model: Any,
+        content_type: str,
+        content_id: int,
+        language: str,
+        before: Optional[Dict[str, Any]]
+    ) -> Optional[PretranslationResult]:
+        started = time.perf_counter()
+        item = await db.get(model, content_id)
+        if item is None:
+            return None
+        _, fields = CONTENT_FIELDS[content_type]
+
+        state_row = await self._load_state(db, content_type, content_id, language)
+        state = dict(state_row.json_content or {}) if state_row else {}
+        values = {name: getattr(item, name) for name in fields}
+        planned = self.plan(content_type, values, language, state, before)
+        # End the read transaction before the slow part
+        await db.commit()
+
+        result = PretranslationResult(content_type, content_id, language, planned=len(planned))
+        self.metrics.segments_planned += len(planned)
+        if not planned:
+            return result
+
+        translator = self.translator_factory(db)
+        translations = {}
+        for outcome in await translator.batch_translate(
+            [{'id': path, 'text': text} for path, (text, _) in planned.items()],
+            self.source_language,
+            language,
+            context=f"{content_type} content"
+        ):
+            if outcome.get('success') and outcome.get('translated_text'):
+                translations[outcome['id']] = outcome['translated_text']
+                if outcome.get('method') == 'translation_memory':
+                    result.from_memory += 1
+            else:
+                result.failed += 1
+
+        await db.refresh(item)
+        written, result.conflicts = self.apply(content_type, item, language, planned, translations)
+
+        sources = extract_segments(
+            {name: getattr(item, name) for name in fields}, fields, self.source_language, self.source_language
+        )
+        # Forget segments that no longer exist, record the drafts just written
+        state = {path: record for path, record in state.items() if path in sources}
+        for path in written:
+            state[path] = {'source': _digest(planned[path][0]), 'target': _digest(translations[path])}
+        if state_row is None:
+            state_row = MultilingualContent(
+                content_type=content_type,
+                content_id=str(content_id),
+                field_name=STATE_FIELD,
+                language=language,
+                is_active=False
+            )
+            db.add(state_row)
+        state_row.json_content = state
+        await db.commit()
+
+        result.written = len(written)
+        result.elapsed_seconds = round(time.perf_counter() - started, 3)
+        self.metrics.segments_written += result.written
+        self.metrics.segments_from_memory += result.from_memory
+        self.metrics.conflicts += result.conflicts
+        logger.info(
+            f"Pre-translated {result.written}/{result.planned} segments of {content_type} "
+            f"{content_id} into {language} ({result.from_memory} from memory, "
+            f"{result.conflicts} conflicts, {result.failed} failed)"
+        )
+        return result
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return asdict(self.metrics)
+
+
+# Global instance
+content_pretranslation_service = ContentPretranslationService()
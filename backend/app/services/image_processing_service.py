@@ -6,21 +6,27 @@ of images extracted during content migration.
 """
 
 import os
-import hashlib
 import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, List, Optional, Tuple, Any
 from urllib.parse import urljoin, urlparse
+from contextlib import asynccontextmanager
 import uuid
 
-import aiofiles
 import httpx
-from PIL import Image, ImageOps
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app.models.content import MediaFile
+from app.models.content import MediaFile, MediaReference
 from app.config import settings
+from app.services.media_store import ContentAddressedStore
+from app.utils import image_pipeline
 
 
 class ImageProcessingService:
@@ -41,53 +47,50 @@ class ImageProcessingService:
     def __init__(self, upload_dir: str = "media/images"):
         self.upload_dir = Path(upload_dir)
         self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(settings.image_processing_concurrency)
+        self.store = ContentAddressedStore(self.upload_dir)
+        # source hash -> [lock, users]; serializes work on identical uploads
+        self._hash_locks: Dict[str, list] = {}
         
-    async def download_image(self, url: str, base_url: str = None) -> Optional[bytes]:
-        """Download image from URL with error handling"""
+    async def download_image(
+        self,
+        url: str,
+        base_url: str = None,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> Optional[bytes]:
+        """Download image from URL with error handling (reusing `client` if given)"""
         try:
             # Convert relative URLs to absolute
             if base_url and not url.startswith(('http://', 'https://')):
                 url = urljoin(base_url, url)
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers={
-                        'User-Agent': 'voltAIc Content Migrator 1.0'
-                    },
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    return response.content
+            if client is None:
+                async with httpx.AsyncClient() as own_client:
+                    response = await self._fetch_image(own_client, url)
+            else:
+                response = await self._fetch_image(client, url)
+            
+            if response.status_code == 200:
+                return response.content
                     
         except Exception as e:
             print(f"Failed to download image {url}: {e}")
             
         return None
     
+    async def _fetch_image(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
+        return await client.get(
+            url,
+            headers={
+                'User-Agent': 'voltAIc Content Migrator 1.0'
+            },
+            timeout=30.0
+        )
+    
     def extract_image_metadata(self, image_data: bytes) -> Dict[str, Any]:
         """Extract metadata from image data"""
-        try:
-            image = Image.open(BytesIO(image_data))
-            
-            metadata = {
-                'width': image.width,
-                'height': image.height,
-                'format': image.format,
-                'mode': image.mode,
-                'aspect_ratio': round(image.width / image.height, 3)
-            }
-            
-            # Extract EXIF data if available
-            if hasattr(image, '_getexif') and image._getexif():
-                metadata['exif'] = dict(image._getexif().items())
-            
-            return metadata
-            
-        except Exception as e:
-            print(f"Failed to extract image metadata: {e}")
-            return {}
+        return image_pipeline.extract_image_metadata(image_data)
     
     def optimize_image(
         self, 
@@ -98,130 +101,180 @@ class ImageProcessingService:
     ) -> Tuple[bytes, Dict[str, Any]]:
         """Optimize image with compression and resizing"""
         try:
-            image = Image.open(BytesIO(image_data))
-            
-            # Convert to RGB if necessary for JPEG
-            if format.upper() == 'JPEG' and image.mode in ('RGBA', 'LA', 'P'):
-                # Create white background
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                if image.mode == 'P':
-                    image = image.convert('RGBA')
-                background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                image = background
-            
-            # Resize if target width specified
-            if target_width and image.width > target_width:
-                ratio = target_width / image.width
-                new_height = int(image.height * ratio)
-                image = image.resize((target_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Apply auto-orientation
-            image = ImageOps.exif_transpose(image)
-            
-            # Save optimized image
-            output = BytesIO()
-            save_kwargs = {'format': format.upper()}
-            
-            if format.upper() == 'JPEG':
-                save_kwargs.update({
-                    'quality': quality,
-                    'optimize': True,
-                    'progressive': True
-                })
-            elif format.upper() == 'PNG':
-                save_kwargs.update({
-                    'optimize': True
-                })
-            elif format.upper() == 'WEBP':
-                save_kwargs.update({
-                    'quality': quality,
-                    'method': 6  # Best compression
-                })
-            
-            image.save(output, **save_kwargs)
-            
-            # Get metadata for optimized image
-            metadata = {
-                'width': image.width,
-                'height': image.height,
-                'format': format.upper(),
-                'size': len(output.getvalue()),
-                'aspect_ratio': round(image.width / image.height, 3)
-            }
-            
-            return output.getvalue(), metadata
-            
+            return image_pipeline.optimize_image(image_data, target_width, quality, format)
         except Exception as e:
             print(f"Failed to optimize image: {e}")
             raise
     
     def create_responsive_variants(self, image_data: bytes) -> Dict[str, Tuple[bytes, Dict[str, Any]]]:
         """Create multiple responsive variants of an image"""
-        variants = {}
+        return image_pipeline.create_responsive_variants(image_data, self.RESPONSIVE_SIZES)
+    
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Lazily start the worker pool (None means run in a thread)"""
+        if self._executor is None and settings.image_processing_workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.image_processing_workers,
+                # Workers must not inherit the event loop or DB threads
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+    
+    async def _run_job(self, func, *args):
+        """Run a pipeline function in the worker pool, bounded by the semaphore"""
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(executor, func, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); start fresh next time
+                self._executor = None
+                raise
+    
+    async def process_image_data(self, image_data: bytes) -> Dict[str, Any]:
+        """
+        Decode, optimize and build all variants off the event loop
         
+        The whole job runs as one call in the process pool; at most
+        image_processing_concurrency jobs are in flight per process.
+        """
+        return await self._run_job(image_pipeline.process_image, image_data, self.RESPONSIVE_SIZES)
+    
+    async def render_derivative(
+        self,
+        image_data: bytes,
+        target_width: int,
+        format: str,
+        quality: int
+    ) -> Tuple[bytes, Dict[str, Any]]:
+        """Resize and encode a single derivative off the event loop"""
+        return await self._run_job(image_pipeline.optimize_image, image_data, target_width, quality, format)
+    
+    def shutdown(self) -> None:
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    async def save_image_file(self, image_data: bytes, filename: str) -> str:
+        """Save image bytes content-addressed and return the relative path"""
+        file_path, _ = await self.store.put(image_data, Path(filename).suffix)
+        return file_path
+    
+    @asynccontextmanager
+    async def _hash_lock(self, content_hash: str):
+        """Hold a per-hash lock so concurrent identical uploads are processed once"""
+        entry = self._hash_locks.setdefault(content_hash, [asyncio.Lock(), 0])
+        entry[1] += 1
         try:
-            original_image = Image.open(BytesIO(image_data))
-            original_width = original_image.width
-            
-            for size_name, target_width in self.RESPONSIVE_SIZES.items():
-                # Skip if original is smaller than target
-                if original_width <= target_width and size_name != 'thumbnail':
-                    continue
-                
-                # Create optimized variant
-                optimized_data, metadata = self.optimize_image(
-                    image_data, 
-                    target_width=target_width,
-                    quality=85 if size_name in ['large', 'xlarge'] else 90,
-                    format='JPEG'
-                )
-                
-                variants[size_name] = (optimized_data, metadata)
-            
-            # Always include WebP variants for modern browsers
-            for size_name, target_width in self.RESPONSIVE_SIZES.items():
-                if original_width <= target_width and size_name != 'thumbnail':
-                    continue
-                
-                try:
-                    webp_data, webp_metadata = self.optimize_image(
-                        image_data,
-                        target_width=target_width,
-                        quality=80,
-                        format='WebP'
-                    )
-                    variants[f"{size_name}_webp"] = (webp_data, webp_metadata)
-                except:
-                    pass  # WebP not always supported
-        
-        except Exception as e:
-            print(f"Failed to create responsive variants: {e}")
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._hash_locks.pop(content_hash, None)
+    
+    async def find_media_by_hash(self, db: AsyncSession, content_hash: str) -> Optional[MediaFile]:
+        """Live MediaFile for these source bytes whose stored file still exists"""
+        result = await db.execute(
+            select(MediaFile).where(
+                MediaFile.file_hash == content_hash,
+                MediaFile.deleted_at.is_(None)
+            ).order_by(MediaFile.id).limit(1)
+        )
+        media_file = result.scalar_one_or_none()
+        if media_file and self.store.exists(media_file.file_path):
+            return media_file
+        return None
+    
+    async def acquire_media_file(self, db: AsyncSession, media_file: MediaFile) -> MediaFile:
+        """Add a reference to an existing MediaFile"""
+        await db.execute(
+            update(MediaFile)
+            .where(MediaFile.id == media_file.id)
+            .values(reference_count=MediaFile.reference_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        await db.refresh(media_file)
+        return media_file
+    
+    async def link_media_file(self, db: AsyncSession, media_file: MediaFile, owner_type: str, owner_id: int) -> bool:
+        """Reference a MediaFile from an owner; linking the same owner again is a no-op"""
+        result = await db.execute(
+            sqlite_insert(MediaReference)
+            .values(media_file_id=media_file.id, owner_type=owner_type, owner_id=owner_id)
+            .on_conflict_do_nothing()
+        )
+        if result.rowcount != 1:
+            await db.commit()
+            return False
+        await self.acquire_media_file(db, media_file)
+        return True
+    
+    async def release_owner_media(
+        self,
+        db: AsyncSession,
+        owner_type: str,
+        owner_id: int,
+        keep: Iterable[int] = ()
+    ) -> int:
+        """Unlink an owner from its media files (except those in keep) and release each one"""
+        result = await db.execute(
+            select(MediaReference)
+            .options(selectinload(MediaReference.media_file))
+            .where(
+                MediaReference.owner_type == owner_type,
+                MediaReference.owner_id == owner_id,
+                MediaReference.media_file_id.notin_(list(keep))
+            )
+        )
+        references = result.scalars().all()
+        for reference in references:
+            await db.delete(reference)
+        await db.commit()
         
-        return variants
+        for reference in references:
+            await self.release_media_file(db, reference.media_file)
+        return len(references)
     
-    async def save_image_file(
-        self, 
-        image_data: bytes, 
-        filename: str,
-        folder: str = "/"
-    ) -> str:
-        """Save image file to storage and return file path"""
-        # Generate unique filename
-        file_hash = hashlib.sha256(image_data).hexdigest()[:16]
-        file_ext = Path(filename).suffix.lower()
-        unique_filename = f"{file_hash}_{filename}"
+    async def release_media_file(self, db: AsyncSession, media_file: MediaFile) -> int:
+        """
+        Drop a reference to a MediaFile and return the remaining count
         
-        # Create folder structure
-        folder_path = self.upload_dir / folder.strip('/')
-        folder_path.mkdir(parents=True, exist_ok=True)
+        The last release soft-deletes the row and removes its blobs from
+        the store unless another live row points at the same file.
+        """
+        await db.execute(
+            update(MediaFile)
+            .where(MediaFile.id == media_file.id, MediaFile.reference_count > 0)
+            .values(reference_count=MediaFile.reference_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        await db.refresh(media_file)
         
-        file_path = folder_path / unique_filename
+        if media_file.reference_count > 0:
+            return media_file.reference_count
         
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(image_data)
+        media_file.deleted_at = func.now()
+        await db.commit()
+        await db.refresh(media_file)
         
-        return str(file_path.relative_to(self.upload_dir))
+        shared = await db.execute(
+            select(MediaFile.id).where(
+                MediaFile.file_path == media_file.file_path,
+                MediaFile.deleted_at.is_(None)
+            ).limit(1)
+        )
+        if shared.first() is None:
+            self.store.delete(media_file.file_path)
+            variants = (media_file.image_metadata or {}).get('variants', {})
+            for variant in variants.values():
+                self.store.delete(variant['path'])
+        
+        return 0
     
     async def process_and_store_image(
         self,
@@ -232,90 +285,111 @@ class ImageProcessingService:
         title: str = "",
         description: str = "",
         folder: str = "migrated",
-        uploader_id: Optional[int] = None
+        uploader_id: Optional[int] = None,
+        image_data: Optional[bytes] = None
     ) -> Optional[MediaFile]:
-        """Complete workflow: download, process, and store image with metadata"""
+        """
+        Complete workflow: download, process, and store image with metadata
+        
+        Source bytes are hashed first; if a MediaFile with the same hash
+        exists it is returned without any image processing or disk writes.
+        Storing takes no reference: owners using the file call
+        link_media_file. Callers that already downloaded the image pass it
+        as `image_data`.
+        """
         
         # Download image
-        image_data = await self.download_image(image_url, base_url)
+        if image_data is None:
+            image_data = await self.download_image(image_url, base_url)
         if not image_data:
             return None
         
+        source_hash = ContentAddressedStore.hash_bytes(image_data)
+        
         try:
-            # Extract original metadata
-            original_metadata = self.extract_image_metadata(image_data)
-            
-            # Generate filename from URL or use UUID
-            parsed_url = urlparse(image_url)
-            original_filename = os.path.basename(parsed_url.path) or f"{uuid.uuid4()}.jpg"
-            
-            # Create main optimized version
-            optimized_data, optimized_metadata = self.optimize_image(image_data)
-            
-            # Save main image
-            file_path = await self.save_image_file(
-                optimized_data,
-                original_filename,
-                folder
-            )
-            
-            # Create responsive variants
-            variants = self.create_responsive_variants(image_data)
-            
-            # Save variants and build srcset info
-            variant_info = {}
-            for variant_name, (variant_data, variant_metadata) in variants.items():
-                variant_filename = f"{Path(original_filename).stem}_{variant_name}{Path(original_filename).suffix}"
-                variant_path = await self.save_image_file(
-                    variant_data,
-                    variant_filename, 
-                    f"{folder}/variants"
+            async with self._hash_lock(source_hash):
+                existing = await self.find_media_by_hash(db, source_hash)
+                if existing:
+                    return existing
+                
+                return await self._create_media_file(
+                    db, image_data, source_hash, image_url,
+                    alt_text, title, description, folder, uploader_id
                 )
-                variant_info[variant_name] = {
-                    'path': variant_path,
-                    'width': variant_metadata['width'],
-                    'height': variant_metadata['height'],
-                    'size': variant_metadata['size']
-                }
-            
-            # Calculate file hash for deduplication
-            file_hash = hashlib.sha256(optimized_data).hexdigest()
-            
-            # Create MediaFile record
-            media_file = MediaFile(
-                filename=Path(file_path).name,
-                original_filename=original_filename,
-                file_path=file_path,
-                file_size=len(optimized_data),
-                mime_type=f"image/{optimized_metadata['format'].lower()}",
-                file_hash=file_hash,
-                title={"en": title, "de": title} if title else None,
-                alt_text={"en": alt_text, "de": alt_text} if alt_text else None,
-                description={"en": description, "de": description} if description else None,
-                image_metadata={
-                    **optimized_metadata,
-                    'original_url': image_url,
-                    'variants': variant_info,
-                    'responsive_config': {
-                        'sizes': "(max-width: 768px) 100vw, (max-width: 1200px) 50vw, 33vw",
-                        'loading': 'lazy'
-                    }
-                },
-                folder=folder,
-                uploaded_by=uploader_id
-            )
-            
-            db.add(media_file)
-            await db.commit()
-            await db.refresh(media_file)
-            
-            return media_file
             
         except Exception as e:
             print(f"Failed to process and store image {image_url}: {e}")
             await db.rollback()
             return None
     
+    async def _create_media_file(
+        self,
+        db: AsyncSession,
+        image_data: bytes,
+        source_hash: str,
+        image_url: str,
+        alt_text: str,
+        title: str,
+        description: str,
+        folder: str,
+        uploader_id: Optional[int]
+    ) -> MediaFile:
+        # Decode, optimize and create responsive variants in a worker
+        processed = await self.process_image_data(image_data)
+        optimized_data, optimized_metadata = processed['optimized']
+        variants = processed['variants']
+        
+        # Generate filename from URL or use UUID
+        parsed_url = urlparse(image_url)
+        original_filename = os.path.basename(parsed_url.path) or f"{uuid.uuid4()}.jpg"
+        extension = f".{optimized_metadata['format'].lower().replace('jpeg', 'jpg')}"
+        
+        # Save main image
+        file_path, _ = await self.store.put(optimized_data, extension)
+        
+        # Save variants and build srcset info
+        variant_info = {}
+        for variant_name, (variant_data, variant_metadata) in variants.items():
+            variant_extension = f".{variant_metadata['format'].lower().replace('jpeg', 'jpg')}"
+            variant_path, _ = await self.store.put(variant_data, variant_extension)
+            variant_info[variant_name] = {
+                'path': variant_path,
+                'width': variant_metadata['width'],
+                'height': variant_metadata['height'],
+                'size': variant_metadata['size']
+            }
+        
+        # Create MediaFile record, keyed by the source hash for deduplication
+        media_file = MediaFile(
+            filename=Path(file_path).name,
+            original_filename=original_filename,
+            file_path=file_path,
+            file_size=len(optimized_data),
+            mime_type=f"image/{optimized_metadata['format'].lower()}",
+            file_hash=source_hash,
+            reference_count=0,
+            title={"en": title, "de": title} if title else None,
+            alt_text={"en": alt_text, "de": alt_text} if alt_text else None,
+            description={"en": description, "de": description} if description else None,
+            image_metadata={
+                **optimized_metadata,
+                'original_url': image_url,
+                'variants': variant_info,
+                'responsive_config': {
+                    'sizes': "(max-width: 768px) 100vw, (max-width: 1200px) 50vw, 33vw",
+                    'loading': 'lazy'
+                }
+            },
+            folder=folder,
+            uploaded_by=uploader_id
+        )
+        
+        db.add(media_file)
+        await db.commit()
+        await db.refresh(media_file)
+        
+        return media_file
+    
     def determine_presentation_style(self, metadata: Dict[str, Any], context: str = "") -> str:
         """Determine optimal presentation style based on image characteristics"""
         width = metadata.get('width', 0)
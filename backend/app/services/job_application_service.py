@@ -5,14 +5,12 @@ from sqlalchemy import select, and_, or_, func, desc, asc, text
 from datetime import datetime, timedelta
 from fastapi import UploadFile, HTTPException
 import uuid
-import hashlib
 import os
 import shutil
 import logging
 import mimetypes
 from pathlib import Path
 import asyncio
-import aiofiles
 from urllib.parse import urlparse
 
 from ..models.careers import (
@@ -23,6 +21,7 @@ from ..schemas.job_application import (
     JobApplicationCreate, JobApplicationUpdate, ApplicationSearchFilters,
     ApplicationStatusUpdate, CVUploadInfo
 )
+from ..utils.upload_stream import stream_upload_to_file, UploadTooLarge
 # from .email_service import SMTPEmailService
 # from .audit_service import AuditService
 
@@ -55,13 +54,13 @@ class JobApplicationService:
     ) -> Dict[str, Any]:
         """Create a new job application with CV upload"""
         
+        # Generate unique application ID
+        application_id = str(uuid.uuid4())
+        
+        # Validate and stream the CV to disk; validation errors surface as 4xx
+        cv_info = await self._process_cv_upload(cv_file, application_id)
+        
         try:
-            # Generate unique application ID
-            application_id = str(uuid.uuid4())
-            
-            # Validate and process CV file
-            cv_info = await self._process_cv_upload(cv_file, application_id)
-            
             # Create application record
             application = JobApplication(
                 id=application_id,
@@ -160,21 +159,15 @@ class JobApplicationService:
             raise HTTPException(status_code=500, detail=f"Failed to create application: {str(e)}")
     
     async def _process_cv_upload(self, cv_file: UploadFile, application_id: str) -> Dict[str, Any]:
-        """Process and validate CV file upload"""
+        """Validate a CV upload and stream it to disk"""
         
         # Validate file
         if not cv_file.filename:
             raise HTTPException(status_code=400, detail="No file provided")
         
-        # Check file size
-        file_content = await cv_file.read()
-        file_size = len(file_content)
-        
-        if file_size > self.max_file_size:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"File too large. Maximum size is {self.max_file_size // (1024*1024)}MB"
-            )
+        # Reject declared oversize uploads before reading anything
+        if cv_file.size is not None and cv_file.size > self.max_file_size:
+            raise HTTPException(status_code=400, detail=str(UploadTooLarge(self.max_file_size)))
         
         # Validate file extension
         file_ext = Path(cv_file.filename).suffix.lower()
@@ -196,45 +189,41 @@ class JobApplicationService:
                     detail="Invalid file type. Please upload PDF, DOC, or DOCX files only"
                 )
         
-        # Create application-specific directory
+        # Application-specific directory
         app_dir = self.upload_base_path / application_id
-        app_dir.mkdir(parents=True, exist_ok=True)
         
         # Generate secure filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_filename = f"cv_{timestamp}{file_ext}"
         file_path = app_dir / safe_filename
         
-        # Calculate file hash for integrity
-        file_hash = hashlib.sha256(file_content).hexdigest()
-        
         try:
-            # Save file
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(file_content)
-            
-            # Set secure permissions (read/write for owner only)
-            os.chmod(file_path, 0o600)
-            
-            return {
-                'filename': safe_filename,
-                'original_filename': cv_file.filename,
-                'file_path': str(file_path),
-                'file_size': file_size,
-                'mime_type': mime_type,
-                'file_hash': file_hash
-            }
-            
+            # Chunked copy: size limit and SHA-256 are checked as bytes arrive
+            stored = await stream_upload_to_file(cv_file, file_path, self.max_file_size)
+        except UploadTooLarge as e:
+            self._remove_empty_dir(app_dir)
+            raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
-            # Clean up on error
-            try:
-                if file_path.exists():
-                    file_path.unlink()
-                if app_dir.exists() and not any(app_dir.iterdir()):
-                    app_dir.rmdir()
-            except:
-                pass
+            self._remove_empty_dir(app_dir)
             raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+        
+        return {
+            'filename': safe_filename,
+            'original_filename': cv_file.filename,
+            'file_path': stored.path,
+            'file_size': stored.size,
+            'mime_type': mime_type,
+            'file_hash': stored.sha256
+        }
+    
+    @staticmethod
+    def _remove_empty_dir(directory: Path) -> None:
+        """Drop an application directory left empty by a failed upload"""
+        try:
+            if directory.exists() and not any(directory.iterdir()):
+                directory.rmdir()
+        except OSError:
+            pass
     
     async def get_application_by_id(self, application_id: str) -> Optional[JobApplication]:
         """Get job application by ID"""
@@ -11,6 +11,7 @@ from ..models.consultant import (
     Consultant, ConsultantKYC, ConsultantStatus, KYCStatus
 )
 from ..config import settings
+from ..utils.upload_stream import stream_upload_to_file, UploadTooLarge
 
 logger = logging.getLogger(__name__)
 
@@ -141,10 +142,14 @@ class KYCService:
             unique_filename = f"{consultant_id}_{document_type}_{uuid.uuid4().hex}{file_extension}"
             file_path = os.path.join(self.upload_dir, unique_filename)
             
-            # Save file
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
+            # Stream to disk in chunks; aborts as soon as the size limit is passed
+            try:
+                stored = await stream_upload_to_file(file, file_path, settings.max_file_size)
+            except UploadTooLarge as e:
+                return {
+                    'success': False,
+                    'error': str(e)
+                }
             
             # Update KYC record based on document type
             if document_type == 'identity':
@@ -179,6 +184,8 @@ class KYCService:
                     'document_type': document_type,
                     'document_subtype': document_subtype,
                     'filename': file.filename,
+                    'file_size': stored.size,
+                    'file_hash': stored.sha256,
                     'uploaded_at': datetime.utcnow().isoformat()
                 }
             }
@@ -0,0 +1,319 @@
+"""
+On-demand image derivatives
+
+Serves resized/re-encoded versions of stored images at request time. Widths
+are snapped to a fixed set so the number of derivatives per image stays
+bounded; generated files are kept in a size-capped LRU disk cache under
+settings.media_cache_dir, and concurrent requests for the same derivative
+share one render.
+"""
+
+import os
+import time
+import asyncio
+import bisect
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+
+import aiofiles
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.content import MediaFile
+from app.config import settings
+from app.services.image_processing_service import ImageProcessingService, image_service
+from app.utils.image_pipeline import avif_supported
+
+# URL extension -> (Pillow format, media type, quality)
+DERIVATIVE_FORMATS: Dict[str, Tuple[str, str, int]] = {
+    'jpg': ('JPEG', 'image/jpeg', 85),
+    'jpeg': ('JPEG', 'image/jpeg', 85),
+    'webp': ('WEBP', 'image/webp', 80),
+    'png': ('PNG', 'image/png', 0),
+    'avif': ('AVIF', 'image/avif', 60),
+}
+
+# Negotiated formats, smallest typical output first
+NEGOTIATION_ORDER = ['avif', 'webp', 'jpg']
+
+
+def supported_formats() -> List[str]:
+    """URL extensions this install can encode"""
+    return [ext for ext in DERIVATIVE_FORMATS if ext != 'avif' or avif_supported()]
+
+
+def parse_accept(accept: Optional[str]) -> Dict[str, float]:
+    """Media types from an Accept header with their q-values"""
+    accepted = {}
+    for part in (accept or '').split(','):
+        media_type, _, params = part.strip().partition(';')
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[media_type.strip().lower()] = quality
+    return accepted
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """
+    Pick the smallest format the client explicitly accepts
+
+    Wildcards are not taken as AVIF/WebP support since older browsers send
+    */* for images they cannot decode; JPEG is the universal fallback.
+    """
+    accepted = parse_accept(accept)
+    available = supported_formats()
+    for ext in NEGOTIATION_ORDER[:-1]:
+        if ext in available and accepted.get(DERIVATIVE_FORMATS[ext][1], 0) > 0:
+            return ext
+    return NEGOTIATION_ORDER[-1]
+
+
+@dataclass
+class DerivativeMetrics:
+    """Counters for the derivative cache"""
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+
+
+class DerivativeCache:
+    """
+    Size-capped LRU cache of derivative files on disk
+
+    Recency is tracked in memory; on start-up existing files are picked up
+    in modification-time order so a restart keeps the cache warm. Entries
+    being sent to a client are pinned for a short lease so eviction cannot
+    unlink them mid-response.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, pin_seconds: float = 60.0):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.pin_seconds = pin_seconds
+        self.total_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._pins: Dict[str, float] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def _scan(self) -> List[Tuple[str, int]]:
+        if not self.cache_dir.is_dir():
+            return []
+        files = []
+        for path in self.cache_dir.rglob('*'):
+            if path.is_file() and not path.name.startswith('.'):
+                stat = path.stat()
+                files.append((stat.st_mtime, str(path.relative_to(self.cache_dir)), stat.st_size))
+        return [(key, size) for _, key, size in sorted(files)]
+
+    async def load(self) -> None:
+        """Pick up files from an earlier run; the directory walk runs in a thread"""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            for key, size in await asyncio.to_thread(self._scan):
+                if key not in self._entries:
+                    self._entries[key] = size
+                    self._entries.move_to_end(key, last=False)
+                    self.total_bytes += size
+            self._loaded = True
+            self._evict()
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def get(self, key: str, pin: bool = False) -> Optional[Path]:
+        """Cached file for key, marked as most recently used and optionally pinned"""
+        if key not in self._entries:
+            return None
+        path = self.path_for(key)
+        if not path.is_file():
+            self.total_bytes -= self._entries.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        if pin:
+            self.pin(key)
+        return path
+
+    def pin(self, key: str) -> None:
+        """Keep key from being evicted until unpinned (or the lease runs out)"""
+        self._pins[key] = time.monotonic() + self.pin_seconds
+
+    def unpin(self, key: str) -> None:
+        if self._pins.pop(key, None) is not None:
+            self._evict()
+
+    def _pinned(self, key: str) -> bool:
+        expires = self._pins.get(key)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            del self._pins[key]
+            return False
+        return True
+
+    async def put(self, key: str, data: bytes, pin: bool = False) -> Path:
+        """Write data atomically and evict least recently used files over the cap"""
+        await self.load()
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            async with aiofiles.open(temp_path, 'wb') as f:
+                await f.write(data)
+            os.replace(temp_path, path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)
+        self._entries[key] = len(data)
+        self.total_bytes += len(data)
+        if pin:
+            self.pin(key)
+        self._evict(keep=key)
+        return path
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        # Oldest first; pinned entries (and keep, which may exceed the cap on its own) are skipped
+        for key in list(self._entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key == keep or self._pinned(key):
+                continue
+            self.total_bytes -= self._entries.pop(key)
+            try:
+                self.path_for(key).unlink()
+            except FileNotFoundError:
+                pass
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MediaDerivativeService:
+    """Lazily render, cache and coalesce image derivatives"""
+
+    def __init__(
+        self,
+        processor: ImageProcessingService,
+        cache: DerivativeCache,
+        widths: Optional[List[int]] = None
+    ):
+        self.processor = processor
+        self.cache = cache
+        self.widths = sorted(widths or settings.media_derivative_widths)
+        self.metrics = DerivativeMetrics()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def snap_width(self, width: int) -> int:
+        """Smallest allowed width >= the requested one (capped at the largest)"""
+        index = bisect.bisect_left(self.widths, width)
+        return self.widths[min(index, len(self.widths) - 1)]
+
+    @staticmethod
+    def cache_key(media_file: MediaFile, width: int, extension: str) -> str:
+        content_hash = media_file.file_hash
+        return f"{content_hash[:2]}/{content_hash}_w{width}.{extension}"
+
+    async def get_media_file(self, db: AsyncSession, media_id: int) -> Optional[MediaFile]:
+        result = await db.execute(
+            select(MediaFile).where(
+                MediaFile.id == media_id,
+                MediaFile.deleted_at.is_(None)
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get_derivative(self, media_file: MediaFile, width: int, extension: str, pin: bool = False) -> Path:
+        """
+        Path of the cached derivative, rendering it if needed
+
+        Only one render per derivative runs at a time; other requests for
+        the same key wait for its result, and take over if that request is
+        cancelled. With pin=True the file stays on disk until
+        cache.unpin(key) so it can be streamed safely.
+        """
+        extension = extension.lower()
+        key = self.cache_key(media_file, width, extension)
+        await self.cache.load()
+
+        while True:
+            cached = self.cache.get(key, pin=pin)
+            if cached:
+                self.metrics.hits += 1
+                return cached
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self.metrics.coalesced += 1
+            try:
+                path = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if pending.cancelled():
+                    # The rendering request went away; retry (and maybe render) ourselves
+                    continue
+                raise
+            if pin:
+                self.cache.pin(key)
+            return path
+
+        self.metrics.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            path = await self._render(media_file, width, extension, key, pin)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; don't warn if there are none
+            raise
+        else:
+            future.set_result(path)
+            return path
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _render(self, media_file: MediaFile, width: int, extension: str, key: str, pin: bool = False) -> Path:
+        source_path = self.processor.store.absolute_path(media_file.file_path)
+        async with aiofiles.open(source_path, 'rb') as f:
+            source = await f.read()
+
+        format, _, quality = DERIVATIVE_FORMATS[extension]
+        data, _ = await self.processor.render_derivative(source, width, format, quality)
+        return await self.cache.put(key, data, pin=pin)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **asdict(self.metrics),
+            'evictions': self.cache.evictions,
+            'entries': len(self.cache),
+            'bytes': self.cache.total_bytes,
+            'max_bytes': self.cache.max_bytes
+        }
+
+
+# Global instance
+derivative_service = MediaDerivativeService(
+    image_service,
+    DerivativeCache(settings.media_cache_dir, settings.media_cache_max_bytes)
+)
@@ -0,0 +1,94 @@
+"""
+Content-addressed storage for media blobs
+
+Blobs are stored under their SHA-256 in sharded directories
+(``ab/cd/abcd...<ext>``), so identical bytes always map to the same path
+and are only ever written once.
+"""
+
+import os
+import hashlib
+import uuid
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import aiofiles
+
+
+@dataclass
+class StoreMetrics:
+    """Write/reuse counters for the blob store"""
+    writes: int = 0
+    reused: int = 0
+    bytes_written: int = 0
+    deleted: int = 0
+
+
+class ContentAddressedStore:
+    """Blob store keyed by SHA-256 of the content"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.metrics = StoreMetrics()
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def relative_path(content_hash: str, extension: str = "") -> str:
+        """Sharded path for a hash, e.g. ab/cd/abcd1234....jpg"""
+        return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{extension.lower()}"
+
+    def absolute_path(self, relative_path: str) -> Path:
+        return self.root / relative_path
+
+    def exists(self, relative_path: str) -> bool:
+        return self.absolute_path(relative_path).is_file()
+
+    async def put(
+        self,
+        data: bytes,
+        extension: str = "",
+        content_hash: Optional[str] = None
+    ) -> Tuple[str, bool]:
+        """
+        Store data and return (relative_path, written)
+
+        Existing blobs are left untouched. New blobs are written to a temp
+        file and renamed into place so readers never see partial files.
+        """
+        content_hash = content_hash or self.hash_bytes(data)
+        relative_path = self.relative_path(content_hash, extension)
+        target = self.absolute_path(relative_path)
+
+        if target.is_file():
+            self.metrics.reused += 1
+            return relative_path, False
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            async with aiofiles.open(temp_path, 'wb') as f:
+                await f.write(data)
+            os.replace(temp_path, target)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+        self.metrics.writes += 1
+        self.metrics.bytes_written += len(data)
+        return relative_path, True
+
+    def delete(self, relative_path: str) -> bool:
+        """Remove a blob; returns False if it was already gone"""
+        try:
+            self.absolute_path(relative_path).unlink()
+        except FileNotFoundError:
+            return False
+        self.metrics.deleted += 1
+        return True
+
+    def get_metrics(self) -> Dict[str, int]:
+        return asdict(self.metrics)
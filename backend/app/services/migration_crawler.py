@@ -0,0 +1,623 @@
+"""
+Site Migration Crawler
+
+Crawls a site from a sitemap or seed URLs and migrates every HTML page into
+a draft Page: fetch -> extract -> download images -> build variants ->
+create/update Page, with many pages in flight at once.
+
+All requests share one pooled HTTP/2 client (HTTP/1.1 if the h2 package is
+missing). Each host gets its own concurrency limit and minimum request gap,
+robots.txt rules (for pages and images) and Crawl-delay are honoured,
+429/503 responses back off using Retry-After, and ETag/Last-Modified
+validators from earlier runs are sent for pages that still exist so
+unchanged ones come back as 304 and are skipped.
+"""
+
+import re
+import json
+import time
+import asyncio
+import logging
+import importlib.util
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Any
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+from bs4 import BeautifulSoup
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.content import Page, MediaFile, MediaReference
+from app.database import AsyncSessionLocal
+from app.config import settings
+from app.services.content_extraction_service import (
+    ContentExtractionService,
+    ExtractedContent,
+    content_extraction_service
+)
+from app.services.image_processing_service import ImageProcessingService, image_service
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+# Retry a rate-limited or unavailable URL this many times
+MAX_RETRIES = 2
+
+# Migrated images are referenced through the negotiating derivative endpoint
+MEDIA_URL_PREFIX = "/api/v1/public/media"
+
+# Page fields that may not be NULL
+REQUIRED_FIELDS = ('title', 'content')
+
+
+@dataclass
+class CrawlProgress:
+    """Counters reported while a crawl runs"""
+    discovered: int = 0
+    fetched: int = 0
+    not_modified: int = 0
+    skipped_robots: int = 0
+    skipped_non_html: int = 0
+    failed: int = 0
+    retried: int = 0
+    pages_created: int = 0
+    pages_updated: int = 0
+    images_stored: int = 0
+    images_reused: int = 0
+    images_failed: int = 0
+    images_skipped_robots: int = 0
+    bytes_downloaded: int = 0
+    started_at: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+    @property
+    def completed(self) -> int:
+        return (self.pages_created + self.pages_updated + self.not_modified
+                + self.skipped_robots + self.skipped_non_html + self.failed)
+
+
+class HostThrottle:
+    """Per-host concurrency limit plus a minimum gap between request starts"""
+
+    def __init__(self, concurrency: int, delay_seconds: float):
+        self.delay_seconds = delay_seconds
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    def back_off(self, seconds: float) -> None:
+        """Hold all requests to this host for `seconds` (e.g. after a 429)"""
+        self._next_start = max(self._next_start, time.monotonic() + seconds)
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            async with self._lock:
+                wait = self._next_start - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._next_start = time.monotonic() + self.delay_seconds
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._semaphore.release()
+
+
+class ValidatorStore:
+    """ETag/Last-Modified per URL, persisted between crawls as JSON"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = Path(path) if path else None
+        self._validators: Dict[str, Dict[str, str]] = {}
+        if self.path and self.path.is_file():
+            try:
+                self._validators = json.loads(self.path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable crawler state {self.path}: {e}")
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        validators = self._validators.get(url, {})
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def update(self, url: str, response: httpx.Response) -> None:
+        etag = response.headers.get('etag')
+        last_modified = response.headers.get('last-modified')
+        if etag or last_modified:
+            self._validators[url] = {'etag': etag, 'last_modified': last_modified}
+        else:
+            self._validators.pop(url, None)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+        temp_path.write_text(json.dumps(self._validators))
+        temp_path.replace(self.path)
+
+
+def slug_from_url(url: str) -> str:
+    """Page slug from a URL path, e.g. /services/ai-consulting/ -> services-ai-consulting"""
+    path = urlparse(url).path
+    path = re.sub(r'\.(html?|php|aspx?)$', '', path.strip('/'), flags=re.IGNORECASE)
+    slug = re.sub(r'[^a-z0-9]+', '-', path.lower()).strip('-')
+    return slug[:255] or 'home'
+
+
+def merge_language(existing: Optional[Dict[str, Any]], language: str, value: Any, required: bool = False):
+    """Set one language of a multilingual JSON field, keeping the others"""
+    merged = dict(existing or {})
+    if value or required:
+        merged[language] = value
+    else:
+        merged.pop(language, None)
+    return merged if merged or required else None
+
+
+def rewrite_image_sources(content_html: str, base_url: str, image_urls: Dict[str, str]) -> str:
+    """Point <img> tags at migrated media, resolving relative src attributes"""
+    if not image_urls or not content_html:
+        return content_html
+    soup = BeautifulSoup(content_html, 'html.parser')
+    for img in soup.find_all('img'):
+        for attr in ('src', 'data-src', 'data-lazy-src'):
+            if img.get(attr):
+                media_url = image_urls.get(urljoin(base_url, img[attr]))
+                if media_url:
+                    img['src'] = media_url
+                    img.attrs.pop('srcset', None)
+                break
+    return str(soup)
+
+
+def retry_after_seconds(response: httpx.Response, default: float) -> float:
+    """Delay requested by a Retry-After header (seconds or HTTP date)"""
+    value = response.headers.get('retry-after')
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+
+
+class MigrationCrawler:
+    """Concurrent crawl-and-migrate pipeline for whole sites"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        extractor: ContentExtractionService = content_extraction_service,
+        image_processor: ImageProcessingService = image_service,
+        max_concurrency: int = settings.crawler_max_concurrency,
+        per_host_concurrency: int = settings.crawler_per_host_concurrency,
+        request_delay_seconds: float = settings.crawler_request_delay_seconds,
+        max_pages: int = settings.crawler_max_pages,
+        user_agent: str = settings.crawler_user_agent,
+        state_file: Optional[str] = settings.crawler_state_file,
+        migrate_images: bool = True,
+        page_status: str = 'draft',
+        on_progress: Optional[Callable[[CrawlProgress], None]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.session_factory = session_factory
+        self.extractor = extractor
+        self.image_processor = image_processor
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.request_delay_seconds = request_delay_seconds
+        self.max_pages = max_pages
+        self.user_agent = user_agent
+        self.validators = ValidatorStore(state_file)
+        self.migrate_images = migrate_images
+        self.page_status = page_status
+        self.on_progress = on_progress
+        self.transport = transport
+
+        self.progress = CrawlProgress()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._throttles: Dict[str, HostThrottle] = {}
+        self._robots: Dict[str, Optional[RobotFileParser]] = {}
+        self._robots_lock = asyncio.Lock()
+        self._slug_lock = asyncio.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._seen: Set[str] = set()
+        self._allowed_hosts: Set[str] = set()
+        self._follow_links = False
+        self._started = 0.0
+
+    def _create_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE and self.transport is None,
+            transport=self.transport,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency * 2,
+                max_keepalive_connections=self.max_concurrency * 2
+            ),
+            timeout=settings.crawler_timeout_seconds,
+            follow_redirects=True,
+            headers={'User-Agent': self.user_agent}
+        )
+
+    async def crawl(
+        self,
+        seed_urls: Optional[List[str]] = None,
+        sitemap_url: Optional[str] = None,
+        follow_links: Optional[bool] = None
+    ) -> CrawlProgress:
+        """
+        Migrate every page reachable from the sitemap and/or seeds
+
+        Links found on pages are followed (same hosts only) when crawling
+        from seeds; a sitemap crawl sticks to the sitemap unless
+        follow_links=True.
+        """
+        seed_urls = list(seed_urls or [])
+        self._follow_links = bool(seed_urls) if follow_links is None else follow_links
+        self.progress = CrawlProgress(started_at=datetime.utcnow().isoformat())
+        self._started = time.monotonic()
+        self._seen = set()
+        self._allowed_hosts = set()
+        self._queue = asyncio.Queue()
+
+        async with self._create_client() as client:
+            self._client = client
+            try:
+                urls = list(seed_urls)
+                if sitemap_url:
+                    self._allowed_hosts.add(urlparse(sitemap_url).netloc)
+                    urls.extend(await self.read_sitemap(sitemap_url))
+                self._allowed_hosts.update(urlparse(url).netloc for url in urls)
+
+                for url in urls:
+                    self._enqueue(url)
+
+                workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+                try:
+                    await self._queue.join()
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+            finally:
+                self._client = None
+                self.validators.save()
+
+        self._report()
+        logger.info(f"Crawl finished: {asdict(self.progress)}")
+        return self.progress
+
+    def _enqueue(self, url: str, attempt: int = 0) -> None:
+        if attempt == 0:
+            if url in self._seen or len(self._seen) >= self.max_pages:
+                return
+            self._seen.add(url)
+            self.progress.discovered += 1
+        self._queue.put_nowait((url, attempt))
+
+    def _throttle(self, host: str) -> HostThrottle:
+        if host not in self._throttles:
+            self._throttles[host] = HostThrottle(self.per_host_concurrency, self.request_delay_seconds)
+        return self._throttles[host]
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """Throttled GET on the shared client"""
+        async with self._throttle(urlparse(url).netloc):
+            response = await self._client.get(url, headers=headers)
+        self.progress.bytes_downloaded += len(response.content)
+        return response
+
+    async def read_sitemap(self, sitemap_url: str, depth: int = 0) -> List[str]:
+        """Page URLs from a sitemap, following sitemap indexes"""
+        try:
+            response = await self._get(sitemap_url)
+            if response.status_code != 200:
+                logger.warning(f"Sitemap {sitemap_url} returned {response.status_code}")
+                return []
+            root = ET.fromstring(response.content)
+        except (httpx.HTTPError, ET.ParseError) as e:
+            logger.warning(f"Failed to read sitemap {sitemap_url}: {e}")
+            return []
+
+        locations = [loc.text.strip() for loc in root.iter(f'{SITEMAP_NS}loc') if loc.text]
+        if root.tag == f'{SITEMAP_NS}sitemapindex' and depth < 3:
+            urls = []
+            for nested in await asyncio.gather(*[self.read_sitemap(loc, depth + 1) for loc in locations]):
+                urls.extend(nested)
+            return urls
+        return locations
+
+    async def _robots_for(self, url: str) -> Optional[RobotFileParser]:
+        """Parsed robots.txt for the URL's host (None means allow everything)"""
+        parsed = urlparse(url)
+        host = parsed.netloc
+        async with self._robots_lock:
+            if host in self._robots:
+                return self._robots[host]
+
+            robots_url = f"{parsed.scheme}://{host}/robots.txt"
+            parser = RobotFileParser(robots_url)
+            try:
+                response = await self._get(robots_url)
+                if response.status_code >= 500:
+                    parser.disallow_all = True
+                elif response.status_code >= 400:
+                    parser = None
+                else:
+                    parser.parse(response.text.splitlines())
+            except httpx.HTTPError as e:
+                logger.warning(f"Failed to fetch {robots_url}: {e}")
+                parser = None
+
+            if parser is not None:
+                delay = parser.crawl_delay(self.user_agent)
+                rate = parser.request_rate(self.user_agent)
+                if rate and rate.requests:
+                    delay = max(delay or 0, rate.seconds / rate.requests)
+                if delay:
+                    throttle = self._throttle(host)
+                    throttle.delay_seconds = max(throttle.delay_seconds, float(delay))
+
+            self._robots[host] = parser
+            return parser
+
+    async def _worker(self) -> None:
+        while True:
+            url, attempt = await self._queue.get()
+            try:
+                await self._process_url(url, attempt)
+            except Exception as e:
+                self.progress.failed += 1
+                logger.error(f"Failed to migrate {url}: {type(e).__name__}: {e}")
+            finally:
+                self._report()
+                self._queue.task_done()
+
+    async def _allowed(self, url: str) -> bool:
+        robots = await self._robots_for(url)
+        return robots is None or robots.can_fetch(self.user_agent, url)
+
+    async def _process_url(self, url: str, attempt: int) -> None:
+        if not await self._allowed(url):
+            self.progress.skipped_robots += 1
+            return
+
+        validators = self.validators.request_headers(url)
+        if validators:
+            async with self.session_factory() as db:
+                if await self._find_migrated_page(db, url) is None:
+                    # The page was deleted since the last crawl; fetch it in full to re-create it
+                    validators = {}
+
+        response = await self._get(url, headers={
+            'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.5',
+            **validators
+        })
+
+        if response.status_code in (429, 503):
+            self._throttle(urlparse(url).netloc).back_off(
+                retry_after_seconds(response, self.request_delay_seconds * 4 or 1.0)
+            )
+            if attempt < MAX_RETRIES:
+                self.progress.retried += 1
+                self._enqueue(url, attempt + 1)
+            else:
+                self.progress.failed += 1
+            return
+
+        if response.status_code == 304:
+            self.progress.not_modified += 1
+            return
+
+        self.progress.fetched += 1
+        if response.status_code != 200:
+            self.progress.failed += 1
+            return
+
+        if 'html' not in response.headers.get('content-type', 'text/html'):
+            self.progress.skipped_non_html += 1
+            return
+
+        extracted = await self.extractor.extract_from_html_async(response.text, str(response.url))
+
+        if self._follow_links:
+            for link in extracted.links:
+                if urlparse(link).netloc in self._allowed_hosts:
+                    self._enqueue(link)
+
+        async with self.session_factory() as db:
+            page = await self._find_migrated_page(db, url)
+            media_files = await self._migrate_images(db, extracted, page) if self.migrate_images else {}
+            image_urls = {
+                image_url: f"{MEDIA_URL_PREFIX}/{media_file.id}/w/{media_file.image_metadata.get('width', 1200)}"
+                for image_url, media_file in media_files.items()
+            }
+            page = await self._save_page(db, url, extracted, image_urls, page, base_url=str(response.url))
+            if self.migrate_images:
+                await self._link_images(db, page, media_files)
+
+        # Only remember validators once the page is safely stored
+        self.validators.update(url, response)
+
+    async def _download(self, url: str) -> Optional[bytes]:
+        try:
+            response = await self._get(url, headers={'Accept': 'image/*'})
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to download image {url}: {e}")
+            return None
+        return response.content if response.status_code == 200 else None
+
+    async def _migrate_images(
+        self,
+        db: AsyncSession,
+        extracted: ExtractedContent,
+        page: Optional[Page] = None
+    ) -> Dict[str, MediaFile]:
+        """
+        Download content images in parallel, then store them with variants
+
+        Images the page already links from an earlier run are reused without
+        downloading them again. Returns {original url: MediaFile}; the page
+        links the files once saved.
+        """
+        images = [image for image in extracted.images if not image.is_decorative]
+        migrated = await self._linked_images(db, page) if page is not None else {}
+        migrated = {image.url: migrated[image.url] for image in images if image.url in migrated}
+        self.progress.images_reused += len(migrated)
+
+        unique_urls = []
+        for url in dict.fromkeys(image.url for image in images):
+            if url in migrated:
+                continue
+            if not await self._allowed(url):
+                self.progress.images_skipped_robots += 1
+                continue
+            unique_urls.append(url)
+        downloads = await asyncio.gather(*[self._download(url) for url in unique_urls])
+
+        by_url = {image.url: image for image in images}
+        for url, image_data in zip(unique_urls, downloads):
+            if not image_data:
+                self.progress.images_failed += 1
+                continue
+            image = by_url[url]
+            media_file = await self.image_processor.process_and_store_image(
+                db,
+                url,
+                alt_text=image.alt_text,
+                title=image.title,
+                description=image.caption,
+                image_data=image_data
+            )
+            if media_file is None:
+                self.progress.images_failed += 1
+                continue
+            self.progress.images_stored += 1
+            migrated[url] = media_file
+        return migrated
+
+    async def _linked_images(self, db: AsyncSession, page: Page) -> Dict[str, MediaFile]:
+        """Live media files the page references, by the URL they were migrated from"""
+        result = await db.execute(
+            select(MediaFile)
+            .join(MediaReference, MediaReference.media_file_id == MediaFile.id)
+            .where(
+                MediaReference.owner_type == 'page',
+                MediaReference.owner_id == page.id,
+                MediaFile.deleted_at.is_(None)
+            )
+        )
+        return {
+            media_file.image_metadata['original_url']: media_file
+            for media_file in result.scalars()
+            if (media_file.image_metadata or {}).get('original_url')
+        }
+
+    async def _link_images(self, db: AsyncSession, page: Page, media_files: Dict[str, MediaFile]) -> None:
+        """Reference the page's images once each and release the ones it no longer shows"""
+        current = {media_file.id: media_file for media_file in media_files.values()}
+        for media_file in current.values():
+            await self.image_processor.link_media_file(db, media_file, 'page', page.id)
+        await self.image_processor.release_owner_media(db, 'page', page.id, keep=current)
+
+    @staticmethod
+    async def _find_migrated_page(db: AsyncSession, url: str) -> Optional[Page]:
+        """The live page this crawler created for url, if any"""
+        result = await db.execute(
+            select(Page).where(Page.canonical_url == url[:500], Page.deleted_at.is_(None))
+            .order_by(Page.id).limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def _save_page(
+        self,
+        db: AsyncSession,
+        url: str,
+        extracted: ExtractedContent,
+        image_urls: Dict[str, str],
+        page: Optional[Page] = None,
+        base_url: Optional[str] = None
+    ) -> Page:
+        """
+        Create the draft Page for a URL, or refresh it on re-migration
+
+        Only pages this crawler created (found by _find_migrated_page from
+        their canonical source URL) are refreshed, and only their English text: other languages
+        stay as edited. A hand-made page that already owns the slug is left
+        alone and the migrated page gets a numbered slug instead.
+        """
+        content_html = rewrite_image_sources(extracted.content_html, base_url or url, image_urls)
+        canonical_url = url[:500]
+        english = {
+            'title': extracted.title,
+            'content': content_html,
+            'excerpt': extracted.excerpt,
+            'meta_description': extracted.meta_description,
+            'content_blocks': extracted.suggested_blocks
+        }
+
+        if page is not None:
+            for key, value in english.items():
+                setattr(page, key, merge_language(getattr(page, key), 'en', value, required=key in REQUIRED_FIELDS))
+            await db.commit()
+            self.progress.pages_updated += 1
+            return page
+
+        # Pick and insert the slug under one lock so two workers cannot claim the same one
+        async with self._slug_lock:
+            page = Page(
+                slug=await self._free_slug(db, slug_from_url(url)),
+                status=self.page_status,
+                canonical_url=canonical_url,
+                **{
+                    key: merge_language(None, 'en', value, required=key in REQUIRED_FIELDS)
+                    for key, value in english.items()
+                }
+            )
+            db.add(page)
+            await db.commit()
+        self.progress.pages_created += 1
+        return page
+
+    @staticmethod
+    async def _free_slug(db: AsyncSession, slug: str) -> str:
+        """slug, or slug-2, slug-3, ... if pages (including deleted ones) already use it"""
+        result = await db.execute(
+            select(Page.slug).where(or_(Page.slug == slug, Page.slug.like(f"{slug}-%")))
+        )
+        taken = set(result.scalars())
+        candidate, number = slug, 1
+        while candidate in taken:
+            number += 1
+            candidate = f"{slug}-{number}"
+        return candidate
+
+    def _report(self) -> None:
+        self.progress.elapsed_seconds = round(time.monotonic() - self._started, 2)
+        if self.on_progress:
+            self.on_progress(self.progress)
+
+    def get_progress(self) -> Dict[str, Any]:
+        return {**asdict(self.progress), 'completed': self.progress.completed}
@@ -1,17 +1,26 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, or_, func, select
+from sqlalchemy import and_, or_, func, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
+from collections import defaultdict
+from pathlib import Path
 import json
+import os
 
 from ..models.translation import (
     Translation, MultilingualContent, TranslationMemory, 
     get_localized_text, create_multilingual_field
 )
+from ..config import settings
+from .translation_bundle_cache import TranslationBundle, translation_bundle_cache
 # from ..models.user import AdminUser  # Will be added when needed
 
 
 class MultilingualContentService:
+    # (namespace, key) pairs per query, two bound parameters each
+    KEY_LOOKUP_CHUNK_SIZE = 400
+    
     def __init__(self, db: AsyncSession):
         self.db = db
         self.supported_languages = ['en', 'de']
@@ -26,52 +35,71 @@ class MultilingualContentService:
     ) -> str:
         """Get translation for a specific key with fallback support"""
         
-        # Try to get translation for requested language
-        result = await self.db.execute(
-            select(Translation).filter(
-                and_(
-                    Translation.namespace == namespace,
-                    Translation.key == key,
-                    Translation.target_language == language,
-                    Translation.status.in_(['approved', 'translated'])
-                )
-            )
+        translations = await self.get_translations_for_keys(
+            [(namespace, key)], language=language, fallback=fallback
         )
-        translation = result.scalar_one_or_none()
+        return translations[(namespace, key)]
+    
+    async def get_translations_for_keys(
+        self,
+        keys: Iterable[Tuple[str, str]],
+        language: str = 'en',
+        fallback: bool = True
+    ) -> Dict[Tuple[str, str], str]:
+        """
+        Resolve many (namespace, key) pairs with one query per chunk
         
-        if translation and translation.translated_text:
-            return translation.translated_text
+        All rows of each pair are fetched at once and the priority is
+        applied in Python: target language, then English (if fallback),
+        then the source text, then the key itself.
+        """
         
-        # Fallback to English if requested and available
-        if fallback and language != 'en':
+        pairs = list(dict.fromkeys(keys))
+        rows_by_pair: Dict[Tuple[str, str], List[Any]] = defaultdict(list)
+        
+        for start in range(0, len(pairs), self.KEY_LOOKUP_CHUNK_SIZE):
+            chunk = pairs[start:start + self.KEY_LOOKUP_CHUNK_SIZE]
             result = await self.db.execute(
-                select(Translation).filter(
-                    and_(
-                        Translation.namespace == namespace,
-                        Translation.key == key,
-                        Translation.target_language == 'en',
-                        Translation.status.in_(['approved', 'translated'])
-                    )
-                )
+                select(
+                    Translation.namespace,
+                    Translation.key,
+                    Translation.target_language,
+                    Translation.status,
+                    Translation.translated_text,
+                    Translation.source_text
+                ).filter(
+                    tuple_(Translation.namespace, Translation.key).in_(chunk)
+                ).order_by(Translation.created_at)
             )
-            en_translation = result.scalar_one_or_none()
-            
-            if en_translation and en_translation.translated_text:
-                return en_translation.translated_text
+            for row in result:
+                rows_by_pair[(row.namespace, row.key)].append(row)
         
-        # Fallback to source text if available
-        result = await self.db.execute(
-            select(Translation).filter(
-                and_(
-                    Translation.namespace == namespace,
-                    Translation.key == key
-                )
-            )
-        )
-        source_translation = result.scalar_one_or_none()
+        return {
+            pair: self._resolve_translation(rows_by_pair.get(pair, []), pair[1], language, fallback)
+            for pair in pairs
+        }
+    
+    @staticmethod
+    def _resolve_translation(rows: List[Any], key: str, language: str, fallback: bool) -> str:
+        """Pick the best text among all rows of one (namespace, key)"""
+        
+        published = {
+            row.target_language: row.translated_text
+            for row in rows
+            if row.status in ('approved', 'translated') and row.translated_text
+        }
         
-        if source_translation and source_translation.source_text:
-            return source_translation.source_text
+        if language in published:
+            return published[language]
+        
+        # Fallback to English if requested and available
+        if fallback and language != 'en' and 'en' in published:
+            return published['en']
+        
+        # Fallback to source text if available
+        for row in rows:
+            if row.source_text:
+                return row.source_text
         
         # Return key as last resort
         return key
@@ -84,61 +112,78 @@ class MultilingualContentService:
     ) -> Dict[str, str]:
         """Get all translations for a namespace in specified language"""
         
-        translations = {}
+        languages = {language, 'en'} if fallback else {language}
         
-        # Get all translations for the namespace and language
+        # Target language and English fallbacks in a single query
         result = await self.db.execute(
-            select(Translation).filter(
+            select(
+                Translation.key,
+                Translation.target_language,
+                Translation.translated_text
+            ).filter(
                 and_(
                     Translation.namespace == namespace,
-                    Translation.target_language == language,
+                    Translation.target_language.in_(languages),
                     Translation.status.in_(['approved', 'translated'])
                 )
             )
         )
-        results = result.scalars().all()
         
-        # Build translations dictionary
-        for translation in results:
-            if translation.translated_text:
-                translations[translation.key] = translation.translated_text
+        translations = {}
+        fallbacks = {}
+        for key, target_language, translated_text in result:
+            if not translated_text:
+                continue
+            if target_language == language:
+                translations[key] = translated_text
+            else:
+                fallbacks[key] = translated_text
         
-        # If fallback enabled and language is not English, get English fallbacks
-        if fallback and language != 'en':
-            missing_keys = set()
-            
-            # Find keys that don't have translations in target language
-            result = await self.db.execute(
-                select(Translation.key).filter(
-                    Translation.namespace == namespace
-                ).distinct()
-            )
-            all_keys = result.scalars().all()
-            
-            for key in all_keys:
-                if key not in translations:
-                    missing_keys.add(key)
-            
-            # Get English fallbacks for missing keys
-            if missing_keys:
-                result = await self.db.execute(
-                    select(Translation).filter(
-                        and_(
-                            Translation.namespace == namespace,
-                            Translation.key.in_(missing_keys),
-                            Translation.target_language == 'en',
-                            Translation.status.in_(['approved', 'translated'])
-                        )
-                    )
-                )
-                en_translations = result.scalars().all()
-                
-                for translation in en_translations:
-                    if translation.key not in translations and translation.translated_text:
-                        translations[translation.key] = translation.translated_text
+        for key, translated_text in fallbacks.items():
+            translations.setdefault(key, translated_text)
         
         return translations
     
+    async def get_translation_bundle(self, namespace: str, language: str = 'en') -> TranslationBundle:
+        """Get the cached bundle for a namespace, English fallbacks merged"""
+        
+        return await translation_bundle_cache.get(
+            namespace,
+            language,
+            lambda: self.get_translations_batch(namespace, language, fallback=True)
+        )
+    
+    async def export_translation_bundles(
+        self,
+        directory: Optional[str] = None,
+        languages: Optional[List[str]] = None
+    ) -> List[Path]:
+        """Write every bundle as static {directory}/{language}/{namespace}.json"""
+        
+        root = Path(directory or settings.translation_bundle_export_dir)
+        result = await self.db.execute(
+            select(Translation.namespace).distinct().order_by(Translation.namespace)
+        )
+        namespaces = result.scalars().all()
+        
+        written = []
+        for language in languages or self.supported_languages:
+            target_dir = root / language
+            target_dir.mkdir(parents=True, exist_ok=True)
+            for namespace in namespaces:
+                bundle = await self.get_translation_bundle(namespace, language)
+                path = target_dir / f"{namespace}.json"
+                # Write next to the target and rename so readers never see partial files
+                tmp_path = path.with_suffix('.json.tmp')
+                tmp_path.write_text(
+                    json.dumps(bundle.translations, ensure_ascii=False, indent=2),
+                    encoding='utf-8'
+                )
+                os.replace(tmp_path, path)
+                written.append(path)
+        
+        return written
+    
     async def create_translation(
         self,
         namespace: str,
@@ -147,30 +192,37 @@ class MultilingualContentService:
         target_language: str = 'de',
         translated_text: Optional[str] = None,
         context: Optional[str] = None,
-        created_by: Optional[str] = None
+        created_by: Optional[str] = None,
+        source_language: str = 'en'
     ) -> str:
         """Create a new translation entry"""
         
-        # Check if translation already exists
-        existing = self.db.query(Translation).filter(
-            and_(
-                Translation.namespace == namespace,
-                Translation.key == key,
-                Translation.target_language == target_language
-            )
-        ).first()
+        conflict = HTTPException(
+            status_code=409,
+            detail=f"Translation already exists for {namespace}.{key} in {target_language}"
+        )
         
-        if existing:
-            raise HTTPException(
-                status_code=409,
-                detail=f"Translation already exists for {namespace}.{key} in {target_language}"
+        # Point lookup on uq_translations_namespace_key_languages
+        result = await self.db.execute(
+            select(Translation.id).filter(
+                and_(
+                    Translation.namespace == namespace,
+                    Translation.key == key,
+                    Translation.source_language == source_language,
+                    Translation.target_language == target_language
+                )
             )
+        )
+        
+        if result.scalar_one_or_none():
+            raise conflict
         
         # Create new translation
         translation = Translation(
             namespace=namespace,
             key=key,
             source_text=source_text,
+            source_language=source_language,
             target_language=target_language,
             translated_text=translated_text,
             context=context,
@@ -182,8 +234,14 @@ class MultilingualContentService:
             translation.translated_at = func.now()
         
         self.db.add(translation)
-        self.db.commit()
-        self.db.refresh(translation)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # Created concurrently since the lookup above
+            await self.db.rollback()
+            raise conflict
+        await self.db.refresh(translation)
+        translation_bundle_cache.invalidate(namespace)
         
         return translation.id
     
@@ -196,9 +254,7 @@ class MultilingualContentService:
     ) -> bool:
         """Update an existing translation"""
         
-        translation = self.db.query(Translation).filter(
-            Translation.id == translation_id
-        ).first()
+        translation = await self.db.get(Translation, translation_id)
         
         if not translation:
             return False
@@ -213,7 +269,9 @@ class MultilingualContentService:
             translation.reviewed_at = func.now()
             translation.reviewer_id = updated_by
         
-        self.db.commit()
+        namespace = translation.namespace
+        await self.db.commit()
+        translation_bundle_cache.invalidate(namespace)
         return True
     
     async def get_multilingual_content(
@@ -224,13 +282,17 @@ class MultilingualContentService:
     ) -> Dict[str, Any]:
         """Get multilingual content for a specific item"""
         
-        results = self.db.query(MultilingualContent).filter(
-            and_(
-                MultilingualContent.content_type == content_type,
-                MultilingualContent.content_id == content_id,
-                MultilingualContent.is_active == True
+        # Prefix of uq_multilingual_content_field_language
+        result = await self.db.execute(
+            select(MultilingualContent).filter(
+                and_(
+                    MultilingualContent.content_type == content_type,
+                    MultilingualContent.content_id == content_id,
+                    MultilingualContent.is_active == True
+                )
             )
-        ).all()
+        )
+        results = result.scalars().all()
         
         content = {}
         available_languages = set()
@@ -273,16 +335,19 @@ class MultilingualContentService:
     ) -> str:
         """Create multilingual content entry"""
         
-        # Check if content already exists
-        existing = self.db.query(MultilingualContent).filter(
-            and_(
-                MultilingualContent.content_type == content_type,
-                MultilingualContent.content_id == content_id,
-                MultilingualContent.field_name == field_name,
-                MultilingualContent.language == language,
-                MultilingualContent.is_active == True
+        # Point lookup on uq_multilingual_content_field_language; an inactive
+        # row is reactivated rather than duplicated
+        result = await self.db.execute(
+            select(MultilingualContent).filter(
+                and_(
+                    MultilingualContent.content_type == content_type,
+                    MultilingualContent.content_id == content_id,
+                    MultilingualContent.field_name == field_name,
+                    MultilingualContent.language == language
+                )
             )
-        ).first()
+        )
+        existing = result.scalar_one_or_none()
         
         if existing:
             # Update existing content
@@ -293,8 +358,10 @@ class MultilingualContentService:
             else:
                 existing.text_content = content
             
+            existing.is_active = True
+            existing.version = (existing.version or 1) + 1
             existing.updated_at = func.now()
-            self.db.commit()
+            await self.db.commit()
             return existing.id
         
         # Create new content
@@ -314,8 +381,8 @@ class MultilingualContentService:
             multilingual_content.text_content = content
         
         self.db.add(multilingual_content)
-        self.db.commit()
-        self.db.refresh(multilingual_content)
+        await self.db.commit()
+        await self.db.refresh(multilingual_content)
         
         return multilingual_content.id
     
@@ -0,0 +1,134 @@
+from typing import Dict, Any, Optional
+from dataclasses import dataclass, field, asdict
+from openai import AsyncOpenAI
+import httpx
+import time
+import logging
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OperationStats:
+    """Per-operation call counters"""
+    calls: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+
+@dataclass
+class OpenAIClientMetrics:
+    """Counters exposed by the shared OpenAI client"""
+    clients_created: int = 0
+    calls: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_latency_ms: float = 0.0
+    operations: Dict[str, OperationStats] = field(default_factory=dict)
+
+
+class SharedOpenAIClient:
+    """
+    One AsyncOpenAI client per process
+
+    The client sits on a pooled httpx.AsyncClient, so connections (and their
+    TLS sessions) are reused by every AI service instead of being set up per
+    request. It is created at startup and closed at shutdown by the app
+    lifespan; scripts and workers without a lifespan get it lazily on first
+    use. SDK retries are disabled, callers retry through the shared rate
+    limiter (or ask for their own via with_options).
+    """
+
+    def __init__(self):
+        self._client: Optional[AsyncOpenAI] = None
+        self.metrics = OpenAIClientMetrics()
+
+    @property
+    def client(self) -> Optional[AsyncOpenAI]:
+        """The shared client, or None when no API key is configured"""
+        if self._client is None and settings.openai_api_key:
+            self.start()
+        return self._client
+
+    def start(self) -> Optional[AsyncOpenAI]:
+        if self._client is not None or not settings.openai_api_key:
+            return self._client
+
+        timeout = httpx.Timeout(settings.openai_timeout_seconds, connect=settings.openai_connect_timeout_seconds)
+        http_client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_keepalive_connections,
+                keepalive_expiry=settings.openai_keepalive_expiry_seconds
+            )
+        )
+        self._client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            timeout=timeout,
+            max_retries=0,
+            http_client=http_client
+        )
+        self.metrics.clients_created += 1
+        logger.info("Shared OpenAI client created")
+        return self._client
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.close()
+
+    async def create_chat_completion(self, client: Any, operation: str, **params):
+        """Run client.chat.completions.create, recording latency and token usage under operation"""
+        stats = self.metrics.operations.setdefault(operation, OperationStats())
+        started = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(**params)
+        except Exception:
+            self._record(stats, started, error=True)
+            raise
+
+        usage = getattr(response, 'usage', None)
+        self._record(
+            stats,
+            started,
+            prompt_tokens=getattr(usage, 'prompt_tokens', None) or 0,
+            completion_tokens=getattr(usage, 'completion_tokens', None) or 0
+        )
+        return response
+
+    def _record(
+        self,
+        stats: OperationStats,
+        started: float,
+        error: bool = False,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ) -> None:
+        latency_ms = (time.perf_counter() - started) * 1000
+        for counters in (self.metrics, stats):
+            counters.calls += 1
+            counters.errors += int(error)
+            counters.prompt_tokens += prompt_tokens
+            counters.completion_tokens += completion_tokens
+            counters.total_latency_ms += latency_ms
+        stats.max_latency_ms = max(stats.max_latency_ms, latency_ms)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = asdict(self.metrics)
+        metrics['configured'] = bool(settings.openai_api_key)
+        metrics['connected'] = self._client is not None
+        for counters in [metrics, *metrics['operations'].values()]:
+            counters['avg_latency_ms'] = round(counters['total_latency_ms'] / counters['calls'], 1) if counters['calls'] else 0.0
+        return metrics
+
+
+# Global instance
+openai_client = SharedOpenAIClient()
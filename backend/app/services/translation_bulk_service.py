@@ -0,0 +1,445 @@
+from typing import Dict, List, Optional, Any, Iterator, AsyncIterator, BinaryIO, Callable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from dataclasses import dataclass, field
+from datetime import datetime
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+import csv
+import io
+import json
+import logging
+import time
+
+from ..config import settings
+from ..models.translation import Translation
+from .translation_bundle_cache import translation_bundle_cache
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ('json', 'csv', 'xliff')
+
+EXPORT_MEDIA_TYPES = {
+    'json': 'application/json',
+    'csv': 'text/csv; charset=utf-8',
+    'xliff': 'application/xliff+xml',
+}
+
+CSV_COLUMNS = [
+    'namespace', 'key', 'source_language', 'target_language',
+    'source_text', 'translated_text', 'status', 'context'
+]
+
+STATUSES = ('pending', 'translated', 'reviewed', 'approved')
+
+# Keep the first errors only; a broken 50k-row file should not echo 50k messages
+MAX_REPORTED_ERRORS = 20
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """Import format from a file name extension"""
+    extension = (filename or '').rsplit('.', 1)[-1].lower()
+    if extension in ('xlf', 'xliff'):
+        return 'xliff'
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def _flatten(value: Any, prefix: str = '') -> Iterator[tuple]:
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield from _flatten(child, f"{prefix}{key}.")
+    elif value is not None:
+        yield prefix[:-1], str(value)
+
+
+def iter_json_records(
+    fileobj: BinaryIO,
+    namespace: Optional[str],
+    source_language: str,
+    target_language: Optional[str]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Records from an i18next-style {key: text} file, nested objects joined with dots
+
+    The standard library has no incremental JSON parser, so the document is
+    decoded at once; records are still produced lazily.
+    """
+    try:
+        # json.loads detects the encoding (and a UTF-8 BOM) of bytes itself
+        document = json.loads(fileobj.read())
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid JSON file: {e}")
+    if not isinstance(document, dict):
+        raise ValueError("JSON import expects an object of keys to texts")
+
+    for key, text in _flatten(document):
+        # i18next writes "" for keys not translated yet
+        text = text or None
+        yield {
+            'namespace': namespace,
+            'key': key,
+            'source_language': source_language,
+            'target_language': target_language,
+            # Only a file in the source language carries the source text
+            'source_text': text if target_language == source_language else None,
+            'translated_text': text,
+        }
+
+
+def iter_csv_records(
+    fileobj: BinaryIO,
+    namespace: Optional[str],
+    source_language: str,
+    target_language: Optional[str]
+) -> Iterator[Dict[str, Any]]:
+    """Records from a CSV file with a header row using CSV_COLUMNS names"""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.DictReader(text)
+        if not reader.fieldnames or 'key' not in reader.fieldnames:
+            raise ValueError("CSV import needs a header row with at least a 'key' column")
+
+        for row in reader:
+            yield {
+                'namespace': row.get('namespace') or namespace,
+                'key': row.get('key'),
+                'source_language': row.get('source_language') or source_language,
+                'target_language': row.get('target_language') or target_language,
+                'source_text': row.get('source_text') or None,
+                'translated_text': row.get('translated_text') or None,
+                'status': row.get('status') or None,
+                'context': row.get('context') or None,
+            }
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Invalid CSV file: {e}")
+    finally:
+        # Leave the caller's file open
+        text.detach()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _element_text(element: Optional[ElementTree.Element]) -> Optional[str]:
+    if element is None:
+        return None
+    return ''.join(element.itertext()) or None
+
+
+def iter_xliff_records(
+    fileobj: BinaryIO,
+    namespace: Optional[str],
+    source_language: str,
+    target_language: Optional[str]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Records from XLIFF 1.2 (trans-unit) or 2.x (unit/segment) documents
+
+    Parsed incrementally; every unit is cleared once read so memory stays
+    flat. Namespaces come from <file original> (1.2) or <file id> (2.x)
+    unless one is given.
+    """
+    languages = {'source': source_language, 'target': target_language}
+    file_namespace = namespace
+    try:
+        for event, element in ElementTree.iterparse(fileobj, events=('start', 'end')):
+            name = _local_name(element.tag)
+            if event == 'start':
+                if name == 'xliff' and element.get('srcLang'):
+                    languages = {'source': element.get('srcLang'), 'target': element.get('trgLang') or target_language}
+                elif name == 'file':
+                    file_namespace = namespace or element.get('original') or element.get('id')
+                    if element.get('source-language'):
+                        languages = {
+                            'source': element.get('source-language'),
+                            'target': element.get('target-language') or target_language
+                        }
+                continue
+
+            if name not in ('trans-unit', 'unit'):
+                continue
+            source = target = None
+            for child in element.iter():
+                child_name = _local_name(child.tag)
+                if child_name == 'source' and source is None:
+                    source = _element_text(child)
+                elif child_name == 'target' and target is None:
+                    target = _element_text(child)
+            note = next((_element_text(c) for c in element.iter() if _local_name(c.tag) == 'note'), None)
+            yield {
+                'namespace': file_namespace,
+                'key': element.get('resname') or element.get('name') or element.get('id'),
+                'source_language': languages['source'][:2] if languages['source'] else None,
+                'target_language': languages['target'][:2] if languages['target'] else None,
+                'source_text': source,
+                'translated_text': target,
+                'context': note,
+            }
+            element.clear()
+    except ElementTree.ParseError as e:
+        raise ValueError(f"Invalid XLIFF file: {e}")
+
+
+PARSERS = {
+    'json': iter_json_records,
+    'csv': iter_csv_records,
+    'xliff': iter_xliff_records,
+}
+
+
+@dataclass
+class ImportResult:
+    """Outcome of a bulk import"""
+    format: str
+    processed: int = 0
+    upserted: int = 0
+    skipped: int = 0
+    batches: int = 0
+    namespaces: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    keys_per_second: float = 0.0
+
+
+class TranslationBulkService:
+    """
+    Streaming import and export of translation keys
+
+    Imports upsert in batches with INSERT ... ON CONFLICT DO UPDATE on
+    (namespace, key, source_language, target_language): texts missing from
+    the file never overwrite stored ones, and a row only changes status when
+    the file brings a different translation for it.
+    """
+
+    def __init__(self, db: AsyncSession, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.translation_import_batch_size
+
+    @staticmethod
+    def _upsert_statement():
+        # Core insert on the table: executemany without ORM bulk bookkeeping
+        stmt = sqlite_insert(Translation.__table__)
+        excluded = stmt.excluded
+        translated_text = func.nullif(excluded.translated_text, '')
+        # No text, or the stored text again (e.g. a re-imported export): the
+        # row keeps its workflow state; the file's status only comes with new text
+        unchanged = or_(translated_text.is_(None), translated_text == Translation.translated_text)
+        return stmt.on_conflict_do_update(
+            index_elements=['namespace', 'key', 'source_language', 'target_language'],
+            set_={
+                'source_text': func.coalesce(func.nullif(excluded.source_text, ''), Translation.source_text),
+                'translated_text': func.coalesce(translated_text, Translation.translated_text),
+                'context': func.coalesce(excluded.context, Translation.context),
+                'status': case((unchanged, Translation.status), else_=excluded.status),
+                'translation_method': case(
+                    (unchanged, Translation.translation_method),
+                    else_=excluded.translation_method
+                ),
+                'translated_at': case((unchanged, Translation.translated_at), else_=excluded.translated_at),
+                'updated_at': func.now(),
+            }
+        )
+
+    @staticmethod
+    def _validate(record: Dict[str, Any]) -> Optional[str]:
+        if not record.get('namespace') or not record.get('key'):
+            return "missing namespace or key"
+        if len(record['namespace']) > 100 or len(record['key']) > 200:
+            return "namespace or key too long"
+        for language in ('source_language', 'target_language'):
+            if not record.get(language) or len(record[language]) != 2:
+                return f"invalid {language} {record.get(language)!r}"
+        if record.get('status') and record['status'] not in STATUSES:
+            return f"invalid status {record['status']!r}"
+        return None
+
+    @staticmethod
+    def _row(record: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        translated_text = record.get('translated_text') or None
+        return {
+            'namespace': record['namespace'],
+            'key': record['key'],
+            'source_language': record['source_language'],
+            'target_language': record['target_language'],
+            # '' marks "unknown" for new rows; existing source texts are kept
+            'source_text': record.get('source_text') or '',
+            'translated_text': translated_text,
+            'context': record.get('context'),
+            'status': record.get('status') or ('translated' if translated_text else 'pending'),
+            'translation_method': 'import',
+            'translated_at': now if translated_text else None,
+        }
+
+    async def _flush(self, rows: List[Dict[str, Any]], result: ImportResult) -> None:
+        await self.db.execute(self._upsert_statement(), rows)
+        # Commit per batch so the SQLite write lock is released between batches
+        await self.db.commit()
+        result.upserted += len(rows)
+        result.batches += 1
+
+    async def import_file(
+        self,
+        fileobj: BinaryIO,
+        format: str,
+        namespace: Optional[str] = None,
+        source_language: str = 'en',
+        target_language: Optional[str] = None
+    ) -> ImportResult:
+        """Parse a file incrementally and upsert its keys in batches"""
+        if format not in PARSERS:
+            raise ValueError(f"Unsupported import format: {format}")
+
+        started = time.perf_counter()
+        result = ImportResult(format=format)
+        namespaces = set()
+        rows: List[Dict[str, Any]] = []
+        now = datetime.utcnow()
+
+        for record in PARSERS[format](fileobj, namespace, source_language, target_language):
+            result.processed += 1
+            error = self._validate(record)
+            if error:
+                result.skipped += 1
+                if len(result.errors) < MAX_REPORTED_ERRORS:
+                    result.errors.append(f"Record {result.processed} ({record.get('key')!r}): {error}")
+                continue
+
+            rows.append(self._row(record, now))
+            namespaces.add(record['namespace'])
+            if len(rows) >= self.batch_size:
+                await self._flush(rows, result)
+                rows = []
+
+        if rows:
+            await self._flush(rows, result)
+
+        for name in namespaces:
+            translation_bundle_cache.invalidate(name)
+
+        result.namespaces = sorted(namespaces)
+        result.elapsed_seconds = round(time.perf_counter() - started, 3)
+        if result.elapsed_seconds:
+            result.keys_per_second = round(result.upserted / result.elapsed_seconds, 1)
+        logger.info(
+            f"Imported {result.upserted} translation keys ({result.skipped} skipped) "
+            f"from {format} in {result.elapsed_seconds}s"
+        )
+        return result
+
+    async def iter_export(
+        self,
+        namespace: str,
+        language: str,
+        format: str = 'json',
+        source_language: str = 'en',
+        chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[str]:
+        """Stream the keys of one namespace and language, ordered by key"""
+        if format not in EXPORT_MEDIA_TYPES:
+            raise ValueError(f"Unsupported export format: {format}")
+
+        stream = await self.db.stream(
+            select(
+                Translation.key,
+                Translation.source_text,
+                Translation.translated_text,
+                Translation.status,
+                Translation.context
+            ).filter(
+                Translation.namespace == namespace,
+                Translation.source_language == source_language,
+                Translation.target_language == language
+            ).order_by(Translation.key).execution_options(yield_per=1000)
+        )
+
+        format_row = self._row_formatter(format, namespace, source_language, language)
+        buffer = [self._export_header(format, namespace, source_language, language)]
+        size = 0
+        separator = ''
+
+        async for row in stream:
+            piece = format_row(row)
+            if piece is None:
+                continue
+            if format == 'json':
+                piece = f"{separator}\n  {piece}"
+                separator = ','
+            buffer.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield ''.join(buffer)
+                buffer, size = [], 0
+
+        buffer.append(self._export_footer(format))
+        yield ''.join(buffer)
+
+    @staticmethod
+    def _export_header(format: str, namespace: str, source_language: str, language: str) -> str:
+        if format == 'json':
+            return '{'
+        if format == 'csv':
+            return ','.join(CSV_COLUMNS) + '\r\n'
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2">\n'
+            f'  <file original={quoteattr(namespace)} source-language={quoteattr(source_language)} '
+            f'target-language={quoteattr(language)} datatype="plaintext">\n'
+            '    <body>\n'
+        )
+
+    @staticmethod
+    def _row_formatter(format: str, namespace: str, source_language: str, language: str) -> Callable[[Any], Optional[str]]:
+        if format == 'json':
+            # Same shape as the public bundles: keys without a translation are left out
+            def format_row(row) -> Optional[str]:
+                if not row.translated_text:
+                    return None
+                return f"{json.dumps(row.key, ensure_ascii=False)}: {json.dumps(row.translated_text, ensure_ascii=False)}"
+            return format_row
+
+        if format == 'csv':
+            line = _CSVLine()
+            writer = csv.writer(line)
+
+            def format_row(row) -> str:
+                writer.writerow([
+                    namespace, row.key, source_language, language,
+                    row.source_text or '', row.translated_text or '', row.status or '', row.context or ''
+                ])
+                return line.take()
+            return format_row
+
+        def format_row(row) -> str:
+            target = f'        <target>{escape(row.translated_text)}</target>\n' if row.translated_text else ''
+            note = f'        <note>{escape(row.context)}</note>\n' if row.context else ''
+            return (
+                f'      <trans-unit id={quoteattr(row.key)}>\n'
+                f'        <source>{escape(row.source_text or "")}</source>\n'
+                f'{target}{note}'
+                '      </trans-unit>\n'
+            )
+        return format_row
+
+    @staticmethod
+    def _export_footer(format: str) -> str:
+        if format == 'json':
+            return '\n}\n'
+        if format == 'csv':
+            return ''
+        return '    </body>\n  </file>\n</xliff>\n'
+
+
+class _CSVLine:
+    """Write target for csv.writer handing back one row at a time"""
+
+    def __init__(self):
+        self._value = ''
+
+    def write(self, text: str) -> None:
+        self._value += text
+
+    def take(self) -> str:
+        value, self._value = self._value, ''
+        return value
@@ -0,0 +1,151 @@
+from typing import Dict, Tuple, Callable, Awaitable, Optional, Any
+from dataclasses import dataclass, asdict
+from collections import defaultdict
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TranslationBundle:
+    """Translations of one namespace in one language, fallbacks merged"""
+    namespace: str
+    language: str
+    version: int
+    translations: Dict[str, str]
+    etag: str
+    body: bytes  # Serialized public API response
+    built_at: float
+
+
+@dataclass
+class BundleCacheMetrics:
+    """Counters exposed by the translation bundle cache"""
+    bundles: int = 0
+    hits: int = 0
+    builds: int = 0
+    invalidations: int = 0
+    last_build_ms: float = 0.0
+
+
+class TranslationBundleCache:
+    """
+    Precompiled per-namespace, per-language translation bundles
+
+    Every translation write bumps the version stamp of its namespace
+    (invalidate); a cached bundle is served until its namespace version moves
+    on or it is older than translation_bundle_ttl_seconds, which bounds
+    staleness for writes made by other worker processes. Bundles carry the
+    serialized response body and an ETag derived from it, so identical
+    content yields the same ETag in every worker.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.translation_bundle_ttl_seconds
+        self._bundles: Dict[Tuple[str, str], TranslationBundle] = {}
+        self._versions: Dict[str, int] = {}
+        self._counter = 0
+        self._floor = 0
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.metrics = BundleCacheMetrics()
+
+    def version(self, namespace: str) -> int:
+        """Current version stamp of a namespace"""
+        return max(self._floor, self._versions.get(namespace, 0))
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """Bump the version of a namespace, or of every namespace when None"""
+        self._counter += 1
+        if namespace is None:
+            self._floor = self._counter
+            self._bundles.clear()
+        else:
+            self._versions[namespace] = self._counter
+            for key in [key for key in self._bundles if key[0] == namespace]:
+                del self._bundles[key]
+        self.metrics.invalidations += 1
+        self.metrics.bundles = len(self._bundles)
+        return self._counter
+
+    def _is_fresh(self, bundle: Optional[TranslationBundle]) -> bool:
+        return (
+            bundle is not None
+            and bundle.version == self.version(bundle.namespace)
+            and time.monotonic() - bundle.built_at < self.ttl_seconds
+        )
+
+    async def get(
+        self,
+        namespace: str,
+        language: str,
+        loader: Callable[[], Awaitable[Dict[str, str]]]
+    ) -> TranslationBundle:
+        """Return the cached bundle, building it with loader when missing or stale"""
+        key = (namespace, language)
+        bundle = self._bundles.get(key)
+        if self._is_fresh(bundle):
+            self.metrics.hits += 1
+            return bundle
+
+        # One build per bundle at a time; concurrent requests wait for it
+        async with self._locks[key]:
+            bundle = self._bundles.get(key)
+            if self._is_fresh(bundle):
+                self.metrics.hits += 1
+                return bundle
+
+            started = time.perf_counter()
+            # Taken before loading: a write during the load leaves the bundle stale
+            version = self.version(namespace)
+            translations = await loader()
+            bundle = self.build_bundle(namespace, language, version, translations)
+            if version == self.version(namespace):
+                self._bundles[key] = bundle
+
+            self.metrics.builds += 1
+            self.metrics.bundles = len(self._bundles)
+            self.metrics.last_build_ms = (time.perf_counter() - started) * 1000
+            return bundle
+
+    @staticmethod
+    def build_bundle(
+        namespace: str,
+        language: str,
+        version: int,
+        translations: Dict[str, str]
+    ) -> TranslationBundle:
+        translations = dict(sorted(translations.items()))
+        body = json.dumps(
+            {
+                'success': True,
+                'data': {
+                    'translations': translations,
+                    'language': language,
+                    'namespace': namespace
+                }
+            },
+            ensure_ascii=False,
+            separators=(',', ':')
+        ).encode('utf-8')
+        return TranslationBundle(
+            namespace=namespace,
+            language=language,
+            version=version,
+            translations=translations,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            body=body,
+            built_at=time.monotonic()
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return asdict(self.metrics)
+
+
+# Global instance
+translation_bundle_cache = TranslationBundleCache()
@@ -0,0 +1,281 @@
+from typing import Dict, List, Optional, Tuple, Callable, Set, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from dataclasses import dataclass, asdict
+from collections import defaultdict, Counter
+import asyncio
+import logging
+import math
+import time
+
+from ..models.translation import TranslationMemory, normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+def trigrams(normalized: str) -> Set[str]:
+    """Character trigrams of a normalized string, padded so short words still count"""
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class TMCandidate:
+    """A translation memory entry scored against a query"""
+    entry_id: str
+    source_text: str
+    translation: str
+    similarity: float
+    quality_score: float
+
+
+@dataclass
+class TMIndexMetrics:
+    """Counters exposed by the translation memory index"""
+    entries: int = 0
+    lookups: int = 0
+    exact_hits: int = 0
+    fuzzy_hits: int = 0
+    misses: int = 0
+    last_lookup_ms: float = 0.0
+    loaded: bool = False
+
+
+# (source language, target language, domain)
+Group = Tuple[str, str, str]
+
+
+def _group(source_language: str, target_language: str, domain: Optional[str]) -> Group:
+    return (source_language, target_language, domain or '')
+
+
+@dataclass
+class _Entry:
+    entry_id: str
+    source_text: str
+    translation: str
+    quality_score: float
+    grams: Set[str]
+
+
+class TranslationMemoryIndex:
+    """
+    In-memory fuzzy index over the translation memory
+
+    Entries are grouped per language pair and domain, matching the scope of
+    the exact tm_source_hash lookup. Each group keeps an exact map of
+    normalized source text and a trigram inverted index; a lookup
+    reads the posting lists of only the rarest query trigrams (prefix
+    filtering), drops entries whose trigram count cannot reach the threshold
+    and scores the rest with the Dice coefficient, 2|A∩B| / (|A| + |B|), so
+    lookups stay well below a millisecond for typical TM sizes.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Group, Dict[str, _Entry]] = defaultdict(dict)
+        self._exact: Dict[Group, Dict[str, str]] = defaultdict(dict)
+        self._postings: Dict[Group, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        # Posting list lengths, kept alongside so lookups can rank trigrams in C
+        self._frequency: Dict[Group, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._load_lock = asyncio.Lock()
+        self.metrics = TMIndexMetrics()
+
+    @property
+    def loaded(self) -> bool:
+        return self.metrics.loaded
+
+    def add(
+        self,
+        entry_id: str,
+        source_text: str,
+        translated_text: str,
+        source_language: str,
+        target_language: str,
+        quality_score: Optional[float] = None,
+        domain: Optional[str] = None
+    ) -> None:
+        """Insert or replace an entry"""
+        pair = _group(source_language, target_language, domain)
+        self.remove(entry_id, source_language, target_language, domain)
+
+        normalized = normalize_text(source_text)
+        entry = _Entry(
+            entry_id=entry_id,
+            source_text=source_text,
+            translation=translated_text,
+            quality_score=float(quality_score if quality_score is not None else 0.8),
+            grams=trigrams(normalized)
+        )
+        self._entries[pair][entry_id] = entry
+        self._exact[pair][normalized] = entry_id
+        postings = self._postings[pair]
+        frequency = self._frequency[pair]
+        for gram in entry.grams:
+            postings[gram].add(entry_id)
+            frequency[gram] += 1
+        self.metrics.entries += 1
+
+    def remove(self, entry_id: str, source_language: str, target_language: str, domain: Optional[str] = None) -> bool:
+        """Drop an entry; returns False if it was not indexed"""
+        pair = _group(source_language, target_language, domain)
+        entry = self._entries[pair].pop(entry_id, None)
+        if entry is None:
+            return False
+        normalized = normalize_text(entry.source_text)
+        if self._exact[pair].get(normalized) == entry_id:
+            del self._exact[pair][normalized]
+        postings = self._postings[pair]
+        frequency = self._frequency[pair]
+        for gram in entry.grams:
+            ids = postings.get(gram)
+            if ids is not None:
+                ids.discard(entry_id)
+                frequency[gram] = len(ids)
+                if not ids:
+                    del postings[gram]
+                    del frequency[gram]
+        self.metrics.entries -= 1
+        return True
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._exact.clear()
+        self._postings.clear()
+        self._frequency.clear()
+        self.metrics.entries = 0
+        self.metrics.loaded = False
+
+    def search(
+        self,
+        text: str,
+        source_language: str,
+        target_language: str,
+        threshold: float = 0.85,
+        limit: int = 5,
+        domain: Optional[str] = None
+    ) -> List[TMCandidate]:
+        """Return up to limit entries of the domain with similarity >= threshold, best first"""
+        started = time.perf_counter()
+        pair = _group(source_language, target_language, domain)
+        entries = self._entries.get(pair)
+        self.metrics.lookups += 1
+        if not entries:
+            self.metrics.misses += 1
+            return []
+
+        normalized = normalize_text(text)
+        exact_id = self._exact[pair].get(normalized)
+        if exact_id is not None:
+            self.metrics.exact_hits += 1
+            self.metrics.last_lookup_ms = (time.perf_counter() - started) * 1000
+            return [self._candidate(entries[exact_id], 1.0)]
+
+        query = trigrams(normalized)
+        size = len(query)
+        # Dice >= t needs the other set within [t/(2-t), (2-t)/t] of our size
+        # and at least t*|Q|/(2-t) shared trigrams
+        min_size = size * threshold / (2 - threshold)
+        max_size = size * (2 - threshold) / threshold
+        min_shared = max(1, math.ceil(size * threshold / (2 - threshold) - 1e-9))
+
+        # Prefix filter: any qualifying entry shares one of the rarest
+        # size - min_shared + 1 query trigrams, so only their postings are read.
+        # Reading twice that prefix and counting hits per entry prunes further:
+        # an entry missing from h of the first n grams shares at most size - h.
+        postings = self._postings[pair]
+        frequency = self._frequency[pair]
+        present = sorted([gram for gram in query if gram in postings], key=frequency.__getitem__)
+        prefix = min(size, 2 * (size - min_shared + 1))
+        hits = Counter()
+        # Trigrams unknown to the index are the rarest and fill the prefix first
+        for gram in present[:max(0, prefix - (size - len(present)))]:
+            hits.update(postings[gram])
+        min_hits = min_shared - (size - prefix)
+        candidate_ids = [entry_id for entry_id, count in hits.items() if count >= min_hits]
+
+        scored = []
+        for entry_id in candidate_ids:
+            entry = entries[entry_id]
+            other = len(entry.grams)
+            if other < min_size or other > max_size:
+                continue
+            shared = len(query & entry.grams)
+            # Exact normalized matches were handled above, keep fuzzy scores below 1.0
+            similarity = min(2 * shared / (size + other), 0.999)
+            if similarity >= threshold:
+                scored.append((similarity, entry.quality_score, entry))
+
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        candidates = [self._candidate(entry, similarity) for similarity, _, entry in scored[:limit]]
+
+        if candidates:
+            self.metrics.fuzzy_hits += 1
+        else:
+            self.metrics.misses += 1
+        self.metrics.last_lookup_ms = (time.perf_counter() - started) * 1000
+        return candidates
+
+    def best_match(
+        self,
+        text: str,
+        source_language: str,
+        target_language: str,
+        threshold: float = 0.85,
+        domain: Optional[str] = None
+    ) -> Optional[TMCandidate]:
+        candidates = self.search(text, source_language, target_language, threshold, limit=1, domain=domain)
+        return candidates[0] if candidates else None
+
+    async def load(self, db: AsyncSession) -> int:
+        """(Re)build the index from the translation_memory table"""
+        result = await db.execute(
+            select(
+                TranslationMemory.id,
+                TranslationMemory.source_text,
+                TranslationMemory.translated_text,
+                TranslationMemory.source_language,
+                TranslationMemory.target_language,
+                TranslationMemory.quality_score,
+                TranslationMemory.domain
+            )
+        )
+        self.clear()
+        for row in result:
+            self.add(
+                row.id, row.source_text, row.translated_text,
+                row.source_language, row.target_language,
+                float(row.quality_score) if row.quality_score is not None else None,
+                row.domain
+            )
+        self.metrics.loaded = True
+        logger.info(f"Translation memory index loaded with {self.metrics.entries} entries")
+        return self.metrics.entries
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load once on first use when startup loading did not run"""
+        if self.metrics.loaded:
+            return
+        async with self._load_lock:
+            if not self.metrics.loaded:
+                await self.load(db)
+
+    async def load_from(self, session_factory: Callable[[], AsyncSession]) -> int:
+        async with session_factory() as db:
+            return await self.load(db)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return asdict(self.metrics)
+
+    @staticmethod
+    def _candidate(entry: _Entry, similarity: float) -> TMCandidate:
+        return TMCandidate(
+            entry_id=entry.entry_id,
+            source_text=entry.source_text,
+            translation=entry.translation,
+            similarity=round(similarity, 4),
+            quality_score=entry.quality_score
+        )
+
+
+# Global instance
+translation_memory_index = TranslationMemoryIndex()
@@ -0,0 +1,159 @@
+"""
+Protected file delivery
+
+Files referenced by MediaFile.file_path are stored relative to
+settings.upload_dir. Depending on settings.file_delivery_mode they are
+either served by Python (with single-range HTTP Range support so resumed
+and partial downloads work) or handed off to the reverse proxy, which then
+sends the bytes with sendfile:
+
+- "x-accel-redirect" (nginx): the response carries
+  X-Accel-Redirect: <file_delivery_internal_prefix><relative path>, e.g.
+
+      location /protected-uploads/ {
+          internal;
+          alias /app/data/uploads/;
+      }
+
+- "x-sendfile" (Apache mod_xsendfile, lighttpd): the response carries the
+  absolute path in X-Sendfile.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.config import settings, DELIVERY_MODES
+
+RANGE_CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    """The requested byte range lies outside the file"""
+
+
+def resolve_upload_path(file_path: Optional[str], root: Union[str, Path, None] = None) -> Optional[Path]:
+    """
+    Resolve a stored file path against the upload root
+
+    Returns None when the path is empty, points outside the root or the file
+    does not exist.
+    """
+    if not file_path:
+        return None
+    root = Path(root or settings.upload_dir).resolve()
+    candidate = (root / file_path).resolve()
+    if not candidate.is_relative_to(root) or not candidate.is_file():
+        return None
+    return candidate
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=start-end" range into inclusive offsets
+
+    Returns None when the header is absent or not a single byte range (the
+    whole file is served then); raises RangeNotSatisfiable for ranges that
+    start beyond the end of the file.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - length, 0), size - 1
+
+    first = int(start)
+    last = int(end) if end else size - 1
+    if first >= size or last < first:
+        raise RangeNotSatisfiable(header)
+    return first, min(last, size - 1)
+
+
+def range_start(header: Optional[str]) -> int:
+    """
+    First byte offset requested by a "bytes=start-[end]" range, else 0
+
+    Suffix ranges ("bytes=-N") and unparsable headers count as 0 because
+    they can cover the whole file.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if not match or not match.group(1):
+        return 0
+    return int(match.group(1))
+
+
+def _iter_file_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = handle.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_download_response(
+    request: Request,
+    path: Path,
+    media_type: str,
+    filename: str,
+    headers: Optional[Dict[str, str]] = None,
+    root: Union[str, Path, None] = None
+) -> Response:
+    """Build the download response for a resolved file in the configured delivery mode"""
+    headers = {
+        **(headers or {}),
+        "Content-Disposition": f"attachment; filename=\"{filename}\""
+    }
+    mode = settings.file_delivery_mode
+
+    if mode == "x-accel-redirect":
+        relative = path.relative_to(Path(root or settings.upload_dir).resolve())
+        headers["X-Accel-Redirect"] = settings.file_delivery_internal_prefix.rstrip("/") + "/" + quote(relative.as_posix())
+        return Response(media_type=media_type, headers=headers)
+
+    if mode == "x-sendfile":
+        headers["X-Sendfile"] = str(path)
+        return Response(media_type=media_type, headers=headers)
+
+    size = os.path.getsize(path)
+    headers["Accept-Ranges"] = "bytes"
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except RangeNotSatisfiable:
+        return Response(
+            status_code=416,
+            headers={**headers, "Content-Range": f"bytes */{size}"}
+        )
+
+    if byte_range is None:
+        return FileResponse(path=path, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file_range(path, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
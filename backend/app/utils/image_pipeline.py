@@ -0,0 +1,240 @@
+"""
+CPU-bound image operations used by ImageProcessingService
+
+Everything here works on plain bytes and dicts and imports nothing from the
+app besides Pillow, so the functions can run in worker processes without
+pulling in the database layer.
+
+Variants are produced from a single decode: the source is opened once,
+oriented once, then resized in a descending cascade (xlarge -> large -> ...)
+where each size is derived from the previous one and encoded to every
+output format from the same pixel buffer.
+"""
+
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple, Any
+
+from PIL import Image, ImageOps
+
+try:
+    # AVIF support is optional; the plugin registers itself with Pillow on import
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+# Resize in two steps (fast integer reduce, then LANCZOS) once the source
+# is at least this many times larger than the target
+REDUCING_GAP = 3.0
+
+# Output formats generated for every responsive size, with variant suffix
+VARIANT_FORMATS: List[Tuple[str, str]] = [('JPEG', ''), ('WEBP', '_webp')]
+
+
+def avif_supported() -> bool:
+    """Whether this Pillow install can encode AVIF"""
+    Image.init()
+    return 'AVIF' in Image.SAVE
+
+
+def variant_formats() -> List[Tuple[str, str]]:
+    """Formats to generate for each responsive size, AVIF included when available"""
+    if avif_supported():
+        return VARIANT_FORMATS + [('AVIF', '_avif')]
+    return VARIANT_FORMATS
+
+
+def extract_image_metadata(image_data: bytes) -> Dict[str, Any]:
+    """Extract metadata from image data"""
+    try:
+        image = Image.open(BytesIO(image_data))
+
+        metadata = {
+            'width': image.width,
+            'height': image.height,
+            'format': image.format,
+            'mode': image.mode,
+            'aspect_ratio': round(image.width / image.height, 3)
+        }
+
+        # Extract EXIF data if available
+        if hasattr(image, '_getexif') and image._getexif():
+            metadata['exif'] = dict(image._getexif().items())
+
+        return metadata
+
+    except Exception as e:
+        print(f"Failed to extract image metadata: {e}")
+        return {}
+
+
+def decode_image(image_data: bytes, target_width: Optional[int] = None) -> Image.Image:
+    """
+    Decode and orient an image, normalized to RGB or RGBA
+
+    With a target width, JPEG sources are decoded through Image.draft, which
+    lets libjpeg scale by 1/2, 1/4 or 1/8 during decoding while staying at
+    least as large as the target.
+    """
+    image = Image.open(BytesIO(image_data))
+
+    if target_width and image.format == 'JPEG' and image.width > target_width:
+        scale = target_width / image.width
+        image.draft('RGB', (target_width, max(1, int(image.height * scale))))
+
+    image = ImageOps.exif_transpose(image)
+
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    return image
+
+
+def resize_to_width(image: Image.Image, target_width: int, height_ratio: Optional[float] = None) -> Image.Image:
+    """Downscale to target_width keeping the aspect ratio (never upscales)"""
+    if image.width <= target_width:
+        return image
+    ratio = height_ratio if height_ratio is not None else image.height / image.width
+    new_height = max(1, int(target_width * ratio))
+    return image.resize((target_width, new_height), Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """Composite transparency onto white for formats without alpha"""
+    if image.mode != 'RGBA':
+        return image
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.split()[-1])
+    return background
+
+
+def encode_image(image: Image.Image, format: str, quality: int = 85) -> Tuple[bytes, Dict[str, Any]]:
+    """Encode an already decoded image"""
+    format = format.upper()
+    output = BytesIO()
+    save_kwargs: Dict[str, Any] = {'format': format}
+
+    if format == 'JPEG':
+        image = _flatten(image)
+        save_kwargs.update({
+            'quality': quality,
+            'optimize': True,
+            'progressive': True
+        })
+    elif format == 'PNG':
+        save_kwargs.update({
+            'optimize': True
+        })
+    elif format == 'WEBP':
+        save_kwargs.update({
+            'quality': quality,
+            'method': 6  # Best compression
+        })
+    elif format == 'AVIF':
+        save_kwargs.update({
+            'quality': quality,
+            'speed': 6  # Encoder speed/size trade-off (0 slowest, 10 fastest)
+        })
+
+    image.save(output, **save_kwargs)
+    data = output.getvalue()
+
+    metadata = {
+        'width': image.width,
+        'height': image.height,
+        'format': format,
+        'size': len(data),
+        'aspect_ratio': round(image.width / image.height, 3)
+    }
+
+    return data, metadata
+
+
+def optimize_image(
+    image_data: bytes,
+    target_width: Optional[int] = None,
+    quality: int = 85,
+    format: str = 'JPEG'
+) -> Tuple[bytes, Dict[str, Any]]:
+    """Optimize image with compression and resizing"""
+    image = decode_image(image_data, target_width)
+    if target_width:
+        image = resize_to_width(image, target_width)
+    return encode_image(image, format, quality)
+
+
+def variant_quality(size_name: str, format: str) -> int:
+    """Encoder quality per responsive size and format"""
+    if format.upper() == 'WEBP':
+        return 80
+    if format.upper() == 'AVIF':
+        return 60
+    return 85 if size_name in ('large', 'xlarge') else 90
+
+
+def build_variants(
+    image: Image.Image,
+    sizes: Dict[str, int],
+    formats: Optional[List[Tuple[str, str]]] = None
+) -> Dict[str, Tuple[bytes, Dict[str, Any]]]:
+    """Resize a decoded image through all sizes, largest first, and encode each"""
+    variants = {}
+    formats = formats or variant_formats()
+    height_ratio = image.height / image.width
+    current = image
+
+    for size_name, target_width in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        # Skip if original is smaller than target
+        if image.width <= target_width and size_name != 'thumbnail':
+            continue
+
+        # Each step starts from the previous (larger) variant
+        current = resize_to_width(current, target_width, height_ratio)
+
+        for format, suffix in formats:
+            try:
+                variants[f"{size_name}{suffix}"] = encode_image(
+                    current, format, variant_quality(size_name, format)
+                )
+            except Exception:
+                if format == 'JPEG':
+                    raise
+                # Optional encoders are not always available
+
+    return variants
+
+
+def create_responsive_variants(
+    image_data: bytes,
+    sizes: Dict[str, int]
+) -> Dict[str, Tuple[bytes, Dict[str, Any]]]:
+    """Create multiple responsive variants of an image"""
+    try:
+        return build_variants(decode_image(image_data), sizes)
+    except Exception as e:
+        print(f"Failed to create responsive variants: {e}")
+        return {}
+
+
+def process_image(image_data: bytes, sizes: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Produce everything process_and_store_image needs in one call
+
+    Runs as a single worker job so the image bytes cross the process
+    boundary once; the source is decoded once for the main image and
+    all variants.
+    """
+    original_metadata = extract_image_metadata(image_data)
+    image = decode_image(image_data)
+
+    try:
+        variants = build_variants(image, sizes)
+    except Exception as e:
+        print(f"Failed to create responsive variants: {e}")
+        variants = {}
+
+    return {
+        'original_metadata': original_metadata,
+        'optimized': encode_image(image, 'JPEG', 85),
+        'variants': variants
+    }
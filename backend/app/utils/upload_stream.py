@@ -0,0 +1,84 @@
+"""
+Streaming upload storage
+
+Copies an UploadFile to disk in fixed-size chunks so memory per upload
+stays constant: the size limit is enforced as bytes arrive (aborting
+before the rest of the body is read), SHA-256 is computed on the fly and
+the data lands in a temp file next to the destination that is atomically
+renamed into place only once it is complete.
+"""
+
+import os
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Union
+
+import aiofiles
+from fastapi import UploadFile
+
+from app.config import settings
+
+
+class UploadTooLarge(ValueError):
+    """Raised as soon as an upload exceeds its size limit"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"File too large. Maximum size is {max_size // (1024 * 1024)}MB")
+
+
+@dataclass
+class StoredUpload:
+    """A completely written upload"""
+    path: str
+    size: int
+    sha256: str
+
+
+async def stream_upload_to_file(
+    upload: UploadFile,
+    destination: Union[str, Path],
+    max_size: int,
+    chunk_size: int = None,
+    mode: int = 0o600
+) -> StoredUpload:
+    """
+    Write an upload to destination without buffering it in memory
+
+    Raises UploadTooLarge once more than max_size bytes have been read;
+    on any failure the partial temp file is removed and destination is
+    left untouched.
+    """
+    chunk_size = chunk_size or settings.upload_chunk_size
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=destination.parent, prefix='.upload-', suffix='.tmp')
+    os.close(fd)
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, 'wb') as output:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge(max_size)
+                digest.update(chunk)
+                await output.write(chunk)
+
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, destination)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    return StoredUpload(path=str(destination), size=size, sha256=digest.hexdigest())
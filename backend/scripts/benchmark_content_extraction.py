@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+HTML extraction benchmark for ContentExtractionService
+
+Times parsing and structure analysis on large generated pages (or saved
+HTML files) for each parser backend, comparing the single-walk structure
+analyzer with the previous multi-scan version (one find_all per heading
+level plus separate scans for p, lists, img, a, CTAs and sections).
+
+Usage:
+    python scripts/benchmark_content_extraction.py
+    python scripts/benchmark_content_extraction.py --sections 2000 --repeat 5
+    python scripts/benchmark_content_extraction.py --html-dir ./saved_pages --json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+# Add the app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bs4 import BeautifulSoup, Tag
+from bs4.builder import builder_registry
+
+from app.services.content_extraction_service import ContentExtractionService
+
+
+def legacy_analyze_structure(content_element: Tag) -> Dict[str, Any]:
+    """Previous _analyze_structure: a separate tree scan per feature"""
+    analysis = {
+        'headings': [],
+        'paragraphs': len(content_element.find_all('p')),
+        'lists': len(content_element.find_all(['ul', 'ol'])),
+        'images': len(content_element.find_all('img')),
+        'links': len(content_element.find_all('a')),
+        'has_hero_potential': False,
+        'has_cta_elements': False,
+        'sections': 0
+    }
+    for level in range(1, 7):
+        analysis['headings'].extend([
+            {'level': level, 'text': h.get_text(strip=True)[:100]}
+            for h in content_element.find_all(f'h{level}')
+        ])
+    for elem in list(content_element.children)[:2]:
+        if isinstance(elem, Tag) and elem.find('img'):
+            analysis['has_hero_potential'] = True
+            break
+    cta_indicators = ['button', 'btn', 'cta', 'call-to-action', 'contact', 'signup']
+    for element in content_element.find_all(['a', 'button']):
+        element_text = element.get_text(strip=True).lower()
+        element_classes = ' '.join(element.get('class', [])).lower()
+        if any(i in element_text or i in element_classes for i in cta_indicators):
+            analysis['has_cta_elements'] = True
+            break
+    analysis['sections'] = len(content_element.find_all(
+        ['section', 'div'], attrs={'class': re.compile(r'section|block|content-block')}
+    ))
+    return analysis
+
+
+def generate_page(sections: int) -> str:
+    """A long article page with nav, headings, lists, images, links and a late CTA"""
+    parts = [
+        "<html><head><title>Benchmark</title><meta name='description' content='Large page'></head><body>",
+        "<nav>" + "".join(f"<a href='/nav/{i}'>Nav {i}</a>" for i in range(50)) + "</nav>",
+        "<main><div class='hero'><img src='/hero.jpg' alt='Hero image' width='1600' height='600'></div>",
+    ]
+    for i in range(sections):
+        parts.append(
+            f"<section class='content-section'><h{2 + i % 4}>Section {i}</h{2 + i % 4}>"
+            f"<p>Paragraph {i} with <a href='/ref/{i}'>a reference</a> and <strong>emphasis</strong>.</p>"
+            f"<p>Second paragraph {i} explaining the topic in more detail.</p>"
+            f"<ul><li>Point {i}.1</li><li>Point {i}.2</li></ul>"
+            f"<figure><img src='/img/{i}.jpg' alt='Figure {i}' width='800' height='600'>"
+            f"<figcaption>Caption {i}</figcaption></figure></section>"
+        )
+    parts.append("<a class='btn btn-primary' href='/contact'>Contact us</a></main>")
+    parts.append("<footer>" + "".join(f"<a href='/f/{i}'>Footer {i}</a>" for i in range(30)) + "</footer>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def best_of(repeat: int, func: Callable[[], Any]) -> Tuple[float, Any]:
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def run_page(name: str, html: str, parsers: List[str], repeat: int) -> List[Dict[str, Any]]:
+    rows = []
+    for parser in parsers:
+        service = ContentExtractionService(parser=parser)
+        parse_s, soup = best_of(repeat, lambda: BeautifulSoup(html, parser))
+        content = service._find_main_content(soup)
+        legacy_s, legacy = best_of(repeat, lambda: legacy_analyze_structure(content))
+        single_s, single = best_of(repeat, lambda: service._analyze_structure(content))
+        extract_s, _ = best_of(repeat, lambda: service.extract_from_html(html, "https://example.com/"))
+        rows.append({
+            'page': name,
+            'kb': round(len(html) / 1024, 1),
+            'parser': parser,
+            'parse_ms': round(parse_s * 1000, 1),
+            'analyze_legacy_ms': round(legacy_s * 1000, 1),
+            'analyze_single_walk_ms': round(single_s * 1000, 1),
+            'analyze_speedup': round(legacy_s / single_s, 2) if single_s else 0.0,
+            'extract_total_ms': round(extract_s * 1000, 1),
+            'analysis_matches': legacy == single,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parsing and structure analysis")
+    parser.add_argument("--sections", type=int, nargs="+", default=[200, 1000],
+                        help="Section counts for generated pages")
+    parser.add_argument("--html-dir", help="Directory of saved .html pages to benchmark instead")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, best time is kept")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    parsers = [name for name in ('html.parser', 'lxml') if builder_registry.lookup(name)]
+    if args.html_dir:
+        pages = [(p.name, p.read_text(errors='replace')) for p in sorted(Path(args.html_dir).glob('*.htm*'))]
+    else:
+        pages = [(f"generated-{n}", generate_page(n)) for n in args.sections]
+
+    results = []
+    for name, html in pages:
+        results.extend(run_page(name, html, parsers, args.repeat))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for row in results:
+        print(
+            f"{row['page']:>16} {row['kb']:>8} KB | {row['parser']:>11} | parse {row['parse_ms']:>8} ms | "
+            f"analyze {row['analyze_legacy_ms']:>7} -> {row['analyze_single_walk_ms']:>7} ms "
+            f"({row['analyze_speedup']}x) | extract {row['extract_total_ms']:>8} ms | "
+            f"same result: {row['analysis_matches']}"
+        )
+    by_parser = {p: statistics.mean(r['extract_total_ms'] for r in results if r['parser'] == p) for p in parsers}
+    if 'lxml' in by_parser and 'html.parser' in by_parser:
+        print(f"extract speedup lxml vs html.parser: {by_parser['html.parser'] / by_parser['lxml']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Email throughput benchmark for SMTPEmailService
+
+Runs the real send path against the bundled local SMTP sink (no Brevo
+needed) and reports messages/sec, send latency percentiles and memory for
+each recipient scale.
+
+Usage:
+    python scripts/benchmark_email.py
+    python scripts/benchmark_email.py --scales 1000 10000 --concurrency 50
+    python scripts/benchmark_email.py --batch-size 50 --json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+
+# Add the app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.services.email_service import SMTPEmailService
+from tests.smtp_sink import LocalSMTPSink
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of the samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100 * len(ordered)) - 1
+    return ordered[max(0, min(rank, len(ordered) - 1))]
+
+
+def build_template(service: SMTPEmailService) -> Dict[str, str]:
+    """Render a realistic booking confirmation once and reuse it"""
+    return service.generate_customer_email_template(
+        customer_name="Max Mustermann",
+        customer_title="Dr.",
+        consultant_name="Jane Smith",
+        consultant_email="jane@example.com",
+        consultant_role="AI Consultant",
+        booking_date=datetime(2024, 12, 15, 10, 0),
+        start_time="10:00",
+        end_time="10:30",
+        booking_reference="BENCH-0001"
+    )
+
+
+async def run_scale(
+    service: SMTPEmailService,
+    sink: LocalSMTPSink,
+    recipients: int,
+    concurrency: int,
+    batch_size: int
+) -> Dict[str, float]:
+    """Send to `recipients` addresses and collect timings"""
+    template = build_template(service)
+    addresses = [f"recipient{i}@bench.local" for i in range(recipients)]
+    batches = [addresses[i:i + batch_size] for i in range(0, len(addresses), batch_size)]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def send(batch: List[str]):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            ok = await service.send_email(
+                to=batch,
+                subject=template["subject"],
+                html_content=template["html_content"],
+                text_content=template["text_content"]
+            )
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                failures += 1
+
+    sink.reset()
+    tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*[send(batch) for batch in batches])
+    elapsed = time.perf_counter() - started
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "recipients": recipients,
+        "messages": len(batches),
+        "delivered": sink.message_count,
+        "failures": failures,
+        "elapsed_s": round(elapsed, 3),
+        "messages_per_s": round(len(batches) / elapsed, 1) if elapsed else 0.0,
+        "recipients_per_s": round(recipients / elapsed, 1) if elapsed else 0.0,
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "latency_max_ms": round(max(latencies) * 1000, 2),
+        "peak_traced_mb": round(peak_bytes / 1024 / 1024, 2),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark SMTPEmailService against a local SMTP sink")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000],
+                        help="Recipient counts to benchmark")
+    parser.add_argument("--concurrency", type=int, default=20,
+                        help="Maximum in-flight send_email calls")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Recipients per message")
+    parser.add_argument("--log-level", default="WARNING",
+                        help="Log level for app loggers (INFO includes full email bodies)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+    logging.getLogger("app").setLevel(args.log_level)
+    logging.getLogger("mail.log").setLevel(logging.ERROR)
+
+    with LocalSMTPSink(keep_messages=False) as sink:
+        # send_email checks the global settings before connecting
+        settings.smtp_username = "sink"
+        settings.smtp_password = "sink"
+        service = SMTPEmailService()
+        sink.configure_service(service)
+
+        results = []
+        for recipients in args.scales:
+            result = await run_scale(service, sink, recipients, args.concurrency, args.batch_size)
+            results.append(result)
+            if not args.json:
+                print(
+                    f"{result['recipients']:>7} recipients | {result['messages']:>7} msgs | "
+                    f"{result['messages_per_s']:>8} msg/s | p50 {result['latency_p50_ms']:>7} ms | "
+                    f"p99 {result['latency_p99_ms']:>7} ms | peak {result['peak_traced_mb']:>6} MB | "
+                    f"rss {result['max_rss_mb']:>6} MB | failed {result['failures']}"
+                )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Responsive variant benchmark for the image pipeline
+
+Compares the single-decode cascade pipeline against the previous
+per-variant approach (one full decode and full-size resize per size and
+format) over a corpus of sample images, reporting time per image, speedup
+and output bytes.
+
+Usage:
+    python scripts/benchmark_image_variants.py
+    python scripts/benchmark_image_variants.py --corpus ./samples --repeat 3
+    python scripts/benchmark_image_variants.py --synthetic 12 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+# Add the app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PIL import Image, ImageOps
+
+from app.services.image_processing_service import ImageProcessingService
+from app.utils import image_pipeline
+
+SAMPLE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+
+def legacy_variant(image_data: bytes, target_width: int, quality: int, format: str) -> Tuple[bytes, Dict[str, Any]]:
+    """Previous optimize_image: full decode, resize, then orient"""
+    image = Image.open(BytesIO(image_data))
+    if format == 'JPEG' and image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
+        image = background
+    if image.width > target_width:
+        new_height = int(image.height * target_width / image.width)
+        image = image.resize((target_width, new_height), Image.Resampling.LANCZOS)
+    image = ImageOps.exif_transpose(image)
+    output = BytesIO()
+    if format == 'JPEG':
+        image.save(output, format='JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(output, format='WEBP', quality=quality, method=6)
+    return output.getvalue(), {'width': image.width, 'height': image.height, 'size': output.tell()}
+
+
+def legacy_variants(image_data: bytes, sizes: Dict[str, int]) -> Dict[str, Tuple[bytes, Dict[str, Any]]]:
+    """Previous create_responsive_variants: one decode per size and format"""
+    variants = {}
+    original_width = Image.open(BytesIO(image_data)).width
+    for size_name, target_width in sizes.items():
+        if original_width <= target_width and size_name != 'thumbnail':
+            continue
+        quality = 85 if size_name in ('large', 'xlarge') else 90
+        variants[size_name] = legacy_variant(image_data, target_width, quality, 'JPEG')
+        variants[f"{size_name}_webp"] = legacy_variant(image_data, target_width, 80, 'WEBP')
+    return variants
+
+
+def synthetic_corpus(count: int) -> List[Tuple[str, bytes]]:
+    """Camera-sized JPEGs and a transparent PNG with photo-like noise"""
+    shapes = [(4000, 3000), (3000, 2000), (2400, 1600), (1920, 1080), (1200, 1600)]
+    corpus = []
+    for i in range(count):
+        width, height = shapes[i % len(shapes)]
+        image = Image.merge('RGB', [
+            Image.effect_noise((width, height), 24 + 8 * channel).resize((width, height))
+            for channel in range(3)
+        ])
+        output = BytesIO()
+        if i % 6 == 5:
+            image.putalpha(Image.linear_gradient('L').resize((width, height)))
+            image.save(output, format='PNG')
+            corpus.append((f"synthetic_{i}_{width}x{height}.png", output.getvalue()))
+        else:
+            image.save(output, format='JPEG', quality=92)
+            corpus.append((f"synthetic_{i}_{width}x{height}.jpg", output.getvalue()))
+    return corpus
+
+
+def load_corpus(directory: str) -> List[Tuple[str, bytes]]:
+    paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in SAMPLE_EXTENSIONS)
+    return [(p.name, p.read_bytes()) for p in paths]
+
+
+def run(
+    generate: Callable[[bytes, Dict[str, int]], Dict[str, Tuple[bytes, Dict[str, Any]]]],
+    corpus: List[Tuple[str, bytes]],
+    sizes: Dict[str, int],
+    repeat: int
+) -> Dict[str, float]:
+    """Time the variant generator over the corpus, best of `repeat`"""
+    per_image: List[float] = []
+    total_bytes = 0
+    variant_count = 0
+    for _, image_data in corpus:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            variants = generate(image_data, sizes)
+            timings.append(time.perf_counter() - started)
+        per_image.append(min(timings))
+        total_bytes += sum(len(data) for data, _ in variants.values())
+        variant_count += len(variants)
+
+    return {
+        'images': len(corpus),
+        'variants': variant_count,
+        'total_s': round(sum(per_image), 3),
+        'ms_per_image_mean': round(statistics.mean(per_image) * 1000, 1),
+        'ms_per_image_max': round(max(per_image) * 1000, 1),
+        'output_kb': round(total_bytes / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark responsive image variant generation")
+    parser.add_argument("--corpus", help="Directory of sample images (JPEG/PNG/WebP)")
+    parser.add_argument("--synthetic", type=int, default=6,
+                        help="Number of generated images when no corpus is given")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per image, best time is kept")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.synthetic)
+    if not corpus:
+        parser.error(f"No images found in {args.corpus}")
+
+    sizes = ImageProcessingService.RESPONSIVE_SIZES
+    results = {
+        'legacy': run(legacy_variants, corpus, sizes, args.repeat),
+        'cascade': run(image_pipeline.create_responsive_variants, corpus, sizes, args.repeat),
+    }
+    results['speedup'] = round(results['legacy']['total_s'] / results['cascade']['total_s'], 2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name in ('legacy', 'cascade'):
+        result = results[name]
+        print(
+            f"{name:>8} | {result['images']:>3} images | {result['variants']:>4} variants | "
+            f"{result['ms_per_image_mean']:>8} ms/image (max {result['ms_per_image_max']}) | "
+            f"{result['output_kb']:>9} KB"
+        )
+    print(f"speedup: {results['speedup']}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Bulk translation import/export throughput benchmark
+
+Generates a fixture of N keys (default 50,000) spread over namespaces,
+imports it into a fresh file-backed SQLite database in each format, imports
+it again (every row hits ON CONFLICT DO UPDATE), and streams every
+namespace back out, printing keys per second for each step.
+
+Usage:
+    python scripts/benchmark_translation_import.py
+    python scripts/benchmark_translation_import.py --keys 100000 --batch-size 2000
+    python scripts/benchmark_translation_import.py --format csv --json
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+# Add the app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.services.translation_bulk_service import TranslationBulkService, CSV_COLUMNS
+
+WORDS = "secure cloud data platform consulting service team project digital solution customer".split()
+
+
+def fixture(keys: int, namespaces: int, seed: int = 1) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(keys):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 12))).capitalize()
+        rows.append({
+            'namespace': f"ns{i % namespaces}",
+            'key': f"section{i // 100}.item{i}",
+            'source_language': 'en',
+            'target_language': 'de',
+            'source_text': text,
+            'translated_text': f"DE {text}",
+            'status': 'translated',
+            'context': '',
+        })
+    return rows
+
+
+def encode(rows: List[Dict[str, str]], format: str) -> List[tuple]:
+    """(file bytes, namespace) pairs; JSON and XLIFF get one file per namespace"""
+    if format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+        return [(buffer.getvalue().encode('utf-8'), None)]
+
+    by_namespace: Dict[str, List[Dict[str, str]]] = {}
+    for row in rows:
+        by_namespace.setdefault(row['namespace'], []).append(row)
+
+    files = []
+    for namespace, items in by_namespace.items():
+        if format == 'json':
+            document = {row['key']: row['translated_text'] for row in items}
+            files.append((json.dumps(document, ensure_ascii=False).encode('utf-8'), namespace))
+        else:
+            units = "".join(
+                f'<trans-unit id="{row["key"]}"><source>{row["source_text"]}</source>'
+                f'<target>{row["translated_text"]}</target></trans-unit>'
+                for row in items
+            )
+            document = (
+                '<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2">'
+                f'<file original="{namespace}" source-language="en" target-language="de"><body>'
+                f'{units}</body></file></xliff>'
+            )
+            files.append((document.encode('utf-8'), namespace))
+    return files
+
+
+async def run(format: str, rows: List[Dict[str, str]], batch_size: int) -> Dict[str, float]:
+    files = encode(rows, format)
+    namespaces = sorted({row['namespace'] for row in rows})
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/bench.db", poolclass=NullPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        timings = {}
+        for step in ('insert', 'update'):
+            started = time.perf_counter()
+            async with session_factory() as db:
+                service = TranslationBulkService(db, batch_size=batch_size)
+                for content, namespace in files:
+                    await service.import_file(
+                        io.BytesIO(content), format, namespace=namespace, target_language='de'
+                    )
+            timings[step] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        exported = 0
+        async with session_factory() as db:
+            service = TranslationBulkService(db)
+            for namespace in namespaces:
+                async for chunk in service.iter_export(namespace, 'de', format):
+                    exported += len(chunk)
+        timings['export'] = time.perf_counter() - started
+
+        await engine.dispose()
+
+    return {
+        f"{step}_keys_per_second": round(len(rows) / seconds, 1)
+        for step, seconds in timings.items()
+    } | {'export_bytes': exported}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure bulk translation import/export throughput")
+    parser.add_argument("--keys", type=int, default=50_000)
+    parser.add_argument("--namespaces", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--format", action="append", choices=["csv", "json", "xliff"],
+                        help="Format to benchmark (default: all)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rows = fixture(args.keys, args.namespaces)
+    results = {}
+    for format in args.format or ["csv", "json", "xliff"]:
+        results[format] = await run(format, rows, args.batch_size)
+
+    if args.json:
+        print(json.dumps({'keys': args.keys, 'batch_size': args.batch_size, 'results': results}, indent=2))
+        return
+
+    print(f"{args.keys} keys, {args.namespaces} namespaces, batch size {args.batch_size}")
+    print(f"{'format':<8}{'insert/s':>12}{'update/s':>12}{'export/s':>12}")
+    for format, result in results.items():
+        print(
+            f"{format:<8}{result['insert_keys_per_second']:>12,.0f}"
+            f"{result['update_keys_per_second']:>12,.0f}{result['export_keys_per_second']:>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
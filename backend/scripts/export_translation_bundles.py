@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Export translation bundles as static JSON for the frontend build
+
+Writes one {language}/{namespace}.json file per namespace and language with
+English fallbacks already merged, the same content served by
+GET /public/translations/{namespace}.
+
+Usage:
+    python scripts/export_translation_bundles.py
+    python scripts/export_translation_bundles.py --output ../frontend/public/locales
+    python scripts/export_translation_bundles.py --language de
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Add the app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.database import AsyncSessionLocal, close_db
+from app.services.multilingual_content_service import MultilingualContentService
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Export translation bundles as static JSON")
+    parser.add_argument("--output", default=settings.translation_bundle_export_dir,
+                        help="Directory receiving {language}/{namespace}.json")
+    parser.add_argument("--language", action="append", help="Language to export (default: all supported)")
+    args = parser.parse_args()
+
+    try:
+        async with AsyncSessionLocal() as db:
+            paths = await MultilingualContentService(db).export_translation_bundles(
+                directory=args.output,
+                languages=args.language
+            )
+    finally:
+        await close_db()
+
+    for path in paths:
+        print(path)
+    print(f"Exported {len(paths)} bundles to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
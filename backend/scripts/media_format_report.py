@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Bytes-per-format report for responsive media variants
+
+Runs the variant pipeline over a corpus of sample images and totals the
+output size of every format (JPEG, WebP and, when the plugin is installed,
+AVIF) per responsive size, with savings relative to JPEG. Use it to
+quantify the bandwidth saved by content negotiation.
+
+Usage:
+    python scripts/media_format_report.py
+    python scripts/media_format_report.py --corpus ./samples
+    python scripts/media_format_report.py --synthetic 12 --json
+"""
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Add the app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.image_processing_service import ImageProcessingService
+from app.utils import image_pipeline
+from scripts.benchmark_image_variants import load_corpus, synthetic_corpus
+
+
+def build_report(corpus: List[Tuple[str, bytes]], sizes: Dict[str, int]) -> Dict[str, Dict[str, int]]:
+    """Total bytes per responsive size and format: {size: {format: bytes}}"""
+    formats = image_pipeline.variant_formats()
+    totals: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    for _, image_data in corpus:
+        image = image_pipeline.decode_image(image_data)
+        variants = image_pipeline.build_variants(image, sizes, formats)
+        for size_name in sizes:
+            for format, suffix in formats:
+                variant = variants.get(f"{size_name}{suffix}")
+                if variant:
+                    totals[size_name][format] += len(variant[0])
+
+    return {size_name: dict(by_format) for size_name, by_format in totals.items()}
+
+
+def savings(report: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, float]]:
+    """Percent saved versus JPEG for each size and format"""
+    result = {}
+    for size_name, by_format in report.items():
+        baseline = by_format.get('JPEG')
+        result[size_name] = {
+            format: round(100 * (1 - size / baseline), 1) if baseline else 0.0
+            for format, size in by_format.items() if format != 'JPEG'
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare variant bytes per output format")
+    parser.add_argument("--corpus", help="Directory of sample images (JPEG/PNG/WebP)")
+    parser.add_argument("--synthetic", type=int, default=6,
+                        help="Number of generated images when no corpus is given")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.synthetic)
+    if not corpus:
+        parser.error(f"No images found in {args.corpus}")
+
+    sizes = ImageProcessingService.RESPONSIVE_SIZES
+    report = build_report(corpus, sizes)
+    totals: Dict[str, int] = defaultdict(int)
+    for by_format in report.values():
+        for format, size in by_format.items():
+            totals[format] += size
+    report['total'] = dict(totals)
+
+    if args.json:
+        print(json.dumps({
+            'images': len(corpus),
+            'avif_available': image_pipeline.avif_supported(),
+            'bytes': report,
+            'savings_vs_jpeg_pct': savings(report)
+        }, indent=2))
+        return
+
+    formats = [format for format, _ in image_pipeline.variant_formats()]
+    print(f"{len(corpus)} images, formats: {', '.join(formats)}"
+          + ("" if image_pipeline.avif_supported() else " (AVIF plugin not installed)"))
+    print(f"{'size':>10} | " + " | ".join(f"{format:>12}" for format in formats) + " | savings vs JPEG")
+    saved = savings(report)
+    for size_name in list(sizes) + ['total']:
+        if size_name not in report:
+            continue
+        row = " | ".join(f"{report[size_name].get(format, 0) / 1024:>9.1f} KB" for format in formats)
+        pct = ", ".join(f"{format} {value}%" for format, value in saved[size_name].items())
+        print(f"{size_name:>10} | {row} | {pct}")
+
+
+if __name__ == "__main__":
+    main()
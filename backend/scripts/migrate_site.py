@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Migrate a whole site into draft pages
+
+Crawls from a sitemap and/or seed URLs with the concurrent migration
+crawler (shared HTTP/2 client, per-host limits, robots.txt, conditional
+requests) and prints progress while pages, images and variants are
+created.
+
+Usage:
+    python scripts/migrate_site.py --sitemap https://old.example.com/sitemap.xml
+    python scripts/migrate_site.py --seed https://old.example.com/ --max-pages 200
+    python scripts/migrate_site.py --sitemap https://old.example.com/sitemap.xml --no-images --json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from dataclasses import asdict
+
+# Add the app directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.database import init_db, close_db
+from app.services.content_extraction_service import content_extraction_service
+from app.services.image_processing_service import image_service
+from app.services.migration_crawler import MigrationCrawler, CrawlProgress
+
+
+def print_progress(progress: CrawlProgress) -> None:
+    print(
+        f"\r[{progress.elapsed_seconds:>7.1f}s] {progress.completed}/{progress.discovered} urls | "
+        f"created {progress.pages_created} | updated {progress.pages_updated} | "
+        f"unchanged {progress.not_modified} | robots {progress.skipped_robots} | "
+        f"failed {progress.failed} | images {progress.images_stored} | "
+        f"{progress.bytes_downloaded / 1024 / 1024:.1f} MB",
+        end="", flush=True
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Crawl a site and migrate its pages")
+    parser.add_argument("--sitemap", help="Sitemap (or sitemap index) URL")
+    parser.add_argument("--seed", action="append", default=[], help="Seed URL; links are followed on the same host")
+    parser.add_argument("--max-pages", type=int, default=settings.crawler_max_pages)
+    parser.add_argument("--concurrency", type=int, default=settings.crawler_max_concurrency,
+                        help="Pages in flight across all hosts")
+    parser.add_argument("--per-host", type=int, default=settings.crawler_per_host_concurrency,
+                        help="Requests in flight per host")
+    parser.add_argument("--delay", type=float, default=settings.crawler_request_delay_seconds,
+                        help="Minimum seconds between requests to one host")
+    parser.add_argument("--no-images", action="store_true", help="Skip image download and variants")
+    parser.add_argument("--full", action="store_true", help="Refetch everything; stored ETag/Last-Modified validators are neither sent nor updated")
+    parser.add_argument("--json", action="store_true", help="Print the final counters as JSON")
+    args = parser.parse_args()
+
+    if not args.sitemap and not args.seed:
+        parser.error("Give --sitemap and/or --seed")
+
+    logging.basicConfig(level=logging.WARNING)
+    await init_db()
+
+    crawler = MigrationCrawler(
+        max_concurrency=args.concurrency,
+        per_host_concurrency=args.per_host,
+        request_delay_seconds=args.delay,
+        max_pages=args.max_pages,
+        state_file=None if args.full else settings.crawler_state_file,
+        migrate_images=not args.no_images,
+        on_progress=None if args.json else print_progress
+    )
+
+    try:
+        progress = await crawler.crawl(seed_urls=args.seed, sitemap_url=args.sitemap)
+    finally:
+        image_service.shutdown()
+        content_extraction_service.shutdown()
+        await close_db()
+
+    if args.json:
+        print(json.dumps(asdict(progress), indent=2))
+    else:
+        print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
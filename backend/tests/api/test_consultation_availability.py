@@ -0,0 +1,254 @@
+"""
+Test cases for the multi-day consultation availability calendar
+"""
+
+import pytest
+import pytest_asyncio
+import uuid
+from datetime import date, datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies import get_current_active_user
+from app.main import app
+from app.models.business import ConsultationBooking, ConsultationBookingStatus
+from app.models.consultant import Consultant, ConsultantAvailability, ConsultantStatus
+from app.models.user import AdminUser
+from app.services.consultation_booking_service import availability_cache, _as_date
+
+
+# Monday two weeks out, so weekday rules are easy to reason about
+WINDOW_START = date.today() + timedelta(days=14 - date.today().weekday())
+WINDOW_END = WINDOW_START + timedelta(days=13)
+
+
+@pytest.fixture(autouse=True)
+def clear_availability_cache():
+    availability_cache.clear()
+    yield
+    availability_cache.clear()
+
+
+@pytest.fixture
+def query_counter(test_engine):
+    """Count SQL statements issued against the test engine"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(test_engine.sync_engine, "before_cursor_execute", count)
+
+
+@pytest_asyncio.fixture
+async def consultants(test_session: AsyncSession):
+    """An unrestricted consultant and one with weekly rules and a holiday"""
+    open_consultant = Consultant(
+        id=str(uuid.uuid4()),
+        linkedin_url="https://www.linkedin.com/in/open-consultant",
+        email="open@example.com",
+        first_name="Open",
+        last_name="Consultant",
+        status=ConsultantStatus.ACTIVE,
+        is_verified=True
+    )
+    ruled_consultant = Consultant(
+        id=str(uuid.uuid4()),
+        linkedin_url="https://www.linkedin.com/in/ruled-consultant",
+        email="ruled@example.com",
+        first_name="Ruled",
+        last_name="Consultant",
+        status=ConsultantStatus.ACTIVE,
+        is_verified=True
+    )
+    test_session.add_all([open_consultant, ruled_consultant])
+    await test_session.flush()
+
+    test_session.add_all([
+        # Monday mornings only
+        ConsultantAvailability(
+            consultant_id=ruled_consultant.id, day_of_week=0,
+            start_time="09:00:00", end_time="12:00:00", is_available=True
+        ),
+        # Wednesday all day
+        ConsultantAvailability(
+            consultant_id=ruled_consultant.id, day_of_week=2,
+            start_time="09:00:00", end_time="17:00:00", is_available=True
+        ),
+        # Second Wednesday is a holiday
+        ConsultantAvailability(
+            consultant_id=ruled_consultant.id, day_of_week=2,
+            date_override=datetime.combine(WINDOW_START + timedelta(days=9), datetime.min.time()),
+            is_holiday=True
+        ),
+    ])
+    await test_session.commit()
+    return open_consultant, ruled_consultant
+
+
+async def add_booking(session: AsyncSession, consultant_id: str, day: date, time_slot: str, booking_status):
+    hour = int(time_slot.split(":")[0])
+    session.add(ConsultationBooking(
+        id=str(uuid.uuid4()),
+        consultant_id=consultant_id,
+        first_name="Existing",
+        last_name="Booker",
+        email="existing@example.com",
+        phone="+49 30 1234567",
+        consultation_date=datetime.combine(day, datetime.min.time()).replace(hour=hour),
+        time_slot=time_slot,
+        booking_status=booking_status
+    ))
+    await session.commit()
+
+
+async def fetch_calendar(client: AsyncClient, *consultant_ids: str) -> dict:
+    response = await client.get(
+        "/api/v1/consultations/public/availability",
+        params={
+            "date_from": WINDOW_START.isoformat(),
+            "date_to": WINDOW_END.isoformat(),
+            "consultant_ids": list(consultant_ids)
+        }
+    )
+    assert response.status_code == 200
+    return response.json()["data"]["consultants"]
+
+
+class TestAvailabilityCalendar:
+    """Test the range availability endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_calendar_combines_rules_and_bookings(
+        self, client: AsyncClient, test_session: AsyncSession, consultants
+    ):
+        """Test weekly rules, holidays and active bookings shape the grid"""
+        open_consultant, ruled_consultant = consultants
+        await add_booking(test_session, open_consultant.id, WINDOW_START, "10:00", ConsultationBookingStatus.CONFIRMED)
+        await add_booking(test_session, open_consultant.id, WINDOW_START, "14:00", ConsultationBookingStatus.CANCELLED)
+        await add_booking(test_session, ruled_consultant.id, WINDOW_START + timedelta(days=2), "14:00", ConsultationBookingStatus.PENDING_PAYMENT)
+
+        calendar = await fetch_calendar(client, open_consultant.id, ruled_consultant.id)
+
+        open_days = calendar[open_consultant.id]
+        assert len(open_days) == 14
+        assert open_days[WINDOW_START.isoformat()] == ["14:00"]
+        assert open_days[(WINDOW_START + timedelta(days=1)).isoformat()] == ["10:00", "14:00"]
+
+        ruled_days = calendar[ruled_consultant.id]
+        assert ruled_days[WINDOW_START.isoformat()] == ["10:00"]  # Monday morning
+        assert ruled_days[(WINDOW_START + timedelta(days=1)).isoformat()] == []  # Tuesday
+        assert ruled_days[(WINDOW_START + timedelta(days=2)).isoformat()] == ["10:00"]  # Wednesday, 14:00 held
+        assert ruled_days[(WINDOW_START + timedelta(days=9)).isoformat()] == []  # Holiday
+        assert ruled_days[(WINDOW_START + timedelta(days=7)).isoformat()] == ["10:00"]
+
+    @pytest.mark.asyncio
+    async def test_day_slots_and_bookings_follow_rules(self, client: AsyncClient, consultants):
+        """Test the single-day endpoint and new bookings apply the same rules as the calendar"""
+        _, ruled_consultant = consultants
+        calendar = await fetch_calendar(client, ruled_consultant.id)
+
+        for offset in (0, 1, 2, 9):
+            day = WINDOW_START + timedelta(days=offset)
+            response = await client.get(
+                f"/api/v1/consultations/public/consultants/{ruled_consultant.id}/availability",
+                params={"target_date": day.isoformat()}
+            )
+            assert response.json()["data"]["available_slots"] == calendar[ruled_consultant.id][day.isoformat()]
+
+        def booking(day: date, time_slot: str) -> dict:
+            return {
+                "consultant_id": ruled_consultant.id,
+                "consultation_date": datetime.combine(day, datetime.min.time()).replace(hour=int(time_slot[:2])).isoformat(),
+                "time_slot": time_slot,
+                "terms_accepted": True,
+                "contact_info": {"first_name": "New", "last_name": "Booker", "email": "new@example.com", "phone": "+49 30 7654321"}
+            }
+
+        afternoon = await client.post("/api/v1/consultations/public/bookings", json=booking(WINDOW_START, "14:00"))
+        holiday = await client.post("/api/v1/consultations/public/bookings", json=booking(WINDOW_START + timedelta(days=9), "10:00"))
+        morning = await client.post("/api/v1/consultations/public/bookings", json=booking(WINDOW_START, "10:00"))
+
+        assert afternoon.status_code == holiday.status_code == 400
+        assert afternoon.json()["detail"] == "Time slot not available"
+        assert morning.status_code == 200
+
+    def test_booking_days_from_any_driver(self):
+        """Test func.date() results are read as strings (SQLite) or dates (PostgreSQL)"""
+        day = date(2025, 3, 14)
+        assert _as_date("2025-03-14") == _as_date(day) == _as_date(datetime(2025, 3, 14, 10)) == day
+
+    @pytest.mark.asyncio
+    async def test_calendar_uses_constant_queries_and_cache(
+        self, client: AsyncClient, consultants, query_counter
+    ):
+        """Test a cold window costs three queries and a warm one just one"""
+        open_consultant, ruled_consultant = consultants
+
+        await fetch_calendar(client, open_consultant.id, ruled_consultant.id)
+        assert len(query_counter) == 3
+
+        query_counter.clear()
+        await fetch_calendar(client, open_consultant.id, ruled_consultant.id)
+        assert len(query_counter) == 1
+
+    @pytest.mark.asyncio
+    async def test_booking_create_and_cancel_invalidate_cache(
+        self, client: AsyncClient, consultants, editor_user: AdminUser, monkeypatch
+    ):
+        """Test cached availability follows bookings being made and cancelled"""
+        open_consultant, _ = consultants
+        day = WINDOW_START + timedelta(days=3)
+
+        calendar = await fetch_calendar(client, open_consultant.id)
+        assert calendar[open_consultant.id][day.isoformat()] == ["10:00", "14:00"]
+
+        response = await client.post("/api/v1/consultations/public/bookings", json={
+            "consultant_id": open_consultant.id,
+            "consultation_date": datetime.combine(day, datetime.min.time()).replace(hour=14).isoformat(),
+            "time_slot": "14:00",
+            "terms_accepted": True,
+            "contact_info": {
+                "first_name": "New",
+                "last_name": "Booker",
+                "email": "new@example.com",
+                "phone": "+49 30 7654321"
+            }
+        })
+        assert response.status_code == 200
+        booking_id = response.json()["data"]["booking_id"]
+
+        calendar = await fetch_calendar(client, open_consultant.id)
+        assert calendar[open_consultant.id][day.isoformat()] == ["10:00"]
+
+        cancel_url = f"/api/v1/consultations/admin/bookings/{booking_id}/cancel"
+        response = await client.post(cancel_url, json={"reason": "Customer request"})
+        assert response.status_code == 403
+
+        monkeypatch.setitem(app.dependency_overrides, get_current_active_user, lambda: editor_user)
+        response = await client.post(cancel_url, json={"reason": "Customer request"})
+        assert response.status_code == 200
+
+        calendar = await fetch_calendar(client, open_consultant.id)
+        assert calendar[open_consultant.id][day.isoformat()] == ["10:00", "14:00"]
+
+    @pytest.mark.asyncio
+    async def test_calendar_range_validation(self, client: AsyncClient):
+        """Test inverted and oversized ranges are rejected"""
+        response = await client.get(
+            "/api/v1/consultations/public/availability",
+            params={"date_from": WINDOW_END.isoformat(), "date_to": WINDOW_START.isoformat()}
+        )
+        assert response.status_code == 400
+
+        response = await client.get(
+            "/api/v1/consultations/public/availability",
+            params={
+                "date_from": WINDOW_START.isoformat(),
+                "date_to": (WINDOW_START + timedelta(days=365)).isoformat()
+            }
+        )
+        assert response.status_code == 400
@@ -0,0 +1,134 @@
+"""
+Concurrency tests for consultation slot booking
+
+Parallel bookers hit the public booking endpoint through the file-backed
+concurrent_client; the unique active-slot index must let exactly one of them
+win each slot.
+"""
+
+import asyncio
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select, func
+
+from app.models.business import ConsultationBooking, ConsultationBookingStatus
+from app.models.consultant import Consultant, ConsultantStatus
+
+
+async def create_consultant(file_session_factory) -> str:
+    async with file_session_factory() as session:
+        consultant = Consultant(
+            id=str(uuid.uuid4()),
+            linkedin_url="https://www.linkedin.com/in/stress-test",
+            email="consultant@example.com",
+            first_name="Stress",
+            last_name="Tester",
+            status=ConsultantStatus.ACTIVE,
+            is_verified=True
+        )
+        session.add(consultant)
+        await session.commit()
+        return consultant.id
+
+
+async def active_bookings(file_session_factory, consultant_id: str) -> int:
+    async with file_session_factory() as session:
+        return await session.scalar(
+            select(func.count(ConsultationBooking.id)).where(
+                ConsultationBooking.consultant_id == consultant_id,
+                ConsultationBooking.booking_status.in_([
+                    ConsultationBookingStatus.PENDING_PAYMENT,
+                    ConsultationBookingStatus.CONFIRMED
+                ])
+            )
+        )
+
+
+def booking_payload(consultant_id: str, day: datetime, time_slot: str, i: int) -> dict:
+    return {
+        "consultant_id": consultant_id,
+        "consultation_date": day.isoformat(),
+        "time_slot": time_slot,
+        "terms_accepted": True,
+        "contact_info": {
+            "first_name": "Parallel",
+            "last_name": f"Booker {i}",
+            "email": f"booker{i}@example.com",
+            "phone": "+49 30 1234567"
+        }
+    }
+
+
+class TestConsultationBookingConcurrency:
+    """Parallel bookers must never double-book a slot"""
+
+    @pytest.mark.asyncio
+    async def test_parallel_bookers_get_one_slot_each(self, concurrent_client, file_session_factory):
+        """Test 100 bookers per slot over 3 days yield one booking per slot"""
+        consultant_id = await create_consultant(file_session_factory)
+        base_day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=3)
+
+        requests = []
+        for day_offset in range(3):
+            day = base_day + timedelta(days=day_offset)
+            for time_slot in ["10:00", "14:00"]:
+                hour = int(time_slot.split(":")[0])
+                for i in range(100):
+                    requests.append(booking_payload(
+                        consultant_id, day.replace(hour=hour), time_slot, len(requests)
+                    ))
+
+        responses = await asyncio.gather(*[
+            concurrent_client.post("/api/v1/consultations/public/bookings", json=payload)
+            for payload in requests
+        ])
+
+        accepted = [r for r in responses if r.status_code == 200]
+        rejected = [r for r in responses if r.status_code == 400]
+        assert len(accepted) == 6
+        assert len(rejected) == len(requests) - 6
+        assert all(r.json()["detail"] == "Time slot not available" for r in rejected)
+        assert await active_bookings(file_session_factory, consultant_id) == 6
+
+        won_slots = {
+            (r.json()["data"]["booking"]["consultation_date"][:10], r.json()["data"]["booking"]["time_slot"])
+            for r in accepted
+        }
+        assert len(won_slots) == 6
+
+    @pytest.mark.asyncio
+    async def test_cancelled_booking_frees_slot(self, concurrent_client, file_session_factory):
+        """Test a cancelled booking no longer blocks its slot"""
+        consultant_id = await create_consultant(file_session_factory)
+        day = datetime.utcnow().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=5)
+
+        first = await concurrent_client.post(
+            "/api/v1/consultations/public/bookings",
+            json=booking_payload(consultant_id, day, "10:00", 0)
+        )
+        assert first.status_code == 200
+
+        async with file_session_factory() as session:
+            booking = await session.get(ConsultationBooking, first.json()["data"]["booking_id"])
+            booking.booking_status = ConsultationBookingStatus.CANCELLED
+            await session.commit()
+
+        second = await concurrent_client.post(
+            "/api/v1/consultations/public/bookings",
+            json=booking_payload(consultant_id, day, "10:00", 1)
+        )
+        assert second.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_unknown_time_slot_rejected(self, concurrent_client, file_session_factory):
+        """Test slots outside the fixed 30/30 grid are rejected"""
+        consultant_id = await create_consultant(file_session_factory)
+        day = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0) + timedelta(days=5)
+
+        response = await concurrent_client.post(
+            "/api/v1/consultations/public/bookings",
+            json=booking_payload(consultant_id, day, "12:00", 0)
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Time slot not available"
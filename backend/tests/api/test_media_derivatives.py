@@ -0,0 +1,223 @@
+"""
+Test cases for the on-demand media derivative endpoint
+"""
+
+import asyncio
+import pytest
+import pytest_asyncio
+from io import BytesIO
+from PIL import Image
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.content import MediaFile
+from app.services.image_processing_service import ImageProcessingService
+from app.services import media_derivative_service
+from app.services.media_derivative_service import DerivativeCache, MediaDerivativeService, negotiate_format
+from app.api.v1.public import media as media_api
+
+
+@pytest.fixture
+def derivatives(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "image_processing_workers", 0)
+    processor = ImageProcessingService(upload_dir=str(tmp_path / "images"))
+    service = MediaDerivativeService(
+        processor,
+        DerivativeCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024),
+        widths=[150, 400, 800, 1200]
+    )
+    service.renders = 0
+    render_derivative = processor.render_derivative
+
+    async def counting_render_derivative(*args):
+        service.renders += 1
+        await asyncio.sleep(0.05)  # Keep the render in flight while others arrive
+        return await render_derivative(*args)
+
+    monkeypatch.setattr(processor, "render_derivative", counting_render_derivative)
+    monkeypatch.setattr(media_api, "derivative_service", service)
+    yield service
+    processor.shutdown()
+
+
+@pytest_asyncio.fixture
+async def media_file(test_session: AsyncSession, derivatives) -> MediaFile:
+    output = BytesIO()
+    Image.new("RGB", (1000, 500), (10, 90, 160)).save(output, format="JPEG")
+    data = output.getvalue()
+    file_path, _ = await derivatives.processor.store.put(data, ".jpg")
+
+    media_file = MediaFile(
+        filename=file_path.rsplit("/", 1)[-1],
+        original_filename="hero.jpg",
+        file_path=file_path,
+        file_size=len(data),
+        mime_type="image/jpeg",
+        file_hash=derivatives.processor.store.hash_bytes(data),
+        image_metadata={"width": 1000, "height": 500}
+    )
+    test_session.add(media_file)
+    await test_session.commit()
+    await test_session.refresh(media_file)
+    return media_file
+
+
+def url(media_id: int, width: int, fmt: str) -> str:
+    return f"/api/v1/public/media/{media_id}/w/{width}.{fmt}"
+
+
+class TestMediaDerivatives:
+    """Test lazy derivative generation, caching and headers"""
+
+    @pytest.mark.asyncio
+    async def test_width_is_snapped_and_cached(self, client: AsyncClient, media_file, derivatives):
+        """Test a request renders once at the snapped width and then hits the cache"""
+        response = await client.get(url(media_file.id, 700, "webp"))
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert Image.open(BytesIO(response.content)).size == (800, 400)
+
+        again = await client.get(url(media_file.id, 800, "webp"))
+        assert again.content == response.content
+        assert again.headers["etag"] == response.headers["etag"]
+        assert derivatives.renders == 1
+        assert derivatives.get_metrics()["hits"] == 1
+
+        not_modified = await client.get(
+            url(media_file.id, 800, "webp"),
+            headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert not_modified.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_never_upscales(self, client: AsyncClient, media_file):
+        """Test widths above the source are served at the source size"""
+        response = await client.get(url(media_file.id, 5000, "jpg"))
+
+        assert response.status_code == 200
+        assert Image.open(BytesIO(response.content)).size == (1000, 500)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_are_coalesced(self, client: AsyncClient, media_file, derivatives):
+        """Test parallel requests for one derivative share a single render"""
+        responses = await asyncio.gather(*[
+            client.get(url(media_file.id, 400, "jpg")) for _ in range(10)
+        ])
+
+        assert all(response.status_code == 200 for response in responses)
+        assert len({response.content for response in responses}) == 1
+        assert derivatives.renders == 1
+        assert derivatives.get_metrics()["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_cancelled_render_hands_over_to_waiters(self, media_file, derivatives):
+        """Test a waiter renders itself when the request it waited on is cancelled"""
+        leader = asyncio.create_task(derivatives.get_derivative(media_file, 400, "jpg"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(derivatives.get_derivative(media_file, 400, "jpg"))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        path = await asyncio.wait_for(waiter, timeout=5)
+
+        assert leader.cancelled()
+        assert path.is_file()
+        assert derivatives.renders == 2
+        assert not derivatives._inflight
+
+    @pytest.mark.asyncio
+    async def test_invalid_requests(self, client: AsyncClient, media_file):
+        """Test unknown formats and missing media are rejected"""
+        assert (await client.get(url(media_file.id, 400, "gif"))).status_code == 400
+        assert (await client.get(url(media_file.id, 0, "jpg"))).status_code == 400
+        assert (await client.get(url(media_file.id + 1, 400, "jpg"))).status_code == 404
+
+
+class TestFormatNegotiation:
+    """Test Accept-driven format selection"""
+
+    def test_smallest_accepted_format_wins(self, monkeypatch):
+        """Test AVIF beats WebP beats JPEG when the client lists them"""
+        monkeypatch.setattr(media_derivative_service, "avif_supported", lambda: True)
+
+        assert negotiate_format("image/avif,image/webp,image/apng,*/*;q=0.8") == "avif"
+        assert negotiate_format("image/avif;q=0,image/webp") == "webp"
+        assert negotiate_format("image/webp,*/*") == "webp"
+        assert negotiate_format("*/*") == "jpg"
+        assert negotiate_format(None) == "jpg"
+
+    def test_avif_skipped_without_plugin(self, monkeypatch):
+        """Test AVIF is never negotiated or accepted when it cannot be encoded"""
+        monkeypatch.setattr(media_derivative_service, "avif_supported", lambda: False)
+
+        assert negotiate_format("image/avif,image/webp") == "webp"
+        assert "avif" not in media_derivative_service.supported_formats()
+
+    @pytest.mark.asyncio
+    async def test_negotiated_endpoint(self, client: AsyncClient, media_file, monkeypatch):
+        """Test the extension-less URL serves by Accept and varies on it"""
+        monkeypatch.setattr(media_derivative_service, "avif_supported", lambda: False)
+
+        webp = await client.get(
+            f"/api/v1/public/media/{media_file.id}/w/400",
+            headers={"Accept": "image/avif,image/webp,*/*"}
+        )
+        jpeg = await client.get(f"/api/v1/public/media/{media_file.id}/w/400", headers={"Accept": "*/*"})
+
+        assert webp.status_code == 200
+        assert webp.headers["content-type"] == "image/webp"
+        assert webp.headers["vary"] == "Accept"
+        assert jpeg.headers["content-type"] == "image/jpeg"
+        assert webp.headers["etag"] != jpeg.headers["etag"]
+
+        avif = await client.get(f"/api/v1/public/media/{media_file.id}/w/400.avif")
+        assert avif.status_code == 400
+
+
+class TestDerivativeCache:
+    """Test the size-capped LRU disk cache"""
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        """Test the cap is enforced and recently read entries survive"""
+        cache = DerivativeCache(str(tmp_path), max_bytes=250)
+        await cache.put("aa/one.jpg", b"1" * 100)
+        await cache.put("aa/two.jpg", b"2" * 100)
+        assert cache.get("aa/one.jpg") is not None  # one is now most recent
+
+        await cache.put("bb/three.jpg", b"3" * 100)
+
+        assert cache.get("aa/two.jpg") is None
+        assert not (tmp_path / "aa/two.jpg").exists()
+        assert cache.get("aa/one.jpg") is not None
+        assert cache.total_bytes == 200
+        assert cache.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_existing_files_are_loaded_on_start(self, tmp_path):
+        """Test a new cache instance picks up files from a previous run"""
+        await DerivativeCache(str(tmp_path), max_bytes=1000).put("aa/kept.webp", b"x" * 10)
+
+        cache = DerivativeCache(str(tmp_path), max_bytes=1000)
+        await cache.load()
+
+        assert cache.get("aa/kept.webp") == tmp_path / "aa/kept.webp"
+        assert cache.total_bytes == 10
+
+    @pytest.mark.asyncio
+    async def test_pinned_entries_are_not_evicted(self, tmp_path):
+        """Test a file being served stays on disk until it is unpinned"""
+        cache = DerivativeCache(str(tmp_path), max_bytes=150)
+        await cache.put("aa/served.jpg", b"1" * 100, pin=True)
+        await cache.put("aa/new.jpg", b"2" * 100)
+
+        assert (tmp_path / "aa/served.jpg").exists()
+        assert cache.evictions == 0
+
+        cache.unpin("aa/served.jpg")
+
+        assert not (tmp_path / "aa/served.jpg").exists()
+        assert cache.total_bytes == 100
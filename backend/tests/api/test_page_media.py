@@ -0,0 +1,54 @@
+"""
+Test cases for media references held by pages
+"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dependencies import require_editor
+from app.main import app
+from app.models.content import Page, MediaFile
+from app.models.user import AdminUser
+from app.services.image_processing_service import ImageProcessingService
+from app.services.media_store import ContentAddressedStore
+
+
+class TestPageMediaReferences:
+    """Test deleting a page gives back its media references"""
+
+    @pytest.mark.asyncio
+    async def test_delete_page_releases_media(
+        self, client: AsyncClient, test_session: AsyncSession, editor_user: AdminUser, tmp_path, monkeypatch
+    ):
+        """Test a deleted page's images are reclaimed unless another page uses them"""
+        monkeypatch.setitem(app.dependency_overrides, require_editor, lambda: editor_user)
+        images = ImageProcessingService(upload_dir=str(tmp_path / "images"))
+        monkeypatch.setattr("app.api.v1.content.pages.image_service", images)
+        file_path, _ = await images.store.put(b"image bytes", ".png")
+
+        media_file = MediaFile(
+            filename="team.png",
+            original_filename="team.png",
+            file_path=file_path,
+            file_size=11,
+            mime_type="image/png",
+            file_hash=ContentAddressedStore.hash_bytes(b"image bytes"),
+            reference_count=0
+        )
+        pages = [Page(slug=f"page-{i}", title={"en": "Page"}, content={"en": "<p>Text</p>"}) for i in range(2)]
+        test_session.add_all([media_file, *pages])
+        await test_session.commit()
+        for page in pages:
+            await images.link_media_file(test_session, media_file, "page", page.id)
+
+        first = await client.delete(f"/api/v1/{pages[0].id}")
+        await test_session.refresh(media_file)
+        assert first.status_code == 200
+        assert media_file.reference_count == 1
+        assert images.store.exists(file_path)
+
+        await client.delete(f"/api/v1/{pages[1].id}")
+        await test_session.refresh(media_file)
+        assert media_file.deleted_at is not None
+        assert not images.store.exists(file_path)
@@ -0,0 +1,125 @@
+"""
+Tests for cached, versioned translation bundles
+"""
+
+import json
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.translation import Translation
+from app.services.multilingual_content_service import MultilingualContentService
+from app.services.translation_bundle_cache import TranslationBundleCache
+
+
+@pytest.fixture
+def bundle_cache(monkeypatch) -> TranslationBundleCache:
+    cache = TranslationBundleCache(ttl_seconds=300)
+    monkeypatch.setattr("app.services.multilingual_content_service.translation_bundle_cache", cache)
+    return cache
+
+
+@pytest_asyncio.fixture
+async def translations(test_session: AsyncSession):
+    rows = [
+        ("nav", "home", "en", "Home", "approved"),
+        ("nav", "home", "de", "Startseite", "approved"),
+        ("nav", "contact", "en", "Contact", "translated"),
+        ("nav", "about", "de", "Über uns", "pending"),
+        ("nav", "about", "en", "About", "approved"),
+        ("footer", "imprint", "de", "Impressum", "approved"),
+    ]
+    for namespace, key, language, text, status in rows:
+        test_session.add(Translation(
+            namespace=namespace, key=key, source_text=key.title(),
+            target_language=language, translated_text=text, status=status
+        ))
+    await test_session.commit()
+
+
+BUNDLE_URL = "/api/v1/translations/public/translations/nav"
+
+
+class TestTranslationBundleCache:
+    """Test bundle building, caching and invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_bundle_merges_english_fallbacks(self, test_session: AsyncSession, bundle_cache, translations):
+        """Test untranslated and unapproved keys fall back to English"""
+        service = MultilingualContentService(test_session)
+
+        bundle = await service.get_translation_bundle("nav", "de")
+
+        assert bundle.translations == {"about": "About", "contact": "Contact", "home": "Startseite"}
+        assert json.loads(bundle.body)["data"]["translations"] == bundle.translations
+
+    @pytest.mark.asyncio
+    async def test_bundle_is_cached_until_a_write(self, test_session: AsyncSession, bundle_cache, translations):
+        """Test reads hit the cache and writes to the namespace rebuild it"""
+        service = MultilingualContentService(test_session)
+        first = await service.get_translation_bundle("nav", "de")
+        assert await service.get_translation_bundle("nav", "de") is first
+        footer = await service.get_translation_bundle("footer", "de")
+
+        await service.create_translation("nav", "blog", "Blog", "de", translated_text="Blog-Artikel")
+        updated = await service.get_translation_bundle("nav", "de")
+
+        assert updated.version > first.version
+        assert updated.etag != first.etag
+        assert updated.translations["blog"] == "Blog-Artikel"
+        assert await service.get_translation_bundle("footer", "de") is footer
+        assert bundle_cache.get_metrics()["builds"] == 3
+
+    @pytest.mark.asyncio
+    async def test_write_during_build_is_not_cached(self, bundle_cache):
+        """Test a bundle loaded across an invalidation is served once but not kept"""
+        async def loader():
+            bundle_cache.invalidate("nav")
+            return {"home": "Startseite"}
+
+        bundle = await bundle_cache.get("nav", "de", loader)
+
+        assert bundle.translations == {"home": "Startseite"}
+        assert bundle_cache.get_metrics()["bundles"] == 0
+
+    @pytest.mark.asyncio
+    async def test_export_writes_static_files(self, test_session: AsyncSession, bundle_cache, translations, tmp_path):
+        """Test every namespace and language is exported as JSON"""
+        service = MultilingualContentService(test_session)
+
+        paths = await service.export_translation_bundles(directory=str(tmp_path))
+
+        assert sorted(p.relative_to(tmp_path).as_posix() for p in paths) == [
+            "de/footer.json", "de/nav.json", "en/footer.json", "en/nav.json"
+        ]
+        assert json.loads((tmp_path / "de" / "nav.json").read_text(encoding="utf-8"))["home"] == "Startseite"
+        assert json.loads((tmp_path / "en" / "footer.json").read_text(encoding="utf-8")) == {}
+
+
+class TestPublicTranslationsEndpoint:
+    """Test ETag revalidation of the public bundle endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_etag_revalidation(self, client: AsyncClient, bundle_cache, translations):
+        """Test matching If-None-Match answers 304 without a body"""
+        response = await client.get(BUNDLE_URL, headers={"Accept-Language": "de"})
+
+        assert response.status_code == 200
+        assert response.json()["data"]["translations"]["home"] == "Startseite"
+        assert response.headers["cache-control"] == "no-cache"
+        etag = response.headers["etag"]
+
+        cached = await client.get(
+            BUNDLE_URL,
+            headers={"Accept-Language": "de", "If-None-Match": etag}
+        )
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+        english = await client.get(
+            BUNDLE_URL,
+            headers={"Accept-Language": "en", "If-None-Match": etag}
+        )
+        assert english.status_code == 200
+        assert english.json()["data"]["translations"]["home"] == "Home"
@@ -0,0 +1,88 @@
+"""
+Tests for the bulk translation import and export endpoints
+"""
+
+import json
+import pytest
+from httpx import AsyncClient
+
+from app.dependencies import get_current_active_user
+from app.main import app
+from app.models.user import AdminUser
+
+
+ADMIN_URL = "/api/v1/translations/admin/translations"
+
+
+@pytest.fixture
+def editor_client(client: AsyncClient, editor_user: AdminUser, monkeypatch) -> AsyncClient:
+    monkeypatch.setitem(app.dependency_overrides, get_current_active_user, lambda: editor_user)
+    return client
+
+
+class TestTranslationImportExportEndpoints:
+    """Test upload, format detection and streamed downloads"""
+
+    @pytest.mark.asyncio
+    async def test_admin_endpoints_need_credentials(self, client: AsyncClient):
+        """Test import, export, streamed batches and pre-translation are refused without a login"""
+        upload = await client.post(f"{ADMIN_URL}/import", files={"file": ("nav.csv", b"", "text/csv")})
+        export = await client.get(f"{ADMIN_URL}/export", params={"namespace": "nav", "language": "de"})
+        stream = await client.post(f"{ADMIN_URL}/batch-translate/stream", json={"texts": [{"text": "Home"}]})
+        pretranslate = await client.post(f"{ADMIN_URL}/pretranslate/page/1")
+
+        assert (upload.status_code, export.status_code, stream.status_code) == (403, 403, 403)
+        assert pretranslate.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_import_then_export(self, editor_client: AsyncClient):
+        """Test a CSV upload is readable back as JSON and XLIFF"""
+        upload = (
+            "namespace,key,target_language,source_text,translated_text\n"
+            "nav,home,de,Home,Startseite\n"
+            "nav,contact,de,Contact,Kontakt\n"
+        )
+        response = await editor_client.post(
+            f"{ADMIN_URL}/import",
+            files={"file": ("nav.csv", upload.encode(), "text/csv")}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["data"]["upserted"] == 2
+
+        exported = await editor_client.get(
+            f"{ADMIN_URL}/export", params={"namespace": "nav", "language": "de"}
+        )
+        assert exported.status_code == 200
+        assert exported.headers["content-disposition"] == 'attachment; filename="nav.de.json"'
+        assert json.loads(exported.text) == {"contact": "Kontakt", "home": "Startseite"}
+
+        xliff = await editor_client.get(
+            f"{ADMIN_URL}/export", params={"namespace": "nav", "language": "de", "format": "xliff"}
+        )
+        assert xliff.headers["content-type"] == "application/xliff+xml"
+        assert '<trans-unit id="home">' in xliff.text
+
+    @pytest.mark.asyncio
+    async def test_bad_requests(self, editor_client: AsyncClient):
+        """Test unknown formats, JSON without a target and broken files answer 4xx"""
+        unknown = await editor_client.post(
+            f"{ADMIN_URL}/import", files={"file": ("nav.txt", b"home=Home", "text/plain")}
+        )
+        json_without_target = await editor_client.post(
+            f"{ADMIN_URL}/import", files={"file": ("nav.json", b"{}", "application/json")}
+        )
+        broken = await editor_client.post(
+            f"{ADMIN_URL}/import",
+            data={"namespace": "nav", "target_language": "de"},
+            files={"file": ("nav.json", b"{broken", "application/json")}
+        )
+        bad_export = await editor_client.get(
+            f"{ADMIN_URL}/export", params={"namespace": "nav", "language": "de", "format": "po"}
+        )
+
+        assert unknown.status_code == 400
+        assert json_without_target.status_code == 400
+        assert broken.status_code == 400
+        assert "Invalid JSON" in broken.json()["detail"]
+        assert bad_export.status_code == 422
@@ -0,0 +1,119 @@
+"""
+Concurrency tests for webinar registration capacity enforcement
+
+Runs against the file-backed concurrent_client so parallel registrations
+really contend for the SQLite write lock.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select, func
+
+from app.models.business import Webinar, WebinarRegistration
+
+
+async def create_webinar(file_session_factory, max_participants=None) -> int:
+    async with file_session_factory() as session:
+        webinar = Webinar(
+            title={"en": "Capacity Webinar"},
+            slug=f"capacity-webinar-{max_participants}",
+            scheduled_at=datetime.utcnow() + timedelta(days=7),
+            max_participants=max_participants,
+            registration_enabled=True,
+            status="scheduled"
+        )
+        session.add(webinar)
+        await session.commit()
+        return webinar.id
+
+
+async def registration_totals(file_session_factory, webinar_id: int):
+    async with file_session_factory() as session:
+        counter = await session.scalar(
+            select(Webinar.registered_count).where(Webinar.id == webinar_id)
+        )
+        rows = await session.scalar(
+            select(func.count(WebinarRegistration.id)).where(
+                WebinarRegistration.webinar_id == webinar_id
+            )
+        )
+        return counter, rows
+
+
+def registration_payload(i: int) -> dict:
+    return {
+        "first_name": "Parallel",
+        "last_name": f"Registrant {i}",
+        "email": f"registrant{i}@example.com"
+    }
+
+
+class TestWebinarRegistrationConcurrency:
+    """Parallel registrations must never exceed capacity or duplicate"""
+
+    @pytest.mark.asyncio
+    async def test_parallel_registrations_do_not_overbook(self, concurrent_client, file_session_factory):
+        """Test 300 parallel registrations for 50 seats fill exactly 50"""
+        webinar_id = await create_webinar(file_session_factory, max_participants=50)
+
+        responses = await asyncio.gather(*[
+            concurrent_client.post(
+                f"/api/v1/webinars/{webinar_id}/register",
+                json=registration_payload(i)
+            )
+            for i in range(300)
+        ])
+
+        accepted = [r for r in responses if r.status_code == 200]
+        rejected = [r for r in responses if r.status_code == 400]
+        assert len(accepted) == 50
+        assert len(rejected) == 250
+        assert all(r.json()["detail"] == "Webinar is full" for r in rejected)
+        assert await registration_totals(file_session_factory, webinar_id) == (50, 50)
+
+    @pytest.mark.asyncio
+    async def test_parallel_duplicate_email_registers_once(self, concurrent_client, file_session_factory):
+        """Test the same email registered in parallel only succeeds once"""
+        webinar_id = await create_webinar(file_session_factory, max_participants=10)
+
+        responses = await asyncio.gather(*[
+            concurrent_client.post(
+                f"/api/v1/webinars/{webinar_id}/register",
+                json=registration_payload(0)
+            )
+            for _ in range(100)
+        ])
+
+        assert sum(r.status_code == 200 for r in responses) == 1
+        assert all(
+            r.json()["detail"] == "Already registered for this webinar"
+            for r in responses if r.status_code != 200
+        )
+        # Rolled-back duplicates must release their claimed seat
+        assert await registration_totals(file_session_factory, webinar_id) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_unlimited_webinar_counts_registrations(self, concurrent_client, file_session_factory):
+        """Test webinars without a cap still track registered_count"""
+        webinar_id = await create_webinar(file_session_factory)
+
+        responses = await asyncio.gather(*[
+            concurrent_client.post(
+                f"/api/v1/webinars/{webinar_id}/register",
+                json=registration_payload(i)
+            )
+            for i in range(100)
+        ])
+
+        assert all(r.status_code == 200 for r in responses)
+        assert await registration_totals(file_session_factory, webinar_id) == (100, 100)
+
+    @pytest.mark.asyncio
+    async def test_register_for_missing_webinar(self, concurrent_client):
+        """Test a missing webinar still reports 404"""
+        response = await concurrent_client.post(
+            "/api/v1/webinars/999999/register",
+            json=registration_payload(0)
+        )
+        assert response.status_code == 404
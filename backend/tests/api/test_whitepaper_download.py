@@ -0,0 +1,210 @@
+"""
+Test cases for whitepaper file delivery
+"""
+
+import hashlib
+import os
+import pytest
+import pytest_asyncio
+from pydantic import ValidationError
+from datetime import datetime, timedelta
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import Settings, settings
+from app.models.business import Whitepaper, WhitepaperDownload
+from app.models.content import MediaFile
+from app.utils.file_delivery import RangeNotSatisfiable, parse_range, range_start, resolve_upload_path
+
+PDF_BYTES = b"%PDF-1.4\n" + os.urandom(200_000) + b"\n%%EOF"
+
+
+@pytest.fixture
+def upload_root(tmp_path, monkeypatch):
+    root = tmp_path / "uploads"
+    (root / "whitepapers").mkdir(parents=True)
+    (root / "whitepapers" / "ai-guide.pdf").write_bytes(PDF_BYTES)
+    monkeypatch.setattr(settings, "upload_dir", str(root))
+    monkeypatch.setattr(settings, "file_delivery_mode", "direct")
+    return root
+
+
+@pytest_asyncio.fixture
+async def download_token(test_session: AsyncSession, upload_root) -> str:
+    media_file = MediaFile(
+        filename="ai-guide.pdf",
+        original_filename="AI Guide.pdf",
+        file_path="whitepapers/ai-guide.pdf",
+        file_size=len(PDF_BYTES),
+        mime_type="application/pdf",
+        file_hash=hashlib.sha256(PDF_BYTES).hexdigest()
+    )
+    test_session.add(media_file)
+    await test_session.flush()
+
+    whitepaper = Whitepaper(
+        title={"en": "AI Guide"},
+        slug="ai-guide",
+        file_id=media_file.id,
+        status="published"
+    )
+    test_session.add(whitepaper)
+    await test_session.flush()
+
+    download = WhitepaperDownload(
+        whitepaper_id=whitepaper.id,
+        first_name="Ada",
+        last_name="Lovelace",
+        email="ada@example.com",
+        email_validated=True,
+        download_token="token-123",
+        download_link_expires_at=datetime.utcnow() + timedelta(days=1),
+        download_count=0,
+        download_limit=3
+    )
+    test_session.add(download)
+    await test_session.commit()
+    return download.download_token
+
+
+def url(token: str) -> str:
+    return f"/api/v1/public/whitepapers/download/{token}"
+
+
+async def download_count(db: AsyncSession, token: str) -> int:
+    result = await db.execute(
+        select(WhitepaperDownload.download_count).where(WhitepaperDownload.download_token == token)
+    )
+    return result.scalar_one()
+
+
+class TestWhitepaperDownload:
+    """Test path resolution, Range support and proxy offload"""
+
+    @pytest.mark.asyncio
+    async def test_full_download(self, client: AsyncClient, download_token):
+        """Test the file is served from upload_dir with download headers"""
+        response = await client.get(url(download_token))
+
+        assert response.status_code == 200
+        assert response.content == PDF_BYTES
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-disposition"] == 'attachment; filename="ai-guide.pdf"'
+
+    @pytest.mark.asyncio
+    async def test_range_requests(self, client: AsyncClient, download_token, test_session: AsyncSession):
+        """Test partial content, and that resumes from an offset are not counted again"""
+        first = await client.get(url(download_token), headers={"Range": "bytes=0-99"})
+        resumed = await client.get(url(download_token), headers={"Range": "bytes=100-"})
+        tail = await client.get(url(download_token), headers={"Range": "bytes=-6"})
+
+        assert first.status_code == 206
+        assert first.content == PDF_BYTES[:100]
+        assert first.headers["content-range"] == f"bytes 0-99/{len(PDF_BYTES)}"
+        assert resumed.status_code == 206
+        assert resumed.content == PDF_BYTES[100:]
+        assert tail.content == PDF_BYTES[-6:]
+
+        unsatisfiable = await client.get(url(download_token), headers={"Range": f"bytes={len(PDF_BYTES)}-"})
+        assert unsatisfiable.status_code == 416
+        assert unsatisfiable.headers["content-range"] == f"bytes */{len(PDF_BYTES)}"
+
+        # The suffix range may cover the whole file, so it counts as a new download
+        assert await download_count(test_session, download_token) == 2
+
+    @pytest.mark.asyncio
+    async def test_range_requests_cannot_bypass_the_limit(self, client: AsyncClient, download_token, test_session: AsyncSession):
+        """Test a first Range request counts, and only recent downloads resume for free"""
+        first = await client.get(url(download_token), headers={"Range": "bytes=1-"})
+        assert first.status_code == 206
+        assert await download_count(test_session, download_token) == 1
+
+        await client.get(url(download_token))
+        await client.get(url(download_token))
+        assert await download_count(test_session, download_token) == 3
+
+        # The last permitted download can still be resumed
+        resumed = await client.get(url(download_token), headers={"Range": "bytes=1000-"})
+        assert resumed.status_code == 206
+        assert (await client.get(url(download_token))).status_code == 429
+        assert (await client.get(url(download_token), headers={"Range": "bytes=0-"})).status_code == 429
+        assert (await client.get(url(download_token), headers={"Range": "bytes=-999999999"})).status_code == 429
+
+        download = (await test_session.execute(
+            select(WhitepaperDownload).where(WhitepaperDownload.download_token == download_token)
+        )).scalar_one()
+        download.downloaded_at = datetime.utcnow() - timedelta(seconds=settings.download_resume_window_seconds + 1)
+        await test_session.commit()
+
+        late = await client.get(url(download_token), headers={"Range": "bytes=1000-"})
+        assert late.status_code == 429
+        assert await download_count(test_session, download_token) == 3
+
+    @pytest.mark.asyncio
+    async def test_x_accel_redirect_offload(self, client: AsyncClient, download_token, monkeypatch):
+        """Test nginx offload returns the internal location and no body"""
+        monkeypatch.setattr(settings, "file_delivery_mode", "x-accel-redirect")
+
+        response = await client.get(url(download_token))
+
+        assert response.status_code == 200
+        assert response.headers["x-accel-redirect"] == "/protected-uploads/whitepapers/ai-guide.pdf"
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content == b""
+
+    @pytest.mark.asyncio
+    async def test_x_sendfile_offload(self, client: AsyncClient, download_token, upload_root, monkeypatch):
+        """Test X-Sendfile carries the absolute resolved path"""
+        monkeypatch.setattr(settings, "file_delivery_mode", "x-sendfile")
+
+        response = await client.get(url(download_token))
+
+        assert response.headers["x-sendfile"] == str((upload_root / "whitepapers" / "ai-guide.pdf").resolve())
+
+    @pytest.mark.asyncio
+    async def test_missing_file_is_not_counted(self, client: AsyncClient, download_token, upload_root, test_session):
+        """Test a missing file is a 404 and does not use up the download limit"""
+        (upload_root / "whitepapers" / "ai-guide.pdf").unlink()
+
+        response = await client.get(url(download_token))
+
+        assert response.status_code == 404
+        assert await download_count(test_session, download_token) == 0
+
+
+class TestFileDeliveryHelpers:
+    """Test path confinement and Range parsing"""
+
+    def test_paths_stay_inside_upload_root(self, upload_root):
+        """Test traversal and absolute paths outside the root are rejected"""
+        assert resolve_upload_path("whitepapers/ai-guide.pdf") == (upload_root / "whitepapers" / "ai-guide.pdf").resolve()
+        assert resolve_upload_path("../uploads/whitepapers/ai-guide.pdf") is not None
+        assert resolve_upload_path("../../etc/passwd") is None
+        assert resolve_upload_path("/etc/passwd") is None
+        assert resolve_upload_path("whitepapers/missing.pdf") is None
+        assert resolve_upload_path(None) is None
+
+    def test_range_start(self):
+        """Test only explicit non-zero start offsets count as resumes"""
+        assert range_start("bytes=1000-") == 1000
+        assert range_start("bytes=0-") == 0
+        assert range_start("bytes=-100") == 0
+        assert range_start("items=5-") == 0
+        assert range_start(None) == 0
+
+    def test_parse_range(self):
+        """Test single byte ranges, suffixes and unsupported forms"""
+        assert parse_range("bytes=0-99", 1000) == (0, 99)
+        assert parse_range("bytes=900-", 1000) == (900, 999)
+        assert parse_range("bytes=-100", 1000) == (900, 999)
+        assert parse_range("bytes=990-2000", 1000) == (990, 999)
+        assert parse_range("bytes=0-1,5-9", 1000) is None
+        assert parse_range(None, 1000) is None
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=1000-", 1000)
+
+    def test_unknown_delivery_mode_fails_at_startup(self):
+        """Test a misspelt file_delivery_mode is rejected when settings load"""
+        with pytest.raises(ValidationError, match="file_delivery_mode"):
+            Settings(file_delivery_mode="x-accel")
@@ -8,13 +8,16 @@ import pytest_asyncio
 from typing import AsyncGenerator, Generator
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import StaticPool, NullPool
 
 from app.main import app
+from app.config import settings
 from app.database import get_db, Base
 from app.models.user import AdminUser
 from app.core.security import get_password_hash
 from app.core.permissions import UserRole
+from app.services.email_service import SMTPEmailService
+from tests.smtp_sink import LocalSMTPSink
 
 
 # Test database URL - in-memory SQLite for fast tests
@@ -74,6 +77,47 @@ async def client(test_session: AsyncSession) -> AsyncGenerator[AsyncClient, None
     app.dependency_overrides.clear()
 
 
+@pytest_asyncio.fixture(scope="function")
+async def file_session_factory(tmp_path):
+    """
+    Session factory over a file-backed SQLite database
+
+    Every session opens its own connection, so concurrent requests really
+    contend for the write lock (unlike the shared in-memory connection).
+    """
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'concurrency.db'}",
+        connect_args={
+            "check_same_thread": False,
+            "timeout": 30,
+        },
+        poolclass=NullPool,
+    )
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def concurrent_client(file_session_factory) -> AsyncGenerator[AsyncClient, None]:
+    """Test client where every request gets its own session and connection"""
+
+    async def override_get_db():
+        async with file_session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    async with AsyncClient(app=app, base_url="http://testserver") as client:
+        yield client
+
+    app.dependency_overrides.clear()
+
+
 # User fixtures
 @pytest_asyncio.fixture
 async def super_admin_user(test_session: AsyncSession) -> AdminUser:
@@ -202,6 +246,27 @@ async def auth_headers_viewer(viewer_token: str) -> dict:
     return {"Authorization": f"Bearer {viewer_token}"}
 
 
+# Email fixtures
+@pytest.fixture
+def smtp_sink(monkeypatch) -> Generator[LocalSMTPSink, None, None]:
+    """Local SMTP server capturing outgoing mail instead of Brevo"""
+    sink = LocalSMTPSink().start()
+    monkeypatch.setattr(settings, "smtp_host", sink.host)
+    monkeypatch.setattr(settings, "smtp_port", sink.port)
+    monkeypatch.setattr(settings, "smtp_username", "sink")
+    monkeypatch.setattr(settings, "smtp_password", "sink")
+    monkeypatch.setattr(settings, "smtp_use_tls", False)
+    monkeypatch.setattr(settings, "smtp_use_starttls", False)
+    yield sink
+    sink.stop()
+
+
+@pytest.fixture
+def sink_email_service(smtp_sink: LocalSMTPSink) -> SMTPEmailService:
+    """Email service wired to the local SMTP sink"""
+    return SMTPEmailService()
+
+
 # Data factories
 class UserFactory:
     """Factory for creating test users"""
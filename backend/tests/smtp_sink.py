@@ -0,0 +1,125 @@
+"""
+Local SMTP sink for exercising the email path without Brevo
+
+Wraps an aiosmtpd controller that accepts any credentials over plain SMTP
+and keeps every delivered message in memory. Used by the pytest fixtures in
+conftest.py and by scripts/benchmark_email.py.
+"""
+
+import socket
+import threading
+from dataclasses import dataclass, field
+from email import message_from_bytes
+from email.message import Message
+from typing import List, Optional
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+
+@dataclass
+class ReceivedMessage:
+    """A message accepted by the sink"""
+    mail_from: str
+    rcpt_tos: List[str]
+    data: bytes
+
+    @property
+    def message(self) -> Message:
+        return message_from_bytes(self.data)
+
+
+@dataclass
+class _SinkHandler:
+    """aiosmtpd handler storing (or just counting) accepted messages"""
+    keep_messages: bool = True
+    messages: List[ReceivedMessage] = field(default_factory=list)
+    message_count: int = 0
+    recipient_count: int = 0
+    bytes_received: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            self.message_count += 1
+            self.recipient_count += len(envelope.rcpt_tos)
+            self.bytes_received += len(envelope.content)
+            if self.keep_messages:
+                self.messages.append(ReceivedMessage(
+                    mail_from=envelope.mail_from,
+                    rcpt_tos=list(envelope.rcpt_tos),
+                    data=envelope.content
+                ))
+        return "250 Message accepted for delivery"
+
+
+def _accept_any_credentials(server, session, envelope, mechanism, auth_data) -> AuthResult:
+    return AuthResult(success=True)
+
+
+def find_free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class LocalSMTPSink:
+    """
+    In-process SMTP server listening on localhost
+
+    Set keep_messages=False for load tests so memory measurements reflect the
+    client side only.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: Optional[int] = None, keep_messages: bool = True):
+        self.host = host
+        self.port = port or find_free_port(host)
+        self.handler = _SinkHandler(keep_messages=keep_messages)
+        self._controller = Controller(
+            self.handler,
+            hostname=self.host,
+            port=self.port,
+            authenticator=_accept_any_credentials,
+            auth_require_tls=False,
+        )
+
+    def start(self) -> "LocalSMTPSink":
+        self._controller.start()
+        return self
+
+    def stop(self) -> None:
+        self._controller.stop()
+
+    def __enter__(self) -> "LocalSMTPSink":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def messages(self) -> List[ReceivedMessage]:
+        return self.handler.messages
+
+    @property
+    def message_count(self) -> int:
+        return self.handler.message_count
+
+    @property
+    def recipient_count(self) -> int:
+        return self.handler.recipient_count
+
+    def reset(self) -> None:
+        with self.handler._lock:
+            self.handler.messages.clear()
+            self.handler.message_count = 0
+            self.handler.recipient_count = 0
+            self.handler.bytes_received = 0
+
+    def configure_service(self, service) -> None:
+        """Point an SMTPEmailService instance at this sink"""
+        service.smtp_host = self.host
+        service.smtp_port = self.port
+        service.smtp_username = "sink"
+        service.smtp_password = "sink"
+        service.smtp_use_tls = False
+        service.smtp_use_starttls = False
@@ -0,0 +1,265 @@
+"""
+Unit tests for concurrent batch translation against a fake OpenAI server
+"""
+
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from openai import AsyncOpenAI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.ai_rate_limiter import AIRateLimiter, TokenBucket
+from app.services.ai_translation_service import AITranslationService
+from app.services.translation_memory_index import TranslationMemoryIndex
+
+
+class FakeOpenAI:
+    """Chat completions endpoint that "translates" by prefixing DE:"""
+
+    def __init__(self, rate_limited_requests: int = 0, delays: dict = None, drop_segments: set = None):
+        self.rate_limited_requests = rate_limited_requests
+        self.delays = delays or {}
+        self.drop_segments = drop_segments or set()
+        self.texts = []
+        self.packs = []
+        self.responses_429 = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = FastAPI()
+        self.app.post("/v1/chat/completions")(self.chat_completions)
+
+    async def chat_completions(self, request: Request):
+        body = await request.json()
+        if self.responses_429 < self.rate_limited_requests:
+            self.responses_429 += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": "0.05"}
+            )
+
+        user_prompt = body["messages"][1]["content"]
+        if user_prompt.startswith("{"):
+            return self.packed_completion(body, json.loads(user_prompt)["segments"])
+
+        text = user_prompt.split("\n\n", 1)[1].split("\n\nContext:")[0]
+        self.texts.append(text)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(text, 0.02))
+        finally:
+            self.in_flight -= 1
+
+        return self.completion(body, f"DE: {text}")
+
+    def packed_completion(self, body: dict, segments: list) -> dict:
+        self.packs.append([segment["text"] for segment in segments])
+        translations = [
+            {"id": segment["id"], "text": f"DE: {segment['text']}"}
+            for segment in segments if segment["text"] not in self.drop_segments
+        ]
+        return self.completion(body, "```json\n" + json.dumps({"translations": translations}) + "\n```")
+
+    def completion(self, body: dict, content: str) -> dict:
+        return {
+            "id": f"chatcmpl-{len(self.texts) + len(self.packs)}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 200, "completion_tokens": 10, "total_tokens": 210}
+        }
+
+    def client(self) -> AsyncOpenAI:
+        return AsyncOpenAI(
+            api_key="test-key",
+            base_url="http://fake-openai/v1",
+            max_retries=0,
+            http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app))
+        )
+
+
+def make_service(db: AsyncSession, fake: FakeOpenAI, **limits) -> AITranslationService:
+    return AITranslationService(
+        db,
+        tm_index=TranslationMemoryIndex(),
+        client=fake.client(),
+        rate_limiter=AIRateLimiter(**{"requests_per_minute": 60000, "tokens_per_minute": 10_000_000, **limits})
+    )
+
+
+class TestBatchTranslation:
+    """Test dedup, TM-first resolution, bounded concurrency and 429 handling"""
+
+    @pytest.mark.asyncio
+    async def test_duplicates_and_memory_hits_skip_the_api(self, test_session: AsyncSession):
+        """Test identical inputs are sent once and TM hits never reach the API"""
+        fake = FakeOpenAI()
+        service = make_service(test_session, fake)
+        await service.store_translation_memory("Contact us", "Kontaktieren Sie uns", "en", "de", quality_score=0.9)
+
+        results = await service.batch_translate(
+            [
+                {"id": "a", "text": "Hello"},
+                {"id": "b", "text": "Contact us"},
+                {"id": "c", "text": "Hello"},
+                {"id": "d", "text": "World"},
+            ],
+            "en", "de",
+            packing=False
+        )
+
+        assert [r["id"] for r in results] == ["a", "b", "c", "d"]
+        assert all(r["success"] for r in results)
+        assert results[0]["translated_text"] == results[2]["translated_text"] == "DE: Hello"
+        assert results[1]["method"] == "translation_memory"
+        assert sorted(fake.texts) == ["Hello", "World"]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, test_session: AsyncSession, monkeypatch):
+        """Test requests overlap but never exceed translation_max_concurrency"""
+        monkeypatch.setattr(settings, "translation_max_concurrency", 4)
+        fake = FakeOpenAI()
+        service = make_service(test_session, fake)
+
+        results = await service.batch_translate(
+            [{"id": str(i), "text": f"Sentence number {i}"} for i in range(20)], "en", "de", packing=False
+        )
+
+        assert len(results) == 20
+        assert all(r["success"] for r in results)
+        assert 1 < fake.max_in_flight <= 4
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_requests_are_retried(self, test_session: AsyncSession):
+        """Test 429 responses pause the limiter and are retried after Retry-After"""
+        fake = FakeOpenAI(rate_limited_requests=3)
+        service = make_service(test_session, fake)
+
+        results = await service.batch_translate(
+            [{"id": str(i), "text": f"Item {i}"} for i in range(5)], "en", "de", packing=False
+        )
+
+        assert all(r["success"] for r in results)
+        assert fake.responses_429 == 3
+        assert service.rate_limiter.get_metrics()["rate_limited"] == 3
+        assert len(fake.texts) == 5
+
+    @pytest.mark.asyncio
+    async def test_results_stream_as_they_complete(self, test_session: AsyncSession):
+        """Test fast items are yielded before a slow one finishes"""
+        fake = FakeOpenAI(delays={"Slow paragraph": 0.5})
+        service = make_service(test_session, fake)
+
+        order = []
+        async for result in service.iter_batch_translate(
+            [{"id": "slow", "text": "Slow paragraph"}, {"id": "fast", "text": "Quick"}], "en", "de", packing=False
+        ):
+            order.append(result["id"])
+
+        assert order == ["fast", "slow"]
+
+    @pytest.mark.asyncio
+    async def test_token_budget_throttles_requests(self, test_session: AsyncSession):
+        """Test the TPM bucket spaces out requests once its burst is spent"""
+        fake = FakeOpenAI()
+        # About 700 estimated tokens per request, refilled at 100k/min
+        service = make_service(test_session, fake, tokens_per_minute=100_000)
+        service.rate_limiter.tokens.level = 0
+
+        started = time.perf_counter()
+        await service.batch_translate(
+            [{"id": str(i), "text": f"Line {i}"} for i in range(3)], "en", "de", packing=False
+        )
+
+        assert time.perf_counter() - started > 0.5
+        assert service.rate_limiter.get_metrics()["throttled"] >= 1
+
+
+class TestPackedTranslation:
+    """Test many short segments per request with per-item fallback"""
+
+    @pytest.mark.asyncio
+    async def test_namespace_is_translated_in_few_requests(self, test_session: AsyncSession, monkeypatch):
+        """Test short UI strings are packed up to translation_pack_max_segments"""
+        monkeypatch.setattr(settings, "translation_pack_max_segments", 25)
+        fake = FakeOpenAI()
+        service = make_service(test_session, fake)
+        items = [{"id": f"nav.item{i}", "text": f"Menu entry {i}"} for i in range(60)]
+
+        results = await service.batch_translate(items, "en", "de")
+
+        assert [len(pack) for pack in fake.packs] == [25, 25, 10]
+        assert fake.texts == []
+        assert all(r["success"] and r["method"] == "ai_translation_packed" for r in results)
+        assert results[42]["translated_text"] == "DE: Menu entry 42"
+        assert results[42]["id"] == "nav.item42"
+
+    @pytest.mark.asyncio
+    async def test_misaligned_segments_fall_back_to_single_calls(self, test_session: AsyncSession):
+        """Test segments missing from the packed answer are retried one by one"""
+        fake = FakeOpenAI(drop_segments={"Sign up"})
+        service = make_service(test_session, fake)
+
+        results = await service.batch_translate(
+            [{"id": "1", "text": "Log in"}, {"id": "2", "text": "Sign up"}, {"id": "3", "text": "Log out"}],
+            "en", "de"
+        )
+
+        assert fake.packs == [["Log in", "Sign up", "Log out"]]
+        assert fake.texts == ["Sign up"]
+        assert [r["translated_text"] for r in results] == ["DE: Log in", "DE: Sign up", "DE: Log out"]
+        assert results[1]["method"] == "ai_translation"
+
+    def test_plan_packs_groups_by_context_and_size(self, monkeypatch):
+        """Test long texts and lone segments are not packed"""
+        monkeypatch.setattr(settings, "translation_pack_segment_max_chars", 50)
+        keys = [
+            ("Save", None, "business"),
+            ("Cancel", None, "business"),
+            ("x" * 80, None, "business"),
+            ("Buy now", "checkout", "business"),
+        ]
+
+        packs, singles = AITranslationService.plan_packs(keys)
+
+        assert packs == [[keys[0], keys[1]]]
+        assert singles == [keys[2], keys[3]]
+
+    def test_parse_packed_response_keeps_aligned_entries(self):
+        """Test malformed, duplicate and out-of-range ids are dropped"""
+        content = json.dumps({"translations": [
+            {"id": "0", "text": "Eins"},
+            {"id": "0", "text": "Doppelt"},
+            {"id": "7", "text": "Fremd"},
+            {"id": "2", "text": ""},
+            {"text": "Ohne ID"},
+        ]})
+
+        assert AITranslationService.parse_packed_response(content, 3) == {0: "Eins"}
+        assert AITranslationService.parse_packed_response("not json", 3) == {}
+
+
+class TestTokenBucket:
+    """Test the async token bucket"""
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_refill(self):
+        """Test acquisitions beyond the burst wait for the refill rate"""
+        bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10 tokens/s
+
+        started = time.perf_counter()
+        for _ in range(5):
+            await bucket.acquire(1)
+
+        assert time.perf_counter() - started >= 0.25
@@ -0,0 +1,196 @@
+"""
+Unit tests for the pending-payment booking expiry sweeper
+"""
+
+import pytest
+import pytest_asyncio
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.business import ConsultationBooking, ConsultationBookingStatus
+from app.models.consultant import Consultant, ConsultantStatus
+from app.services.booking_expiry_service import BookingExpirySweeper
+from app.services.consultation_booking_service import ConsultationBookingService, availability_cache
+
+
+@pytest_asyncio.fixture
+async def consultant(test_session: AsyncSession) -> Consultant:
+    consultant = Consultant(
+        id=str(uuid.uuid4()),
+        linkedin_url="https://www.linkedin.com/in/sweeper-test",
+        email="sweeper@example.com",
+        first_name="Sweeper",
+        last_name="Test",
+        status=ConsultantStatus.ACTIVE,
+        is_verified=True
+    )
+    test_session.add(consultant)
+    await test_session.commit()
+    return consultant
+
+
+async def add_booking(
+    session: AsyncSession,
+    consultant_id: str,
+    day_offset: int,
+    age_minutes: int,
+    booking_status=ConsultationBookingStatus.PENDING_PAYMENT
+) -> str:
+    booking_id = str(uuid.uuid4())
+    consultation_date = datetime.utcnow().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=day_offset)
+    session.add(ConsultationBooking(
+        id=booking_id,
+        consultant_id=consultant_id,
+        first_name="Pending",
+        last_name="Payer",
+        email="pending@example.com",
+        phone="+49 30 1234567",
+        consultation_date=consultation_date,
+        time_slot="10:00",
+        booking_status=booking_status,
+        created_at=datetime.utcnow() - timedelta(minutes=age_minutes)
+    ))
+    await session.commit()
+    return booking_id
+
+
+async def statuses(session: AsyncSession) -> dict:
+    result = await session.execute(select(ConsultationBooking.id, ConsultationBooking.booking_status))
+    return dict(result.all())
+
+
+def make_sweeper(batch_size: int = 2) -> BookingExpirySweeper:
+    return BookingExpirySweeper(session_factory=None, ttl_minutes=30, interval_seconds=60, batch_size=batch_size)
+
+
+class TestBookingExpirySweeper:
+    """Test stale pending bookings are expired in batches"""
+
+    @pytest.mark.asyncio
+    async def test_expires_only_stale_pending_bookings(self, test_session: AsyncSession, consultant: Consultant):
+        """Test stale unpaid bookings expire while fresh and paid ones stay"""
+        stale_ids = [
+            await add_booking(test_session, consultant.id, day_offset=i + 1, age_minutes=60 + i)
+            for i in range(5)
+        ]
+        fresh_id = await add_booking(test_session, consultant.id, day_offset=10, age_minutes=5)
+        confirmed_id = await add_booking(
+            test_session, consultant.id, day_offset=11, age_minutes=600,
+            booking_status=ConsultationBookingStatus.CONFIRMED
+        )
+
+        sweeper = make_sweeper(batch_size=2)
+        metrics = await sweeper.run_once(test_session)
+
+        current = await statuses(test_session)
+        assert all(current[booking_id] == ConsultationBookingStatus.EXPIRED for booking_id in stale_ids)
+        assert current[fresh_id] == ConsultationBookingStatus.PENDING_PAYMENT
+        assert current[confirmed_id] == ConsultationBookingStatus.CONFIRMED
+        assert metrics["last_expired"] == 5
+        assert metrics["last_batches"] == 3
+        assert metrics["expired_total"] == 5
+        assert metrics["runs"] == 1
+        assert metrics["last_error"] is None
+
+    @pytest.mark.asyncio
+    async def test_short_batch_does_not_end_the_sweep(self, test_session: AsyncSession, consultant: Consultant):
+        """Test the sweep goes on until no candidates are left, not until a batch comes up short"""
+        stale_ids = [
+            await add_booking(test_session, consultant.id, day_offset=i + 1, age_minutes=60 + i)
+            for i in range(5)
+        ]
+        sweeper = make_sweeper(batch_size=2)
+        expire_batch = sweeper.expire_batch
+        batches = []
+
+        async def first_batch_loses_a_race(db, cutoff):
+            found, count = await expire_batch(db, cutoff)
+            batches.append(found)
+            return found, count - 1 if len(batches) == 1 else count
+
+        sweeper.expire_batch = first_batch_loses_a_race
+        await sweeper.run_once(test_session)
+
+        current = await statuses(test_session)
+        assert all(current[booking_id] == ConsultationBookingStatus.EXPIRED for booking_id in stale_ids)
+        assert batches == [2, 2, 1, 0]
+
+    @pytest.mark.asyncio
+    async def test_second_run_is_a_no_op(self, test_session: AsyncSession, consultant: Consultant):
+        """Test already expired bookings are not touched again"""
+        await add_booking(test_session, consultant.id, day_offset=1, age_minutes=60)
+
+        sweeper = make_sweeper()
+        await sweeper.run_once(test_session)
+        metrics = await sweeper.run_once(test_session)
+
+        assert metrics["last_expired"] == 0
+        assert metrics["expired_total"] == 1
+        assert metrics["runs"] == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_booking_frees_slot(self, test_session: AsyncSession, consultant: Consultant):
+        """Test the slot of an expired booking can be booked and shows as available"""
+        await add_booking(test_session, consultant.id, day_offset=2, age_minutes=60)
+        service = ConsultationBookingService(test_session)
+        day = (datetime.utcnow() + timedelta(days=2)).date()
+
+        availability_cache.clear()
+        calendar = await service.get_availability_calendar(day, day, [consultant.id])
+        assert calendar[consultant.id][day] == ["14:00"]
+
+        await make_sweeper().run_once(test_session)
+
+        calendar = await service.get_availability_calendar(day, day, [consultant.id])
+        assert calendar[consultant.id][day] == ["10:00", "14:00"]
+
+        result = await service.create_booking(
+            consultant_id=consultant.id,
+            consultation_date=datetime.combine(day, datetime.min.time()).replace(hour=10),
+            time_slot="10:00",
+            contact_info={
+                "first_name": "Next",
+                "last_name": "Booker",
+                "email": "next@example.com",
+                "phone": "+49 30 7654321"
+            },
+            terms_accepted=True
+        )
+        assert result["success"] is True
+        availability_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_expired_booking_cannot_be_paid(self, test_session: AsyncSession, consultant: Consultant):
+        """Test payment is refused once a booking has expired"""
+        booking_id = await add_booking(test_session, consultant.id, day_offset=3, age_minutes=60)
+        await make_sweeper().run_once(test_session)
+
+        result = await ConsultationBookingService(test_session).process_payment(
+            booking_id, {"payment_method": "stripe"}
+        )
+
+        assert result["success"] is False
+        assert "expired" in result["error"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("booking_status, error", [
+        (ConsultationBookingStatus.CONFIRMED, "already been paid"),
+        (ConsultationBookingStatus.CANCELLED, "cancelled"),
+        (ConsultationBookingStatus.NO_SHOW, "already taken place"),
+    ])
+    async def test_only_pending_bookings_can_be_paid(
+        self, test_session: AsyncSession, consultant: Consultant, booking_status, error
+    ):
+        """Test payment is refused for every status other than pending_payment"""
+        booking_id = await add_booking(test_session, consultant.id, day_offset=3, age_minutes=5, booking_status=booking_status)
+
+        result = await ConsultationBookingService(test_session).process_payment(
+            booking_id, {"payment_method": "stripe"}
+        )
+
+        current = await statuses(test_session)
+        assert result["success"] is False
+        assert error in result["error"]
+        assert current[booking_id] == booking_status
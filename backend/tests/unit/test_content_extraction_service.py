@@ -0,0 +1,162 @@
+"""
+Unit tests for ContentExtractionService parsing and structure analysis
+"""
+
+import asyncio
+import pytest
+from bs4 import BeautifulSoup
+
+from app.config import settings
+from app.services import content_extraction_service as extraction_module
+from app.services.content_extraction_service import ContentExtractionService, resolve_parser
+from tests.unit.test_image_processing_service import HeldExecutor
+
+
+ARTICLE = """
+<html><head><title>Doc</title></head><body>
+  <nav><a href="/">Home</a></nav>
+  <main>
+    <div class="hero"><img src="/hero.jpg" alt="Hero"></div>
+    <h2>Second level first</h2>
+    <h1>Top heading</h1>
+    <!-- editorial note -->
+    <section class="content-section">
+      <h2>Another second level</h2>
+      <p>One <a href="/a">link</a>.</p>
+      <ul><li>Item</li></ul>
+    </section>
+    <div class="text-block"><p>Two</p><ol><li>Step</li></ol></div>
+    <div class="plain"><p>Three</p></div>
+    <button class="btn-primary">Sign up now</button>
+  </main>
+  <footer><a href="/imprint">Imprint</a></footer>
+</body></html>
+"""
+
+
+@pytest.fixture(params=["html.parser", "lxml"])
+def service(request):
+    return ContentExtractionService(parser=request.param)
+
+
+class TestStructureAnalysis:
+    """Test the single-walk structure analyzer"""
+
+    def test_collects_all_features_in_one_walk(self, service):
+        """Test headings, counts, CTAs, sections and hero detection"""
+        soup = BeautifulSoup(ARTICLE, service.parser)
+        service._clean_soup(soup)
+        main = soup.find("main")
+
+        analysis = service._analyze_structure(main)
+
+        assert analysis["headings"] == [
+            {"level": 1, "text": "Top heading"},
+            {"level": 2, "text": "Second level first"},
+            {"level": 2, "text": "Another second level"},
+        ]
+        assert analysis["paragraphs"] == 3
+        assert analysis["lists"] == 2
+        assert analysis["images"] == 1
+        assert analysis["links"] == 1
+        assert analysis["sections"] == 2
+        assert analysis["has_cta_elements"] is True
+        assert analysis["has_hero_potential"] is True
+
+    def test_empty_content(self, service):
+        """Test a missing content element yields an empty analysis"""
+        assert service._analyze_structure(None) == {}
+
+    def test_extract_keeps_text_and_drops_chrome(self, service):
+        """Test extraction removes navigation and comments but not content text"""
+        extracted = service.extract_from_html(ARTICLE, "https://old.example.com/doc")
+
+        assert "Top heading" in extracted.content_text
+        assert "editorial note" not in extracted.content_html
+        assert "Imprint" not in extracted.content_html
+        assert "https://old.example.com/imprint" in extracted.links
+
+
+    def test_clean_soup_removes_only_comments(self, service):
+        """Test comments are stripped while every text node survives"""
+        soup = BeautifulSoup(
+            "<div><p>Keep <b>this</b> text</p><!-- drop --> tail<!--[if IE]>old<![endif]--></div>",
+            service.parser
+        )
+
+        service._clean_soup(soup)
+
+        assert soup.div.get_text() == "Keep this text tail"
+        assert "drop" not in str(soup)
+        assert "[if IE]" not in str(soup)
+
+
+class TestParserSelection:
+    """Test the configurable parser backend"""
+
+    def test_unknown_parser_falls_back(self):
+        """Test a missing tree builder falls back to html.parser"""
+        assert resolve_parser("not-a-parser") == "html.parser"
+        assert resolve_parser("html.parser") == "html.parser"
+
+    def test_default_parser_comes_from_settings(self, monkeypatch):
+        """Test content_parser selects the backend"""
+        monkeypatch.setattr(extraction_module.settings, "content_parser", "html.parser")
+        assert ContentExtractionService().parser == "html.parser"
+
+
+def large_page(sections: int = 1500) -> str:
+    body = "".join(
+        f"<section class='content-section'><h2>Section {i}</h2><p>Text {i} <a href='/r/{i}'>ref</a></p>"
+        f"<img src='/img/{i}.jpg' alt='Figure {i}'></section>"
+        for i in range(sections)
+    )
+    return f"<html><head><title>Big</title></head><body><main>{body}</main></body></html>"
+
+
+@pytest.fixture
+def pooled_service(monkeypatch):
+    monkeypatch.setattr(settings, "content_extraction_workers", 1)
+    service = ContentExtractionService(parser="lxml")
+    yield service
+    service.shutdown()
+
+
+class TestOffLoopExtraction:
+    """Test parse+analyze is dispatched to the worker pool"""
+
+    @pytest.mark.asyncio
+    async def test_pool_result_matches_inline(self, pooled_service):
+        """Test the worker returns the same dataclass as the inline path"""
+        pooled = await pooled_service.extract_from_html_async(ARTICLE, "https://old.example.com/doc")
+
+        assert pooled_service._executor is not None
+        assert pooled == pooled_service.extract_from_html(ARTICLE, "https://old.example.com/doc")
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, pooled_service):
+        """Test large pages are analyzed in the executor while other coroutines keep running"""
+        executor = HeldExecutor()
+        pooled_service._executor = executor
+        extraction = asyncio.ensure_future(
+            pooled_service.extract_from_html_async(large_page(), "https://old.example.com/big")
+        )
+
+        # The page is handed to the pool and the loop is free while it is pending
+        await asyncio.sleep(0.01)
+        assert [fn for _, fn, _ in executor.jobs] == [extraction_module.extract_html]
+        assert not extraction.done()
+
+        executor.release()
+        assert len((await extraction).images) == 1500
+
+    @pytest.mark.asyncio
+    async def test_thread_fallback_without_workers(self, monkeypatch):
+        """Test content_extraction_workers=0 still runs off-loop in a thread"""
+        monkeypatch.setattr(settings, "content_extraction_workers", 0)
+        service = ContentExtractionService()
+
+        extracted = await service.extract_from_html_async(ARTICLE, "https://old.example.com/doc")
+
+        assert service._executor is None
+        assert extracted.title == "Top heading"
@@ -0,0 +1,172 @@
+"""
+Unit tests for incremental machine pre-translation of pages
+"""
+
+import asyncio
+import copy
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.content import Page
+from app.models.translation import MultilingualContent
+from app.services.content_pretranslation_service import (
+    ContentPretranslationService, extract_segments, CONTENT_FIELDS, STATE_FIELD
+)
+from tests.unit.test_batch_translation import FakeOpenAI, make_service
+
+
+BLOCKS = [
+    {"block_type": "hero", "block_key": "hero", "title": "Cloud consulting", "primary_action": {"text": "Contact us", "href": "/contact"}},
+    {"block_type": "features", "items": [{"title": "Secure", "description": "Data stays in the EU", "icon": "shield"}]},
+    {"block_type": "richtext", "children": [{"span_type": "span", "text": "We build platforms.", "marks": ["strong"]}]},
+]
+
+
+@pytest.fixture
+def fake() -> FakeOpenAI:
+    return FakeOpenAI()
+
+
+@pytest.fixture
+def service(test_engine, fake) -> ContentPretranslationService:
+    return ContentPretranslationService(
+        session_factory=async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False),
+        translator_factory=lambda db: make_service(db, fake),
+        target_languages=["de"]
+    )
+
+
+@pytest_asyncio.fixture
+async def page(test_session: AsyncSession) -> Page:
+    page = Page(
+        slug="services",
+        title={"en": "Our services"},
+        content={"en": "<p>We help companies move to the cloud.</p>"},
+        meta_description={"en": "Cloud services for SMEs", "de": "Cloud-Dienste für KMU"},
+        content_blocks={"en": copy.deepcopy(BLOCKS)},
+        content_format="blocks"
+    )
+    test_session.add(page)
+    await test_session.commit()
+    return page
+
+
+def translated(fake: FakeOpenAI) -> list:
+    return sorted(fake.texts + [text for pack in fake.packs for text in pack])
+
+
+async def save(db: AsyncSession, page: Page, **changes) -> dict:
+    before = ContentPretranslationService.snapshot("page", page)
+    for name, value in changes.items():
+        setattr(page, name, value)
+    await db.commit()
+    return before
+
+
+class TestContentPretranslation:
+    """Test segment diffing, drafts and write-back"""
+
+    @pytest.mark.asyncio
+    async def test_new_page_gets_german_drafts(self, test_session: AsyncSession, service, fake, page):
+        """Test missing fields and blocks are translated; human German is kept"""
+        [result] = await service.pretranslate("page", page.id)
+        await test_session.refresh(page)
+
+        assert result.planned == result.written == 7
+        assert page.title["de"] == "DE: Our services"
+        assert page.meta_description["de"] == "Cloud-Dienste für KMU"
+        de_blocks = page.content_blocks["de"]
+        assert de_blocks[0]["title"] == "DE: Cloud consulting"
+        assert de_blocks[0]["primary_action"] == {"text": "DE: Contact us", "href": "/contact"}
+        assert de_blocks[1]["items"][0] == {"title": "DE: Secure", "description": "DE: Data stays in the EU", "icon": "shield"}
+        assert de_blocks[2]["children"][0]["marks"] == ["strong"]
+        assert page.content_blocks["en"] == BLOCKS
+
+        state = (await test_session.execute(
+            select(MultilingualContent).where(MultilingualContent.field_name == STATE_FIELD)
+        )).scalar_one()
+        assert state.is_active is False
+        assert "content_blocks/hero/primary_action/text" in state.json_content
+
+    @pytest.mark.asyncio
+    async def test_editing_one_paragraph_retranslates_only_it(self, test_session: AsyncSession, service, fake, page):
+        """Test an unchanged page costs nothing and one edited leaf one segment"""
+        await service.pretranslate("page", page.id)
+        await test_session.refresh(page)
+        fake.texts.clear()
+        fake.packs.clear()
+
+        runs = await asyncio.gather(*[service.pretranslate("page", page.id) for _ in range(3)])
+        assert [unchanged.planned for [unchanged] in runs] == [0, 0, 0]
+        assert service._locks == {}  # Per-item locks are dropped once idle
+
+        blocks = copy.deepcopy(page.content_blocks)
+        blocks["en"][1]["items"][0]["description"] = "Data stays in Germany"
+        before = await save(test_session, page, content_blocks=blocks)
+        [result] = await service.pretranslate("page", page.id, before)
+        await test_session.refresh(page)
+
+        assert result.written == 1
+        assert translated(fake) == ["Data stays in Germany"]
+        assert page.content_blocks["de"][1]["items"][0]["description"] == "DE: Data stays in Germany"
+        assert page.content_blocks["de"][0]["title"] == "DE: Cloud consulting"
+
+    @pytest.mark.asyncio
+    async def test_human_edits_are_respected(self, test_session: AsyncSession, service, fake, page):
+        """Test edited drafts survive until their source changes in a save"""
+        await service.pretranslate("page", page.id)
+        await test_session.refresh(page)
+
+        before = await save(test_session, page, title={"en": "Our services", "de": "Unsere Leistungen"})
+        [kept] = await service.pretranslate("page", page.id, before)
+        await test_session.refresh(page)
+        assert kept.planned == 0
+        assert page.title["de"] == "Unsere Leistungen"
+
+        before = await save(test_session, page, title={"en": "Our cloud services", "de": "Unsere Leistungen"})
+        [updated] = await service.pretranslate("page", page.id, before)
+        await test_session.refresh(page)
+        assert updated.written == 1
+        assert page.title["de"] == "DE: Our cloud services"
+
+    @pytest.mark.asyncio
+    async def test_translation_memory_answers_first(self, test_session: AsyncSession, service, fake, page):
+        """Test TM hits are used without calling the API"""
+        await make_service(test_session, fake).store_translation_memory(
+            "Our services", "Unsere Leistungen", "en", "de", quality_score=0.95
+        )
+
+        [result] = await service.pretranslate("page", page.id)
+
+        assert result.from_memory == 1
+        assert "Our services" not in translated(fake)
+
+    def test_concurrent_edits_are_not_overwritten(self, service):
+        """Test a segment changed while translating counts as a conflict"""
+        page = Page(title={"en": "Our services", "de": "Von Hand"}, content={"en": "Text"})
+        planned = {"title": ("Our services", None), "content": ("Text", None)}
+
+        written, conflicts = service.apply(
+            "page", page, "de", planned, {"title": "DE: Our services", "content": "DE: Text"}
+        )
+
+        assert (written, conflicts) == (["content"], 1)
+        assert page.title["de"] == "Von Hand"
+        assert page.content == {"en": "Text", "de": "DE: Text"}
+
+    def test_blocks_align_by_key_then_position(self):
+        """Test German blocks are matched to their English source blocks"""
+        _, fields = CONTENT_FIELDS["page"]
+        values = {"content_blocks": {
+            "en": BLOCKS,
+            "de": [
+                {"block_type": "features", "items": [{"title": "Sicher"}]},
+                {"block_type": "hero", "block_key": "hero", "title": "Cloud-Beratung"},
+            ]
+        }}
+
+        segments = extract_segments(values, fields, "de", "en")
+
+        assert segments == {"content_blocks/hero/title": "Cloud-Beratung"}
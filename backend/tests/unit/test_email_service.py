@@ -0,0 +1,86 @@
+"""
+Unit tests for SMTPEmailService against the local SMTP sink
+"""
+
+import asyncio
+import pytest
+from datetime import datetime
+
+from app.services.email_service import SMTPEmailService
+from tests.smtp_sink import find_free_port
+
+
+class TestSMTPEmailService:
+    """Test email delivery through a local SMTP server"""
+
+    @pytest.mark.asyncio
+    async def test_send_email_delivers_to_sink(self, smtp_sink, sink_email_service: SMTPEmailService):
+        """Test a plain email reaches the sink with both parts"""
+        success = await sink_email_service.send_email(
+            to=["customer@example.com"],
+            subject="Test Subject",
+            html_content="<p>Hello</p>",
+            text_content="Hello"
+        )
+
+        assert success is True
+        assert smtp_sink.message_count == 1
+        received = smtp_sink.messages[0]
+        assert received.rcpt_tos == ["customer@example.com"]
+        assert received.message["Subject"] == "Test Subject"
+        content_types = [part.get_content_type() for part in received.message.walk()]
+        assert "text/plain" in content_types
+        assert "text/html" in content_types
+
+    @pytest.mark.asyncio
+    async def test_send_email_with_attachment(self, smtp_sink, sink_email_service: SMTPEmailService):
+        """Test attachments are encoded into the delivered message"""
+        success = await sink_email_service.send_email(
+            to=["customer@example.com"],
+            subject="Invoice",
+            html_content="<p>Attached</p>",
+            attachments=[{"filename": "invoice.pdf", "content": b"%PDF-1.4 test"}]
+        )
+
+        assert success is True
+        parts = list(smtp_sink.messages[0].message.walk())
+        assert any(part.get_content_type() == "application/octet-stream" for part in parts)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_booking_confirmations(self, smtp_sink, sink_email_service: SMTPEmailService):
+        """Test concurrent sends are all delivered"""
+        results = await asyncio.gather(*[
+            sink_email_service.send_booking_confirmation_email(
+                customer_email=f"customer{i}@example.com",
+                customer_name="Max Mustermann",
+                customer_title=None,
+                consultant_name="Jane Smith",
+                consultant_email="jane@example.com",
+                consultant_role="AI Consultant",
+                booking_date=datetime(2024, 12, 15, 10, 0),
+                start_time="10:00",
+                end_time="10:30",
+                booking_reference=f"REF-{i}"
+            )
+            for i in range(20)
+        ])
+
+        assert all(results)
+        assert smtp_sink.message_count == 20
+        assert sorted(m.rcpt_tos[0] for m in smtp_sink.messages) == sorted(
+            f"customer{i}@example.com" for i in range(20)
+        )
+
+    @pytest.mark.asyncio
+    async def test_unreachable_server_returns_false(self, smtp_sink, sink_email_service: SMTPEmailService):
+        """Test delivery failures are reported, not raised"""
+        sink_email_service.smtp_port = find_free_port()
+
+        success = await sink_email_service.send_email(
+            to=["customer@example.com"],
+            subject="Lost",
+            html_content="<p>Nobody listening</p>"
+        )
+
+        assert success is False
+        assert smtp_sink.message_count == 0
@@ -0,0 +1,157 @@
+"""
+Unit tests for ImageProcessingService variant generation
+"""
+
+import asyncio
+import pytest
+from concurrent.futures import Executor, Future
+from io import BytesIO
+from PIL import Image
+
+from app.config import settings
+from app.services.image_processing_service import ImageProcessingService
+from app.utils import image_pipeline
+
+
+def make_jpeg(width: int = 2400, height: int = 1600) -> bytes:
+    """Create a noisy JPEG so encoding does real work"""
+    image = Image.effect_noise((width, height), 64).convert("RGB")
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=92)
+    return output.getvalue()
+
+
+class HeldExecutor(Executor):
+    """Executor that records submitted jobs and runs them only when released"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        self.jobs.append((future, fn, args))
+        return future
+
+    def release(self) -> None:
+        for future, fn, args in self.jobs:
+            future.set_result(fn(*args))
+
+
+@pytest.fixture
+def image_service(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "image_processing_workers", 1)
+    service = ImageProcessingService(upload_dir=str(tmp_path / "images"))
+    yield service
+    service.shutdown()
+
+
+class TestImageVariantWorkers:
+    """Test variant generation is dispatched off the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_process_image_data_returns_all_variants(self, image_service):
+        """Test one worker call yields the main image and every variant"""
+        processed = await image_service.process_image_data(make_jpeg())
+
+        optimized_data, optimized_metadata = processed["optimized"]
+        assert optimized_metadata["width"] == 2400
+        assert optimized_data[:2] == b"\xff\xd8"
+
+        variants = processed["variants"]
+        for size_name, width in ImageProcessingService.RESPONSIVE_SIZES.items():
+            assert variants[size_name][1]["width"] == width
+            assert variants[f"{size_name}_webp"][1]["format"] == "WEBP"
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, image_service):
+        """Test images are processed in the executor while other coroutines keep running"""
+        executor = HeldExecutor()
+        image_service._executor = executor
+        jobs = asyncio.gather(*[image_service.process_image_data(make_jpeg(800, 600)) for _ in range(2)])
+
+        # Both jobs are handed to the pool and the loop is free while they are pending
+        await asyncio.sleep(0.01)
+        assert [fn.__name__ for _, fn, _ in executor.jobs] == ["process_image"] * 2
+        assert not jobs.done()
+
+        executor.release()
+        results = await jobs
+        assert all("thumbnail" in processed["variants"] for processed in results)
+
+    @pytest.mark.asyncio
+    async def test_thread_fallback_without_workers(self, image_service, monkeypatch):
+        """Test image_processing_workers=0 still processes off-loop in a thread"""
+        image_service.shutdown()
+        monkeypatch.setattr(settings, "image_processing_workers", 0)
+
+        processed = await image_service.process_image_data(make_jpeg(800, 600))
+
+        assert image_service._executor is None
+        assert "thumbnail" in processed["variants"]
+        assert "medium" not in processed["variants"]
+
+
+class TestSingleDecodePipeline:
+    """Test the single-decode cascade variant pipeline"""
+
+    def test_orientation_applied_before_resize(self):
+        """Test a rotated EXIF photo yields portrait variants at the target widths"""
+        image = Image.effect_noise((1600, 1000), 64).convert("RGB")
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotate 90 CW on display
+        output = BytesIO()
+        image.save(output, format="JPEG", exif=exif.tobytes())
+
+        variants = image_pipeline.create_responsive_variants(
+            output.getvalue(), {"thumbnail": 150, "small": 400, "medium": 800}
+        )
+
+        for size_name, width in {"thumbnail": 150, "small": 400, "medium": 800}.items():
+            metadata = variants[size_name][1]
+            assert metadata["width"] == width
+            assert metadata["height"] == int(width * 1600 / 1000)
+
+    def test_cascade_keeps_aspect_ratio_and_formats(self):
+        """Test every size and format comes out of one decode with the source ratio"""
+        variants = image_pipeline.create_responsive_variants(
+            make_jpeg(2000, 1000), ImageProcessingService.RESPONSIVE_SIZES
+        )
+
+        assert set(variants) == {
+            f"{size_name}{suffix}"
+            for size_name in ImageProcessingService.RESPONSIVE_SIZES
+            for _, suffix in image_pipeline.variant_formats()
+        }
+        for data, metadata in variants.values():
+            assert metadata["height"] == metadata["width"] // 2
+            assert metadata["size"] == len(data)
+
+    def test_transparent_png_flattened_for_jpeg(self):
+        """Test alpha sources still produce JPEG variants"""
+        image = Image.new("RGBA", (600, 400), (255, 0, 0, 0))
+        output = BytesIO()
+        image.save(output, format="PNG")
+
+        processed = image_pipeline.process_image(output.getvalue(), {"thumbnail": 150, "small": 400})
+
+        assert processed["optimized"][1]["format"] == "JPEG"
+        assert Image.open(BytesIO(processed["variants"]["small"][0])).mode == "RGB"
+        assert Image.open(BytesIO(processed["variants"]["small_webp"][0])).mode == "RGBA"
+
+    def test_optimize_image_uses_draft_for_jpeg(self):
+        """Test optimize_image downsizes JPEGs to the exact target width"""
+        data, metadata = image_pipeline.optimize_image(make_jpeg(2400, 1600), target_width=300)
+
+        assert metadata["width"] == 300
+        assert metadata["height"] == 200
+        assert Image.open(BytesIO(data)).size == (300, 200)
+
+    def test_avif_variants_follow_plugin_availability(self, monkeypatch):
+        """Test AVIF variants are only produced when the encoder is available"""
+        sizes = {"thumbnail": 150}
+        variants = image_pipeline.create_responsive_variants(make_jpeg(600, 400), sizes)
+
+        assert ("thumbnail_avif" in variants) == image_pipeline.avif_supported()
+
+        monkeypatch.setattr(image_pipeline, "avif_supported", lambda: False)
+        assert image_pipeline.variant_formats() == image_pipeline.VARIANT_FORMATS
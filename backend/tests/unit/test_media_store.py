@@ -0,0 +1,164 @@
+"""
+Unit tests for content-addressed media storage and MediaFile deduplication
+"""
+
+import asyncio
+import pytest
+from io import BytesIO
+from PIL import Image
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.content import MediaFile
+from app.services.image_processing_service import ImageProcessingService
+from app.services.media_store import ContentAddressedStore
+
+
+def make_png(width: int = 900, height: int = 600, color=(20, 120, 200)) -> bytes:
+    output = BytesIO()
+    Image.new("RGB", (width, height), color).save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def image_service(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "image_processing_workers", 0)
+    service = ImageProcessingService(upload_dir=str(tmp_path / "images"))
+    service.process_calls = 0
+    process_image_data = service.process_image_data
+
+    async def counting_process_image_data(image_data):
+        service.process_calls += 1
+        return await process_image_data(image_data)
+
+    monkeypatch.setattr(service, "process_image_data", counting_process_image_data)
+    yield service
+    service.shutdown()
+
+
+def serve(service: ImageProcessingService, monkeypatch, payloads: dict):
+    async def download_image(url, base_url=None):
+        return payloads.get(url)
+
+    monkeypatch.setattr(service, "download_image", download_image)
+
+
+class TestContentAddressedStore:
+    """Test the sharded blob store"""
+
+    @pytest.mark.asyncio
+    async def test_put_is_sharded_and_idempotent(self, tmp_path):
+        """Test blobs land in ab/cd/<hash> and identical bytes are written once"""
+        store = ContentAddressedStore(tmp_path)
+        content_hash = ContentAddressedStore.hash_bytes(b"hello")
+
+        path, written = await store.put(b"hello", ".TXT")
+        again, written_again = await store.put(b"hello", ".txt")
+
+        assert path == again == f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}.txt"
+        assert written is True and written_again is False
+        assert (tmp_path / path).read_bytes() == b"hello"
+        assert store.get_metrics()["writes"] == 1
+        assert store.get_metrics()["reused"] == 1
+        assert not list(tmp_path.rglob("*.tmp"))
+
+
+class TestMediaDeduplication:
+    """Test identical source images share one MediaFile and one set of blobs"""
+
+    @pytest.mark.asyncio
+    async def test_remigration_reuses_media_file(self, test_session: AsyncSession, image_service, monkeypatch):
+        """Test the second import of the same bytes does no processing or writes"""
+        image = make_png()
+        serve(image_service, monkeypatch, {
+            "https://old.example.com/a/logo.png": image,
+            "https://old.example.com/b/logo-copy.png": image
+        })
+
+        first = await image_service.process_and_store_image(test_session, "https://old.example.com/a/logo.png")
+        files_after_first = sorted(p for p in image_service.upload_dir.rglob("*") if p.is_file())
+        writes_after_first = image_service.store.get_metrics()["writes"]
+
+        second = await image_service.process_and_store_image(test_session, "https://old.example.com/b/logo-copy.png")
+
+        assert second.id == first.id
+        assert second.reference_count == 0  # Storing takes no reference, owners link it
+        assert image_service.process_calls == 1
+        assert image_service.store.get_metrics()["writes"] == writes_after_first
+        assert sorted(p for p in image_service.upload_dir.rglob("*") if p.is_file()) == files_after_first
+        assert first.file_hash == ContentAddressedStore.hash_bytes(image)
+        for variant in first.image_metadata["variants"].values():
+            assert image_service.store.exists(variant["path"])
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_uploads_processed_once(
+        self, test_session: AsyncSession, image_service, monkeypatch
+    ):
+        """Test parallel imports of the same bytes wait for the first instead of racing"""
+        image = make_png(color=(200, 30, 30))
+        urls = [f"https://old.example.com/page{i}/hero.png" for i in range(5)]
+        serve(image_service, monkeypatch, {url: image for url in urls})
+
+        results = await asyncio.gather(*[
+            image_service.process_and_store_image(test_session, url) for url in urls
+        ])
+
+        assert {media_file.id for media_file in results} == {results[0].id}
+        assert image_service.process_calls == 1
+        count = await test_session.scalar(select(func.count()).select_from(MediaFile))
+        assert count == 1
+        for owner_id, media_file in enumerate(results):
+            await image_service.link_media_file(test_session, media_file, "page", owner_id)
+        await test_session.refresh(results[0])
+        assert results[0].reference_count == 5
+        assert image_service._hash_locks == {}
+
+    @pytest.mark.asyncio
+    async def test_last_release_removes_blobs(self, test_session: AsyncSession, image_service, monkeypatch):
+        """Test each owner holds one reference and blobs survive until the last owner lets go"""
+        serve(image_service, monkeypatch, {"https://old.example.com/x.png": make_png(color=(1, 2, 3))})
+        media_file = await image_service.process_and_store_image(test_session, "https://old.example.com/x.png")
+        assert await image_service.link_media_file(test_session, media_file, "page", 1) is True
+        assert await image_service.link_media_file(test_session, media_file, "page", 2) is True
+
+        # Re-migrating a page does not add references
+        again = await image_service.process_and_store_image(test_session, "https://old.example.com/x.png")
+        assert await image_service.link_media_file(test_session, again, "page", 1) is False
+        assert media_file.reference_count == 2
+
+        assert await image_service.release_owner_media(test_session, "page", 1) == 1
+        assert await image_service.release_owner_media(test_session, "page", 1) == 0
+        await test_session.refresh(media_file)
+        assert media_file.reference_count == 1
+        assert image_service.store.exists(media_file.file_path)
+        assert media_file.deleted_at is None
+
+        assert await image_service.release_owner_media(test_session, "page", 2) == 1
+        await test_session.refresh(media_file)
+        assert media_file.deleted_at is not None
+        assert not image_service.store.exists(media_file.file_path)
+        assert not [p for p in image_service.upload_dir.rglob("*") if p.is_file()]
+
+        # A fresh import after deletion processes the image again
+        again = await image_service.process_and_store_image(test_session, "https://old.example.com/x.png")
+        assert again.id != media_file.id
+        assert image_service.process_calls == 2
+
+    @pytest.mark.asyncio
+    async def test_release_keeps_listed_files(self, test_session: AsyncSession, image_service, monkeypatch):
+        """Test an owner can drop only the files it no longer uses"""
+        serve(image_service, monkeypatch, {
+            "https://old.example.com/a.png": make_png(color=(1, 1, 1)),
+            "https://old.example.com/b.png": make_png(color=(2, 2, 2))
+        })
+        kept = await image_service.process_and_store_image(test_session, "https://old.example.com/a.png")
+        dropped = await image_service.process_and_store_image(test_session, "https://old.example.com/b.png")
+        for media_file in (kept, dropped):
+            await image_service.link_media_file(test_session, media_file, "page", 1)
+
+        assert await image_service.release_owner_media(test_session, "page", 1, keep=[kept.id]) == 1
+        await test_session.refresh(kept)
+        await test_session.refresh(dropped)
+        assert (kept.reference_count, kept.deleted_at) == (1, None)
+        assert dropped.deleted_at is not None
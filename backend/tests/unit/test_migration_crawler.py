@@ -0,0 +1,319 @@
+"""
+Unit tests for the concurrent site migration crawler
+"""
+
+import asyncio
+import httpx
+import pytest
+from datetime import datetime
+from io import BytesIO
+from PIL import Image
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.content import Page, MediaFile
+from app.services.content_extraction_service import ContentExtractionService
+from app.services.image_processing_service import ImageProcessingService
+from app.services.migration_crawler import MigrationCrawler, slug_from_url
+
+
+def make_png() -> bytes:
+    output = BytesIO()
+    Image.new("RGB", (640, 480), (30, 60, 90)).save(output, format="PNG")
+    return output.getvalue()
+
+
+PAGE_TEMPLATE = """
+<html><head><title>{title}</title><meta name="description" content="About {title}"></head>
+<body>
+  <nav><a href="/">Home</a><a href="/about/">About</a><a href="/private/secret">Secret</a></nav>
+  <main>
+    <h1>{title}</h1>
+    <p>Migrated content for {title}.</p>
+    <img src="/images/team.png" alt="Our consulting team" width="640" height="480">
+  </main>
+</body></html>
+"""
+
+
+class FakeSite:
+    """In-process site served through httpx.MockTransport"""
+
+    def __init__(self, robots: str = "User-agent: *\nDisallow: /private/\n"):
+        self.robots = robots
+        self.image = make_png()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.rate_limited = set()
+        self.image_free_paths = set()
+        self.sitemap_paths = ["/", "/about/", "/services/ai.html", "/private/secret"]
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return self.respond(request)
+        finally:
+            self.in_flight -= 1
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/robots.txt":
+            return httpx.Response(200, text=self.robots)
+        if path == "/sitemap.xml":
+            locs = "".join(
+                f"<url><loc>https://old.example.com{p}</loc></url>"
+                for p in self.sitemap_paths
+            )
+            return httpx.Response(
+                200,
+                text=f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locs}</urlset>'
+            )
+        if path == "/images/team.png":
+            return httpx.Response(200, content=self.image, headers={"content-type": "image/png"})
+        if path == "/busy/" and path not in self.rate_limited:
+            self.rate_limited.add(path)
+            return httpx.Response(429, headers={"retry-after": "0"})
+
+        etag = f'"{path}-v1"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        title = path.strip("/") or "home"
+        html = PAGE_TEMPLATE.format(title=title)
+        if path in self.image_free_paths:
+            html = html.replace('<img src="/images/team.png"', '<span')
+        return httpx.Response(
+            200,
+            text=html,
+            headers={"content-type": "text/html; charset=utf-8", "etag": etag}
+        )
+
+    def page_requests(self):
+        return [r for r in self.requests if r.url.path not in ("/robots.txt", "/sitemap.xml", "/images/team.png")]
+
+
+@pytest.fixture
+def image_processor(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "image_processing_workers", 0)
+    monkeypatch.setattr(settings, "content_extraction_workers", 0)
+    processor = ImageProcessingService(upload_dir=str(tmp_path / "images"))
+    yield processor
+    processor.shutdown()
+
+
+def make_crawler(site, file_session_factory, image_processor, tmp_path, **kwargs) -> MigrationCrawler:
+    options = dict(
+        session_factory=file_session_factory,
+        extractor=ContentExtractionService(),
+        image_processor=image_processor,
+        max_concurrency=6,
+        per_host_concurrency=2,
+        request_delay_seconds=0,
+        state_file=str(tmp_path / "validators.json"),
+        transport=httpx.MockTransport(site.handler)
+    )
+    options.update(kwargs)
+    return MigrationCrawler(**options)
+
+
+class TestMigrationCrawler:
+    """Test the crawl -> extract -> images -> Page pipeline"""
+
+    def test_slug_from_url(self):
+        """Test URL paths map to page slugs"""
+        assert slug_from_url("https://old.example.com/") == "home"
+        assert slug_from_url("https://old.example.com/Services/AI_Consulting/") == "services-ai-consulting"
+        assert slug_from_url("https://old.example.com/about.html") == "about"
+
+    @pytest.mark.asyncio
+    async def test_sitemap_crawl_creates_pages_and_respects_robots(
+        self, file_session_factory, image_processor, tmp_path
+    ):
+        """Test sitemap pages become drafts with migrated images, robots-blocked ones are skipped"""
+        site = FakeSite()
+        reports = []
+        crawler = make_crawler(site, file_session_factory, image_processor, tmp_path, on_progress=reports.append)
+
+        progress = await crawler.crawl(sitemap_url="https://old.example.com/sitemap.xml")
+
+        assert progress.discovered == 4
+        assert progress.pages_created == 3
+        assert progress.skipped_robots == 1
+        assert progress.failed == 0
+        assert progress.completed == 4
+        assert reports
+
+        assert all(r.url.path != "/private/secret" for r in site.requests)
+        assert site.max_in_flight <= 2
+        assert {r.headers["user-agent"] for r in site.requests} == {settings.crawler_user_agent}
+
+        async with file_session_factory() as db:
+            pages = {page.slug: page for page in (await db.execute(select(Page))).scalars()}
+            media_files = (await db.execute(select(MediaFile))).scalars().all()
+
+        assert set(pages) == {"home", "about", "services-ai"}
+        assert pages["about"].status == "draft"
+        assert pages["about"].title == {"en": "about"}
+        assert "/api/v1/public/media/" in pages["about"].content["en"]
+        assert "/images/team.png" not in pages["about"].content["en"]
+
+        # The shared team photo is stored once and referenced by every page
+        assert len(media_files) == 1
+        assert media_files[0].reference_count == 3
+        assert progress.images_stored == 3
+
+    @pytest.mark.asyncio
+    async def test_recrawl_sends_validators_and_skips_unchanged(
+        self, file_session_factory, image_processor, tmp_path
+    ):
+        """Test a second crawl uses ETags and leaves unchanged pages alone"""
+        site = FakeSite()
+        await make_crawler(site, file_session_factory, image_processor, tmp_path).crawl(
+            sitemap_url="https://old.example.com/sitemap.xml"
+        )
+        site.requests.clear()
+
+        progress = await make_crawler(site, file_session_factory, image_processor, tmp_path).crawl(
+            sitemap_url="https://old.example.com/sitemap.xml"
+        )
+
+        assert progress.not_modified == 3
+        assert progress.pages_created == 0
+        assert progress.pages_updated == 0
+        assert all("if-none-match" in r.headers for r in site.page_requests())
+        assert all(r.url.path != "/images/team.png" for r in site.requests)
+
+    @pytest.mark.asyncio
+    async def test_deleted_pages_are_fetched_again(self, file_session_factory, image_processor, tmp_path):
+        """Test stored validators are not sent for a page deleted since the last crawl"""
+        site = FakeSite()
+        await make_crawler(site, file_session_factory, image_processor, tmp_path, migrate_images=False).crawl(
+            sitemap_url="https://old.example.com/sitemap.xml"
+        )
+        async with file_session_factory() as db:
+            about = (await db.execute(select(Page).where(Page.slug == "about"))).scalar_one()
+            about.deleted_at = datetime.utcnow()
+            await db.commit()
+
+        progress = await make_crawler(site, file_session_factory, image_processor, tmp_path, migrate_images=False).crawl(
+            sitemap_url="https://old.example.com/sitemap.xml"
+        )
+
+        assert (progress.not_modified, progress.pages_created) == (2, 1)
+        async with file_session_factory() as db:
+            slugs = set((await db.execute(select(Page.slug).where(Page.deleted_at.is_(None)))).scalars())
+        assert slugs == {"home", "about-2", "services-ai"}
+
+    @pytest.mark.asyncio
+    async def test_pages_sharing_a_slug_get_numbered(self, file_session_factory, image_processor, tmp_path):
+        """Test concurrent workers never hand out the same slug twice"""
+        site = FakeSite()
+        site.sitemap_paths = ["/about/", "/about.html", "/About/", "/about.htm"]
+        crawler = make_crawler(
+            site, file_session_factory, image_processor, tmp_path, migrate_images=False, per_host_concurrency=4
+        )
+
+        progress = await crawler.crawl(sitemap_url="https://old.example.com/sitemap.xml")
+
+        async with file_session_factory() as db:
+            slugs = set((await db.execute(select(Page.slug))).scalars())
+        assert (progress.pages_created, progress.failed) == (4, 0)
+        assert slugs == {"about", "about-2", "about-3", "about-4"}
+
+    @pytest.mark.asyncio
+    async def test_robots_rules_apply_to_images(self, file_session_factory, image_processor, tmp_path):
+        """Test images under a disallowed path are neither downloaded nor stored"""
+        site = FakeSite(robots="User-agent: *\nDisallow: /private/\nDisallow: /images/\n")
+
+        progress = await make_crawler(site, file_session_factory, image_processor, tmp_path).crawl(
+            sitemap_url="https://old.example.com/sitemap.xml"
+        )
+
+        assert progress.pages_created == 3
+        assert (progress.images_skipped_robots, progress.images_stored) == (3, 0)
+        assert all(r.url.path != "/images/team.png" for r in site.requests)
+
+    @pytest.mark.asyncio
+    async def test_remigration_keeps_admin_pages_and_translations(
+        self, file_session_factory, image_processor, tmp_path
+    ):
+        """Test only crawler pages are refreshed, only in English, and hand-made slugs are kept"""
+        async with file_session_factory() as db:
+            db.add(Page(slug="about", title={"en": "About us"}, content={"en": "<p>Written by hand</p>"}))
+            await db.commit()
+
+        site = FakeSite()
+        await make_crawler(site, file_session_factory, image_processor, tmp_path, migrate_images=False).crawl(
+            sitemap_url="https://old.example.com/sitemap.xml"
+        )
+        async with file_session_factory() as db:
+            migrated = (await db.execute(
+                select(Page).where(Page.canonical_url == "https://old.example.com/about/")
+            )).scalar_one()
+            migrated.title = {**migrated.title, "de": "Über uns"}
+            await db.commit()
+
+        # Without stored validators every page is fetched and refreshed again
+        progress = await make_crawler(
+            site, file_session_factory, image_processor, tmp_path,
+            migrate_images=False, state_file=str(tmp_path / "fresh.json")
+        ).crawl(sitemap_url="https://old.example.com/sitemap.xml")
+
+        async with file_session_factory() as db:
+            pages = {page.slug: page for page in (await db.execute(select(Page))).scalars()}
+
+        assert (progress.pages_created, progress.pages_updated) == (0, 3)
+        assert set(pages) == {"home", "about", "about-2", "services-ai"}
+        assert pages["about"].content == {"en": "<p>Written by hand</p>"}
+        assert pages["about-2"].title == {"en": "about", "de": "Über uns"}
+
+    @pytest.mark.asyncio
+    async def test_remigration_reuses_linked_images(self, file_session_factory, image_processor, tmp_path):
+        """Test refreshed pages neither download their images again nor add references"""
+        site = FakeSite()
+        await make_crawler(site, file_session_factory, image_processor, tmp_path).crawl(
+            sitemap_url="https://old.example.com/sitemap.xml"
+        )
+        site.requests.clear()
+
+        progress = await make_crawler(
+            site, file_session_factory, image_processor, tmp_path, state_file=str(tmp_path / "fresh.json")
+        ).crawl(sitemap_url="https://old.example.com/sitemap.xml")
+
+        async with file_session_factory() as db:
+            media_file = (await db.execute(select(MediaFile))).scalar_one()
+            about = (await db.execute(select(Page).where(Page.slug == "about"))).scalar_one()
+
+        assert progress.pages_updated == 3
+        assert (progress.images_reused, progress.images_stored) == (3, 0)
+        assert all(r.url.path != "/images/team.png" for r in site.requests)
+        assert media_file.reference_count == 3
+        assert f"/api/v1/public/media/{media_file.id}/" in about.content["en"]
+
+        # A page that no longer shows the image gives its reference back
+        site.image_free_paths = {"/about/"}
+        await make_crawler(
+            site, file_session_factory, image_processor, tmp_path, state_file=str(tmp_path / "third.json")
+        ).crawl(sitemap_url="https://old.example.com/sitemap.xml")
+
+        async with file_session_factory() as db:
+            media_file = (await db.execute(select(MediaFile))).scalar_one()
+        assert media_file.reference_count == 2
+
+    @pytest.mark.asyncio
+    async def test_seed_crawl_follows_links_and_retries_rate_limits(
+        self, file_session_factory, image_processor, tmp_path
+    ):
+        """Test seed crawling discovers same-host links and retries after a 429"""
+        site = FakeSite()
+        crawler = make_crawler(site, file_session_factory, image_processor, tmp_path, migrate_images=False)
+
+        progress = await crawler.crawl(seed_urls=["https://old.example.com/busy/"])
+
+        assert progress.retried == 1
+        assert progress.skipped_robots == 1
+        assert progress.pages_created == 3  # busy, home, about
+        assert progress.images_stored == 0
@@ -0,0 +1,154 @@
+"""
+Unit tests for translation and content lookups in MultilingualContentService
+"""
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.translation import Translation, MultilingualContent
+from app.services.multilingual_content_service import MultilingualContentService
+
+
+@pytest_asyncio.fixture
+async def translations(test_session: AsyncSession):
+    rows = [
+        ("nav", "home", "de", "Home", "Startseite", "approved"),
+        ("nav", "home", "en", "Home", "Home", "approved"),
+        ("nav", "about", "de", "About us", "Über uns", "pending"),
+        ("nav", "about", "en", "About us", "About", "translated"),
+        ("nav", "blog", "de", "Blog", None, "pending"),
+        ("footer", "home", "de", "Home", "Zur Startseite", "approved"),
+    ]
+    for namespace, key, language, source, text, status in rows:
+        test_session.add(Translation(
+            namespace=namespace, key=key, source_text=source,
+            target_language=language, translated_text=text, status=status
+        ))
+    await test_session.commit()
+
+
+@pytest.fixture
+def statements(test_session: AsyncSession):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = test_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+class TestTranslationResolution:
+    """Test fallback priority and round-trips of key lookups"""
+
+    @pytest.mark.asyncio
+    async def test_fallback_priority(self, test_session: AsyncSession, translations):
+        """Test target language, then English, then source text, then key"""
+        service = MultilingualContentService(test_session)
+
+        assert await service.get_translation("nav", "home", "de") == "Startseite"
+        assert await service.get_translation("nav", "about", "de") == "About"
+        assert await service.get_translation("nav", "about", "de", fallback=False) == "About us"
+        assert await service.get_translation("nav", "blog", "de") == "Blog"
+        assert await service.get_translation("nav", "missing", "de") == "missing"
+
+    @pytest.mark.asyncio
+    async def test_single_lookup_is_one_query(self, test_session: AsyncSession, translations, statements):
+        """Test a key falling through to the source text still takes one query"""
+        service = MultilingualContentService(test_session)
+
+        assert await service.get_translation("nav", "blog", "de") == "Blog"
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_many_keys_in_one_round_trip(self, test_session: AsyncSession, translations, statements):
+        """Test keys across namespaces are resolved together"""
+        service = MultilingualContentService(test_session)
+
+        result = await service.get_translations_for_keys(
+            [("nav", "home"), ("footer", "home"), ("nav", "about"), ("nav", "home"), ("nav", "missing")],
+            language="de"
+        )
+
+        assert result == {
+            ("nav", "home"): "Startseite",
+            ("footer", "home"): "Zur Startseite",
+            ("nav", "about"): "About",
+            ("nav", "missing"): "missing",
+        }
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_large_key_sets_are_chunked(self, test_session: AsyncSession, translations, statements, monkeypatch):
+        """Test the bound parameter count per query stays limited"""
+        monkeypatch.setattr(MultilingualContentService, "KEY_LOOKUP_CHUNK_SIZE", 2)
+        service = MultilingualContentService(test_session)
+
+        result = await service.get_translations_for_keys(
+            [("nav", "home"), ("nav", "about"), ("footer", "home")], language="de"
+        )
+
+        assert result[("footer", "home")] == "Zur Startseite"
+        assert len(statements) == 2
+
+
+class TestCompositeKeys:
+    """Test the composite unique indexes and the lookups using them"""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_translation_is_rejected(self, test_session: AsyncSession, translations):
+        """Test the service answers 409 and the table refuses duplicate rows"""
+        service = MultilingualContentService(test_session)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.create_translation("nav", "home", "Home", "de", translated_text="Start")
+        assert exc_info.value.status_code == 409
+
+        test_session.add(Translation(
+            namespace="nav", key="home", source_text="Home", target_language="de", status="pending"
+        ))
+        with pytest.raises(IntegrityError):
+            await test_session.commit()
+        await test_session.rollback()
+
+        # A different source language is a different key
+        assert await service.create_translation("nav", "home", "Startseite", "en", source_language="de")
+
+    @pytest.mark.asyncio
+    async def test_key_lookups_use_the_composite_index(self, test_session: AsyncSession):
+        """Test the query plans search the unique indexes"""
+        plans = {}
+        for name, query in {
+            "translation": "SELECT id FROM translations WHERE namespace = 'nav' AND key = 'home' "
+                           "AND source_language = 'en' AND target_language = 'de'",
+            "content": "SELECT id FROM multilingual_content WHERE content_type = 'page' "
+                       "AND content_id = '1' AND field_name = 'title' AND language = 'de'",
+        }.items():
+            result = await test_session.execute(text(f"EXPLAIN QUERY PLAN {query}"))
+            plans[name] = " ".join(row[-1] for row in result)
+
+        assert "uq_translations_namespace_key_languages" in plans["translation"]
+        assert "uq_multilingual_content_field_language" in plans["content"]
+
+    @pytest.mark.asyncio
+    async def test_content_is_upserted_per_field_and_language(self, test_session: AsyncSession):
+        """Test saving a field again updates and reactivates the single row"""
+        service = MultilingualContentService(test_session)
+
+        first_id = await service.create_multilingual_content("page", "1", "title", "de", "Titel")
+        row = await test_session.get(MultilingualContent, first_id)
+        row.is_active = False
+        await test_session.commit()
+
+        second_id = await service.create_multilingual_content("page", "1", "title", "de", "Neuer Titel")
+        content = await service.get_multilingual_content("page", "1", "de")
+
+        assert second_id == first_id
+        assert content["content"] == {"title": "Neuer Titel"}
+        assert row.version == 2
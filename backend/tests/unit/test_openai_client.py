@@ -0,0 +1,73 @@
+"""
+Unit tests for the shared OpenAI client
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.ai_profile_generation_service import AIProfileGenerationService
+from app.services.ai_translation_service import AITranslationService
+from app.services.openai_client import SharedOpenAIClient
+from tests.unit.test_batch_translation import FakeOpenAI, make_service
+
+
+@pytest.fixture
+def shared(monkeypatch) -> SharedOpenAIClient:
+    shared = SharedOpenAIClient()
+    for module in ("ai_translation_service", "ai_profile_generation_service"):
+        monkeypatch.setattr(f"app.services.{module}.openai_client", shared)
+    return shared
+
+
+class TestSharedOpenAIClient:
+    """Test client reuse, shutdown and call metrics"""
+
+    @pytest.mark.asyncio
+    async def test_services_share_one_connection_pool(self, test_session: AsyncSession, shared, monkeypatch):
+        """Test per-request services reuse the process client and its HTTP pool"""
+        monkeypatch.setattr(settings, "openai_api_key", "test-key")
+        shared.start()
+
+        first, second = AITranslationService(test_session), AITranslationService(test_session)
+        profile = AIProfileGenerationService(test_session)
+
+        assert first.client is second.client is shared.client
+        assert first.client.max_retries == 0
+        assert profile.client.max_retries > 0
+        assert profile.client._client is shared.client._client
+        assert shared.client.timeout.connect == settings.openai_connect_timeout_seconds
+        assert shared.get_metrics()["clients_created"] == 1
+
+        http_client = shared.client._client
+        await shared.aclose()
+        assert http_client.is_closed
+        assert shared.get_metrics()["connected"] is False
+
+    def test_unconfigured_services_have_no_client(self, test_session: AsyncSession, shared, monkeypatch):
+        """Test a missing API key still disables the AI services"""
+        monkeypatch.setattr(settings, "openai_api_key", None)
+
+        assert AITranslationService(test_session).client is None
+        assert AIProfileGenerationService(test_session).client is None
+        assert shared.get_metrics()["configured"] is False
+
+    @pytest.mark.asyncio
+    async def test_calls_record_latency_and_tokens(self, test_session: AsyncSession, shared):
+        """Test successful and failed completions are counted per operation"""
+        fake = FakeOpenAI()
+        service = make_service(test_session, fake)
+
+        result = await service.translate_text("Contact us", "en", "de")
+        assert result["success"] is True
+
+        with pytest.raises(Exception):
+            await shared.create_chat_completion(service.client, "profile_summary", model="gpt-4", messages=[])
+
+        metrics = shared.get_metrics()
+        translation = metrics["operations"]["translation"]
+        assert (metrics["calls"], metrics["errors"]) == (2, 1)
+        assert (translation["calls"], translation["prompt_tokens"], translation["completion_tokens"]) == (1, 200, 10)
+        assert translation["max_latency_ms"] > 0
+        assert translation["avg_latency_ms"] == round(translation["total_latency_ms"], 1)
+        assert metrics["operations"]["profile_summary"]["errors"] == 1
@@ -0,0 +1,225 @@
+"""
+Unit tests for bulk translation import and export
+"""
+
+import csv
+import io
+import json
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.translation import Translation
+from app.services.translation_bulk_service import (
+    TranslationBulkService, iter_xliff_records, detect_format
+)
+from app.services.translation_bundle_cache import TranslationBundleCache
+
+
+XLIFF_12 = b"""<?xml version="1.0" encoding="UTF-8"?>
+<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2">
+  <file original="nav" source-language="en" target-language="de-DE" datatype="plaintext">
+    <body>
+      <trans-unit id="home"><source>Home</source><target>Startseite</target></trans-unit>
+      <trans-unit id="about"><source>About <g id="1">us</g></source><note>Menu</note></trans-unit>
+    </body>
+  </file>
+</xliff>"""
+
+XLIFF_20 = b"""<?xml version="1.0" encoding="UTF-8"?>
+<xliff version="2.0" xmlns="urn:oasis:names:tc:xliff:document:2.0" srcLang="en" trgLang="de">
+  <file id="footer">
+    <unit id="imprint"><segment><source>Imprint</source><target>Impressum</target></segment></unit>
+  </file>
+</xliff>"""
+
+
+def csv_file(rows: list) -> io.BytesIO:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["namespace", "key", "target_language", "source_text", "translated_text", "status"])
+    writer.writeheader()
+    writer.writerows(rows)
+    return io.BytesIO(buffer.getvalue().encode("utf-8"))
+
+
+async def rows_by_key(db: AsyncSession) -> dict:
+    result = await db.execute(select(Translation))
+    return {(t.namespace, t.key, t.target_language): t for t in result.scalars()}
+
+
+class TestTranslationImport:
+    """Test parsing and batched upserts"""
+
+    @pytest.mark.asyncio
+    async def test_csv_import_upserts_in_batches(self, test_session: AsyncSession):
+        """Test re-imports update rows in place and blanks keep stored texts"""
+        service = TranslationBulkService(test_session, batch_size=2)
+
+        result = await service.import_file(csv_file([
+            {"namespace": "nav", "key": "home", "target_language": "de", "source_text": "Home", "translated_text": "Start", "status": "approved"},
+            {"namespace": "nav", "key": "about", "target_language": "de", "source_text": "About", "translated_text": ""},
+            {"namespace": "nav", "key": "blog", "target_language": "de", "source_text": "Blog", "translated_text": "Blog"},
+        ]), "csv")
+        assert (result.upserted, result.batches, result.namespaces) == (3, 2, ["nav"])
+
+        await service.import_file(csv_file([
+            {"namespace": "nav", "key": "home", "target_language": "de", "source_text": "", "translated_text": ""},
+            {"namespace": "nav", "key": "about", "target_language": "de", "source_text": "About us", "translated_text": "Über uns"},
+        ]), "csv")
+
+        rows = await rows_by_key(test_session)
+        assert len(rows) == 3
+        home, about = rows[("nav", "home", "de")], rows[("nav", "about", "de")]
+        await test_session.refresh(home)
+        await test_session.refresh(about)
+        assert (home.source_text, home.translated_text, home.status) == ("Home", "Start", "approved")
+        assert (about.source_text, about.translated_text, about.status) == ("About us", "Über uns", "translated")
+        assert about.translation_method == "import"
+
+    @pytest.mark.asyncio
+    async def test_invalid_records_are_skipped_and_reported(self, test_session: AsyncSession):
+        """Test bad keys, languages and statuses do not abort the import"""
+        service = TranslationBulkService(test_session)
+
+        result = await service.import_file(csv_file([
+            {"namespace": "nav", "key": "", "target_language": "de", "source_text": "x"},
+            {"namespace": "nav", "key": "home", "target_language": "deu", "source_text": "x"},
+            {"namespace": "nav", "key": "home", "target_language": "de", "source_text": "x", "status": "done"},
+            {"namespace": "nav", "key": "home", "target_language": "de", "source_text": "Home"},
+        ]), "csv")
+
+        assert (result.processed, result.upserted, result.skipped) == (4, 1, 3)
+        assert "invalid target_language 'deu'" in result.errors[1]
+
+    @pytest.mark.asyncio
+    async def test_nested_json_is_flattened(self, test_session: AsyncSession):
+        """Test i18next nesting becomes dotted keys of one namespace"""
+        service = TranslationBulkService(test_session)
+        document = {"menu": {"home": "Home", "about": "About"}, "title": "Welcome"}
+
+        result = await service.import_file(
+            io.BytesIO(json.dumps(document).encode()), "json", namespace="site", target_language="en"
+        )
+
+        rows = await rows_by_key(test_session)
+        assert result.upserted == 3
+        assert rows[("site", "menu.home", "en")].source_text == "Home"
+        assert rows[("site", "title", "en")].translated_text == "Welcome"
+
+    @pytest.mark.asyncio
+    async def test_empty_json_values_keep_stored_translations(self, test_session: AsyncSession):
+        """Test i18next "" placeholders neither wipe texts nor reset their status"""
+        service = TranslationBulkService(test_session)
+        await service.import_file(csv_file([
+            {"namespace": "nav", "key": "home", "target_language": "de", "source_text": "Home", "translated_text": "Startseite", "status": "approved"},
+        ]), "csv")
+
+        result = await service.import_file(
+            io.BytesIO(json.dumps({"home": "", "blog": ""}).encode()), "json", namespace="nav", target_language="de"
+        )
+
+        rows = await rows_by_key(test_session)
+        home, blog = rows[("nav", "home", "de")], rows[("nav", "blog", "de")]
+        await test_session.refresh(home)
+        assert result.upserted == 2
+        assert (home.translated_text, home.status) == ("Startseite", "approved")
+        assert (blog.translated_text, blog.status) == (None, "pending")
+
+    @pytest.mark.asyncio
+    async def test_reimported_export_keeps_review_status(self, test_session: AsyncSession):
+        """Test unchanged texts keep approved/reviewed and changed ones take the file's status"""
+        service = TranslationBulkService(test_session)
+        await service.import_file(csv_file([
+            {"namespace": "nav", "key": "home", "target_language": "de", "source_text": "Home", "translated_text": "Startseite", "status": "approved"},
+            {"namespace": "nav", "key": "about", "target_language": "de", "source_text": "About", "translated_text": "Über", "status": "reviewed"},
+        ]), "csv")
+
+        exported = "".join([chunk async for chunk in service.iter_export("nav", "de", "json")])
+        await service.import_file(io.BytesIO(exported.encode()), "json", namespace="nav", target_language="de")
+        await service.import_file(csv_file([
+            {"namespace": "nav", "key": "about", "target_language": "de", "source_text": "About", "translated_text": "Über uns"},
+        ]), "csv")
+
+        rows = await rows_by_key(test_session)
+        for row in rows.values():
+            await test_session.refresh(row)
+        assert rows[("nav", "home", "de")].status == "approved"
+        assert (rows[("nav", "about", "de")].translated_text, rows[("nav", "about", "de")].status) == ("Über uns", "translated")
+
+    @pytest.mark.asyncio
+    async def test_import_invalidates_bundles(self, test_session: AsyncSession, monkeypatch):
+        """Test touched namespaces get a new bundle version"""
+        cache = TranslationBundleCache()
+        monkeypatch.setattr("app.services.translation_bulk_service.translation_bundle_cache", cache)
+        before = cache.version("nav")
+
+        await TranslationBulkService(test_session).import_file(io.BytesIO(XLIFF_12), "xliff")
+
+        assert cache.version("nav") > before
+        assert cache.version("footer") == before
+
+    def test_xliff_versions_are_parsed(self):
+        """Test XLIFF 1.2 and 2.0 units, inline markup and notes"""
+        records = list(iter_xliff_records(io.BytesIO(XLIFF_12), None, "en", None))
+        records += list(iter_xliff_records(io.BytesIO(XLIFF_20), None, "en", None))
+
+        assert [(r["namespace"], r["key"], r["target_language"], r["translated_text"]) for r in records] == [
+            ("nav", "home", "de", "Startseite"),
+            ("nav", "about", "de", None),
+            ("footer", "imprint", "de", "Impressum"),
+        ]
+        assert records[1]["source_text"] == "About us"
+        assert records[1]["context"] == "Menu"
+        assert detect_format("nav.de.XLF") == "xliff"
+        assert detect_format("nav.txt") is None
+
+    @pytest.mark.asyncio
+    async def test_malformed_files_raise_value_error(self, test_session: AsyncSession):
+        """Test parse errors surface as ValueError"""
+        service = TranslationBulkService(test_session)
+
+        with pytest.raises(ValueError):
+            await service.import_file(io.BytesIO(b"<xliff><file>"), "xliff")
+        with pytest.raises(ValueError):
+            await service.import_file(io.BytesIO(b"[1, 2]"), "json", namespace="nav", target_language="de")
+
+
+class TestTranslationExport:
+    """Test streaming export formats"""
+
+    @pytest.mark.asyncio
+    async def test_exports_round_trip(self, test_session: AsyncSession):
+        """Test CSV and XLIFF exports import back unchanged and JSON matches bundles"""
+        service = TranslationBulkService(test_session)
+        await service.import_file(io.BytesIO(XLIFF_12), "xliff")
+
+        exports = {}
+        for format in ("json", "csv", "xliff"):
+            chunks = [chunk async for chunk in service.iter_export("nav", "de", format, chunk_size=10)]
+            assert len(chunks) > 1
+            exports[format] = "".join(chunks)
+
+        assert json.loads(exports["json"]) == {"home": "Startseite"}
+
+        records = list(iter_xliff_records(io.BytesIO(exports["xliff"].encode()), None, "en", None))
+        assert [(r["key"], r["source_text"], r["translated_text"], r["context"]) for r in records] == [
+            ("about", "About us", None, "Menu"),
+            ("home", "Home", "Startseite", None),
+        ]
+
+        lines = list(csv.DictReader(io.StringIO(exports["csv"])))
+        assert [(l["namespace"], l["key"], l["translated_text"], l["status"]) for l in lines] == [
+            ("nav", "about", "", "pending"),
+            ("nav", "home", "Startseite", "translated"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_empty_namespace_exports_valid_documents(self, test_session: AsyncSession):
+        """Test exports of unknown namespaces are empty but well-formed"""
+        service = TranslationBulkService(test_session)
+
+        json_export = "".join([chunk async for chunk in service.iter_export("missing", "de", "json")])
+        xliff_export = "".join([chunk async for chunk in service.iter_export("missing", "de", "xliff")])
+
+        assert json.loads(json_export) == {}
+        assert list(iter_xliff_records(io.BytesIO(xliff_export.encode()), None, "en", None)) == []
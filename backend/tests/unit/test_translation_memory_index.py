@@ -0,0 +1,179 @@
+"""
+Unit tests for the fuzzy translation memory index
+"""
+
+import random
+import statistics
+import time
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.translation import TranslationMemory, tm_source_hash
+from app.services.ai_translation_service import AITranslationService
+from app.services.translation_memory_index import TranslationMemoryIndex, normalize_text
+
+
+def vocabulary(rng: random.Random, size: int = 3000) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(size)]
+
+
+def sentence(rng: random.Random, words: list, length: int = 12) -> str:
+    return " ".join(rng.choice(words) for _ in range(length)).capitalize() + "."
+
+
+@pytest.fixture
+def index():
+    index = TranslationMemoryIndex()
+    index.add("1", "Book a free consultation with our AI experts today.", "Buchen Sie noch heute eine kostenlose Beratung mit unseren KI-Experten.", "en", "de", 0.9)
+    index.add("2", "Download the whitepaper", "Whitepaper herunterladen", "en", "de", 0.85)
+    index.add("3", "Download the whitepaper", "Télécharger le livre blanc", "en", "fr", 0.85)
+    return index
+
+
+class TestTranslationMemoryIndex:
+    """Test normalization, scoring and index maintenance"""
+
+    def test_exact_match_ignores_case_and_whitespace(self, index):
+        """Test normalized exact matches score 1.0"""
+        match = index.best_match("  download   THE whitepaper ", "en", "de")
+
+        assert match.entry_id == "2"
+        assert match.similarity == 1.0
+        assert normalize_text("A  B") == "a b"
+
+    def test_near_identical_text_clears_high_threshold(self, index):
+        """Test a one-character edit still matches above 0.95"""
+        match = index.best_match("Book a free consultation with our AI experts today!", "en", "de", threshold=0.95)
+
+        assert match is not None
+        assert match.entry_id == "1"
+        assert 0.95 < match.similarity < 1.0
+
+    def test_unrelated_text_and_other_pairs_do_not_match(self, index):
+        """Test dissimilar text and other language pairs return nothing"""
+        assert index.best_match("Contact our sales team", "en", "de") is None
+        assert index.best_match("Download the whitepaper", "de", "en") is None
+        assert index.search("Download the whitepaper", "en", "fr")[0].translation == "Télécharger le livre blanc"
+
+    def test_domains_are_kept_apart(self, index):
+        """Test fuzzy and exact index hits stay within the entry's domain, like the hash lookup"""
+        index.add("4", "Book a free consultation with our AI experts", "Kostenloses Erstgespräch buchen", "en", "de", 0.9, domain="marketing")
+
+        assert index.best_match("Book a free consultation with our AI experts", "en", "de", domain="marketing").entry_id == "4"
+        assert index.best_match("Book a free consultation with our AI experts today!", "en", "de", threshold=0.95).entry_id == "1"
+        assert index.best_match("Download the whitepaper", "en", "de", domain="marketing") is None
+        assert index.remove("4", "en", "de") is False
+        assert index.remove("4", "en", "de", domain="marketing") is True
+
+    def test_add_replaces_and_remove_drops(self, index):
+        """Test re-adding an entry updates it and removing unindexes it"""
+        index.add("2", "Download the whitepaper", "Laden Sie das Whitepaper herunter", "en", "de", 0.95)
+        assert index.best_match("Download the whitepaper", "en", "de").translation == "Laden Sie das Whitepaper herunter"
+        assert index.get_metrics()["entries"] == 3
+
+        assert index.remove("2", "en", "de") is True
+        assert index.best_match("Download the whitepaper", "en", "de") is None
+        assert index.get_metrics()["entries"] == 2
+
+    def test_lookup_is_sub_millisecond(self):
+        """Test fuzzy lookups over 5k entries stay below a millisecond"""
+        rng = random.Random(7)
+        words = vocabulary(rng)
+        index = TranslationMemoryIndex()
+        sources = [sentence(rng, words) for _ in range(5000)]
+        for i, source in enumerate(sources):
+            index.add(str(i), source, f"de {i}", "en", "de")
+
+        timings = []
+        for source in sources[:200]:
+            query = source[:-1] + "!"
+            started = time.perf_counter()
+            match = index.best_match(query, "en", "de", threshold=0.9)
+            timings.append(time.perf_counter() - started)
+            assert match is not None
+
+        assert statistics.median(timings) < 0.001
+
+
+class TestServiceTranslationMemory:
+    """Test AITranslationService lookups go through the index"""
+
+    @pytest.mark.asyncio
+    async def test_store_updates_index_and_lookup_counts_usage(self, test_session: AsyncSession):
+        """Test stored entries are found fuzzily and usage is recorded"""
+        service = AITranslationService(test_session, tm_index=TranslationMemoryIndex())
+
+        await service.store_translation_memory(
+            "Our team delivers secure cloud solutions.",
+            "Unser Team liefert sichere Cloud-Lösungen.",
+            "en", "de", quality_score=0.9
+        )
+        match = await service.find_translation_memory_match(
+            "Our team delivers secure cloud solutions", "en", "de"
+        )
+
+        assert match["translation"] == "Unser Team liefert sichere Cloud-Lösungen."
+        assert match["similarity"] > 0.9
+        entry = (await test_session.execute(select(TranslationMemory))).scalar_one()
+        assert entry.usage_count == 1
+        assert entry.last_used is not None
+
+    @pytest.mark.asyncio
+    async def test_index_loads_existing_rows_on_first_use(self, test_session: AsyncSession):
+        """Test rows written before startup are indexed lazily"""
+        test_session.add(TranslationMemory(
+            source_text="Schedule a call with our team", translated_text="Termin mit unserem Team vereinbaren",
+            source_language="en", target_language="de", quality_score=0.8, usage_count=0, domain="business"
+        ))
+        await test_session.commit()
+        index = TranslationMemoryIndex()
+        service = AITranslationService(test_session, tm_index=index)
+
+        match = await service.find_translation_memory_match("Schedule a call with our team!", "en", "de")
+
+        assert index.loaded
+        assert match["translation"] == "Termin mit unserem Team vereinbaren"
+        assert match["similarity"] > 0.9
+
+
+class TestHashKeyedTranslationMemory:
+    """Test source_hash point lookups and upserts"""
+
+    def test_hash_normalizes_text_and_scopes_pair_and_domain(self):
+        """Test the digest ignores case/whitespace but not language pair or domain"""
+        base = tm_source_hash("Hello  World", "en", "de", "business")
+
+        assert base == tm_source_hash("hello world", "en", "de", "business")
+        assert base != tm_source_hash("hello world", "en", "fr", "business")
+        assert base != tm_source_hash("hello world", "en", "de", "marketing")
+        assert len(base) == 64
+
+    @pytest.mark.asyncio
+    async def test_upsert_keeps_one_row_and_best_quality(self, test_session: AsyncSession):
+        """Test repeated stores of normalized-equal text upsert a single row"""
+        service = AITranslationService(test_session, tm_index=TranslationMemoryIndex())
+
+        await service.store_translation_memory("Contact us", "Kontakt", "en", "de", quality_score=0.7)
+        await service.store_translation_memory("contact  US", "Kontaktieren Sie uns", "en", "de", quality_score=0.9)
+        await service.store_translation_memory("Contact us", "Kontakt aufnehmen", "en", "de", quality_score=0.5)
+
+        rows = (await test_session.execute(select(TranslationMemory))).scalars().all()
+        assert len(rows) == 1
+        assert rows[0].translated_text == "Kontaktieren Sie uns"
+        assert rows[0].source_hash == tm_source_hash("Contact us", "en", "de", "business")
+        assert service.tm_index.best_match("Contact us", "en", "de", domain="business").translation == "Kontaktieren Sie uns"
+
+    @pytest.mark.asyncio
+    async def test_exact_lookup_uses_hash_without_index(self, test_session: AsyncSession):
+        """Test exact hits are served by the database point lookup"""
+        service = AITranslationService(test_session, tm_index=TranslationMemoryIndex())
+        await service.store_translation_memory("Our services", "Unsere Leistungen", "en", "de")
+        service.tm_index.clear()
+
+        match = await service.find_translation_memory_match("OUR services", "en", "de")
+
+        assert match["similarity"] == 1.0
+        assert match["translation"] == "Unsere Leistungen"
+        assert not service.tm_index.loaded
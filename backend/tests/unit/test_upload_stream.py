@@ -0,0 +1,118 @@
+"""
+Unit tests for streaming CV/KYC upload storage
+"""
+
+import hashlib
+import os
+import pytest
+from io import BytesIO
+from fastapi import HTTPException
+from starlette.datastructures import Headers, UploadFile
+
+from app.services.job_application_service import JobApplicationService
+from app.utils.upload_stream import UploadTooLarge, stream_upload_to_file
+
+
+class CountingFile(BytesIO):
+    """BytesIO that records how many bytes were read"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def make_upload(data: bytes, filename: str = "cv.pdf", content_type: str = "application/pdf") -> UploadFile:
+    return UploadFile(
+        CountingFile(data),
+        filename=filename,
+        headers=Headers({"content-type": content_type})
+    )
+
+
+class TestStreamUploadToFile:
+    """Test chunked copy with incremental limit and hashing"""
+
+    @pytest.mark.asyncio
+    async def test_writes_file_and_hash(self, tmp_path):
+        """Test the stored file, size and SHA-256 match the upload"""
+        data = os.urandom(300_000)
+        destination = tmp_path / "docs" / "cv.pdf"
+
+        stored = await stream_upload_to_file(make_upload(data), destination, max_size=1_000_000, chunk_size=64 * 1024)
+
+        assert destination.read_bytes() == data
+        assert stored.size == len(data)
+        assert stored.sha256 == hashlib.sha256(data).hexdigest()
+        assert oct(destination.stat().st_mode & 0o777) == oct(0o600)
+        assert os.listdir(destination.parent) == ["cv.pdf"]
+
+    @pytest.mark.asyncio
+    async def test_oversize_aborts_early_and_cleans_up(self, tmp_path):
+        """Test reading stops just past the limit and no partial file remains"""
+        upload = make_upload(b"x" * 5_000_000)
+        destination = tmp_path / "cv.pdf"
+
+        with pytest.raises(UploadTooLarge):
+            await stream_upload_to_file(upload, destination, max_size=1_000_000, chunk_size=64 * 1024)
+
+        assert upload.file.bytes_read < 1_000_000 + 64 * 1024 + 1
+        assert os.listdir(tmp_path) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_upload_keeps_existing_destination(self, tmp_path):
+        """Test the rename only happens once the new file is complete"""
+        destination = tmp_path / "cv.pdf"
+        destination.write_bytes(b"previous")
+
+        with pytest.raises(UploadTooLarge):
+            await stream_upload_to_file(make_upload(b"y" * 2048), destination, max_size=1024, chunk_size=256)
+
+        assert destination.read_bytes() == b"previous"
+
+
+class TestCVUpload:
+    """Test JobApplicationService CV handling on top of the stream helper"""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        service = JobApplicationService(db=None)
+        service.upload_base_path = tmp_path / "cvs"
+        service.max_file_size = 256 * 1024
+        return service
+
+    @pytest.mark.asyncio
+    async def test_cv_stored_with_hash(self, service):
+        """Test a valid CV is streamed into the application directory"""
+        data = b"%PDF-1.4 " + os.urandom(10_000)
+
+        info = await service._process_cv_upload(make_upload(data), "app-1")
+
+        assert info["file_size"] == len(data)
+        assert info["file_hash"] == hashlib.sha256(data).hexdigest()
+        assert info["mime_type"] == "application/pdf"
+        with open(info["file_path"], "rb") as stored:
+            assert stored.read() == data
+
+    @pytest.mark.asyncio
+    async def test_oversize_cv_rejected_without_leftovers(self, service):
+        """Test an oversize CV is a 400 and leaves no directory behind"""
+        with pytest.raises(HTTPException) as error:
+            await service._process_cv_upload(make_upload(b"z" * 1_000_000), "app-2")
+
+        assert error.value.status_code == 400
+        assert not (service.upload_base_path / "app-2").exists()
+
+    @pytest.mark.asyncio
+    async def test_invalid_type_rejected_before_reading(self, service):
+        """Test extension validation happens before any bytes are read"""
+        upload = make_upload(b"MZ" * 100, filename="cv.exe", content_type="application/octet-stream")
+
+        with pytest.raises(HTTPException):
+            await service._process_cv_upload(upload, "app-3")
+
+        assert upload.file.bytes_read == 0